@@ -1,3 +1,9 @@
+import math
+from typing import Dict, List, Tuple
+
+import numpy as np
+from scipy import sparse
+
 from quantum_circuit.circuit import Circuit
 from .interfaces import IDistanceMetric
 
@@ -6,17 +12,248 @@ class StructuralJaccardDistance(IDistanceMetric):
     """
     Calcula a distância estrutural usando a métrica de Jaccard.
     Ignora parâmetros de gate e usa apenas a estrutura.
+    Os conjuntos comparados são os ids inteiros das colunas, em cache em cada circuito.
     """
     @staticmethod
     def calculate(ind1: Circuit, ind2: Circuit) -> float:
-        set1 = set(ind1.get_structural_representation())
-        set2 = set(ind2.get_structural_representation())
+        ids1 = ind1.get_structural_column_ids()
+        ids2 = ind2.get_structural_column_ids()
 
-        intersection_size = len(set1.intersection(set2))
-        union_size = len(set1.union(set2))
+        intersection_size = len(np.intersect1d(ids1, ids2, assume_unique=True))
+        union_size = len(ids1) + len(ids2) - intersection_size
 
         if union_size == 0:
             return 0.0
 
         jaccard_similarity = intersection_size / union_size
         return 1.0 - jaccard_similarity
+
+    def calculate_matrix(self, individuals: List[Circuit]) -> np.ndarray:
+        """
+        Matriz de distâncias de Jaccard de todos os pares, com os mesmos valores de 'calculate'.
+        Os ids de coluna da população formam uma matriz de incidência esparsa binária M
+        (indivíduos x colunas distintas); M @ M.T dá todos os tamanhos de interseção de uma vez.
+        """
+        if not individuals:
+            return np.zeros((0, 0))
+        incidence, sizes = self._incidence(individuals)
+        return self._distances(incidence @ incidence.T, sizes, sizes)
+
+    def calculate_cross(self, row_individuals: List[Circuit], col_individuals: List[Circuit]) -> np.ndarray:
+        """Distâncias entre dois grupos, pelo produto das incidências montadas sobre as colunas de ambos."""
+        if not row_individuals or not col_individuals:
+            return np.zeros((len(row_individuals), len(col_individuals)))
+        incidence, sizes = self._incidence(row_individuals + col_individuals)
+        num_rows = len(row_individuals)
+        intersections = incidence[:num_rows] @ incidence[num_rows:].T
+        return self._distances(intersections, sizes[:num_rows], sizes[num_rows:])
+
+    @staticmethod
+    def _incidence(individuals: List[Circuit]) -> Tuple[sparse.csr_matrix, np.ndarray]:
+        column_ids = [ind.get_structural_column_ids() for ind in individuals]
+        sizes = np.array([len(ids) for ids in column_ids])
+        _, columns = np.unique(np.concatenate(column_ids), return_inverse=True)
+        rows = np.repeat(np.arange(len(individuals)), sizes)
+        incidence = sparse.csr_matrix(
+            (np.ones(len(columns), dtype=np.int32), (rows, columns.reshape(-1))),
+            shape=(len(individuals), int(columns.max(initial=-1)) + 1)
+        )
+        return incidence, sizes
+
+    @staticmethod
+    def _distances(intersections: sparse.spmatrix, row_sizes: np.ndarray, col_sizes: np.ndarray) -> np.ndarray:
+        intersections = intersections.toarray()
+        unions = row_sizes[:, None] + col_sizes[None, :] - intersections
+        similarities = np.divide(intersections, unions, out=np.ones(unions.shape), where=unions > 0)
+        return 1.0 - similarities
+
+
+class IncrementalDistanceMatrix(IDistanceMetric):
+    """
+    ## Matriz de distâncias mantida entre gerações para uma execução, sobre uma métrica exata.
+    ## Guarda as distâncias entre os últimos indivíduos consultados, indexadas pela identidade
+    ## e pela versão de cada circuito (os circuitos ficam referenciados, então os ids não são
+    ## reutilizados). Numa nova consulta, as distâncias entre indivíduos já conhecidos são
+    ## copiadas e só as linhas dos indivíduos novos ou alterados são calculadas: O(P * novos)
+    ## em vez de O(P^2). Indivíduos conhecidos fora da consulta continuam guardados até
+    ## 'max_size' (ex: os sobreviventes, durante a avaliação dos indivíduos injetados).
+    ## Diversidade (otimizador, observador e adaptação das taxas) e nichos leem esta matriz.
+    """
+
+    def __init__(self, metric: IDistanceMetric, max_size: int):
+        self._metric = metric
+        self._max_size = max_size
+        self._individuals: List[Circuit] = []
+        self._versions: List[int] = []
+        self._rows: Dict[int, int] = {}
+        self._matrix = np.zeros((0, 0))
+        self.reused_pairs = 0
+        self.computed_pairs = 0
+
+    def calculate(self, ind1: Circuit, ind2: Circuit) -> float:
+        return self._metric.calculate(ind1, ind2)
+
+    def calculate_cross(self, row_individuals: List[Circuit], col_individuals: List[Circuit]) -> np.ndarray:
+        return self._metric.calculate_cross(row_individuals, col_individuals)
+
+    def _cached_row(self, individual: Circuit) -> int:
+        row = self._rows.get(id(individual), -1)
+        if row < 0 or self._individuals[row] is not individual or self._versions[row] != individual.version:
+            return -1
+        return row
+
+    def calculate_matrix(self, individuals: List[Circuit]) -> np.ndarray:
+        size = len(individuals)
+        query_rows = [self._cached_row(ind) for ind in individuals]
+        # Linhas guardadas de indivíduos fora da consulta e ainda na mesma versão, mantidas
+        # enquanto houver espaço (a linha antiga de um indivíduo alterado é descartada)
+        query_ids = {id(ind) for ind in individuals}
+        retained = [
+            row for row, ind in enumerate(self._individuals)
+            if id(ind) not in query_ids and self._versions[row] == ind.version
+        ]
+        retained = retained[:max(0, self._max_size - size)]
+
+        entries = list(individuals) + [self._individuals[row] for row in retained]
+        cached_rows = np.array(query_rows + retained, dtype=np.int64)
+        known = np.flatnonzero(cached_rows >= 0)
+        new = np.flatnonzero(cached_rows < 0)
+
+        matrix = np.empty((len(entries), len(entries)))
+        matrix[np.ix_(known, known)] = self._matrix[np.ix_(cached_rows[known], cached_rows[known])]
+        if len(new):
+            cross = self._metric.calculate_cross([entries[i] for i in new], entries)
+            matrix[new, :] = cross
+            matrix[:, new] = cross.T
+        num_known = int(np.count_nonzero(cached_rows[:size] >= 0))
+        self.reused_pairs += num_known ** 2
+        self.computed_pairs += size ** 2 - num_known ** 2
+
+        matrix.flags.writeable = False
+        self._individuals = entries
+        self._versions = [ind.version for ind in entries]
+        self._rows = {id(ind): row for row, ind in enumerate(entries)}
+        self._matrix = matrix
+        return matrix[:size, :size]
+
+
+class MinHashJaccardDistance(IDistanceMetric):
+    """
+    ## Estimativa da distância estrutural de Jaccard por assinaturas MinHash dos ids de
+    ## coluna de cada circuito, para populações grandes (milhares de indivíduos).
+    ## - A fração de posições iguais nas assinaturas de 'signature_length' funções de hash
+    ##   é um estimador não enviesado da similaridade, com erro padrão <= 1/(2*sqrt(K)).
+    ## - A distância média é obtida em O(P*K), contando as colisões de cada posição da
+    ##   assinatura, sem percorrer os pares.
+    ## - Os vizinhos a menos de 'max_distance' são buscados por LSH em faixas, com o número
+    ##   de linhas por faixa escolhido para encontrar ao menos 'min_recall' dos pares no
+    ##   limite do raio (pares mais próximos são encontrados com probabilidade maior).
+    """
+
+    _CHUNK = 32  # Funções de hash processadas por vez (limita a memória temporária)
+
+    def __init__(self, signature_length: int = 128, min_recall: float = 0.95, seed: int = 0):
+        self._signature_length = signature_length
+        self._min_recall = min_recall
+        # Sementes fixas: não consomem o gerador global, que é semeado pelo experimento
+        self._seeds = np.random.default_rng(seed).integers(
+            0, np.iinfo(np.uint64).max, size=signature_length, dtype=np.uint64, endpoint=True
+        )
+
+    @property
+    def standard_error(self) -> float:
+        """Limite superior do erro padrão das distâncias estimadas (e da distância média)."""
+        return 0.5 / math.sqrt(self._signature_length)
+
+    def band_shape(self, max_distance: float) -> Tuple[int, int]:
+        """(faixas, linhas por faixa) usadas para buscar vizinhos a menos de 'max_distance'."""
+        similarity = 1.0 - max_distance
+        for rows in range(self._signature_length, 0, -1):
+            bands = self._signature_length // rows
+            if 1.0 - (1.0 - similarity ** rows) ** bands >= self._min_recall:
+                return bands, rows
+        return self._signature_length, 1
+
+    def neighbor_recall(self, distance: float, max_distance: float) -> float:
+        """Probabilidade de um par à distância 'distance' ser encontrado por 'find_neighbors'."""
+        bands, rows = self.band_shape(max_distance)
+        return 1.0 - (1.0 - (1.0 - distance) ** rows) ** bands
+
+    def signatures(self, individuals: List[Circuit]) -> np.ndarray:
+        """Assinaturas MinHash (P x K, uint64). Circuitos sem colunas têm a assinatura máxima."""
+        column_ids = [ind.get_structural_column_ids() for ind in individuals]
+        sizes = np.array([len(ids) for ids in column_ids], dtype=np.int64)
+        signatures = np.full((len(individuals), self._signature_length), np.iinfo(np.uint64).max, dtype=np.uint64)
+        non_empty = np.flatnonzero(sizes)
+        if not len(non_empty):
+            return signatures
+
+        ids = np.concatenate(column_ids).view(np.uint64)
+        starts = (np.cumsum(sizes) - sizes)[non_empty]
+        with np.errstate(over="ignore"):
+            for k in range(0, self._signature_length, self._CHUNK):
+                # Mistura splitmix64 de cada id com a semente de cada função de hash
+                z = ids[:, None] ^ self._seeds[None, k:k + self._CHUNK]
+                z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+                z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+                z ^= z >> np.uint64(31)
+                signatures[non_empty, k:k + self._CHUNK] = np.minimum.reduceat(z, starts, axis=0)
+        return signatures
+
+    def calculate(self, ind1: Circuit, ind2: Circuit) -> float:
+        signature1, signature2 = self.signatures([ind1, ind2])
+        return float(np.mean(signature1 != signature2))
+
+    def calculate_matrix(self, individuals: List[Circuit]) -> np.ndarray:
+        """Matriz estimada das distâncias (O(P^2 * K)); prefira 'calculate_mean' e 'find_neighbors'."""
+        signatures = self.signatures(individuals)
+        matches = np.zeros((len(individuals), len(individuals)))
+        for k in range(self._signature_length):
+            column = signatures[:, k]
+            matches += column[:, None] == column[None, :]
+        return 1.0 - matches / self._signature_length
+
+    def calculate_mean(self, individuals: List[Circuit]) -> float:
+        size = len(individuals)
+        if size < 2:
+            return 0.0
+        signatures = self.signatures(individuals)
+        colliding_pairs = 0
+        for k in range(self._signature_length):
+            _, counts = np.unique(signatures[:, k], return_counts=True)
+            colliding_pairs += int((counts * (counts - 1) // 2).sum())
+        num_pairs = size * (size - 1) // 2
+        return 1.0 - colliding_pairs / (self._signature_length * num_pairs)
+
+    def find_neighbors(self, individuals: List[Circuit], max_distance: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        size = len(individuals)
+        signatures = self.signatures(individuals)
+        bands, rows = self.band_shape(max_distance)
+
+        pair_codes = []
+        for band in range(bands):
+            # Chave da faixa: combinação das linhas da assinatura em um único inteiro
+            keys = np.zeros(size, dtype=np.uint64)
+            with np.errstate(over="ignore"):
+                for row in range(band * rows, (band + 1) * rows):
+                    keys = (keys ^ signatures[:, row]) * np.uint64(0x9E3779B97F4A7C15)
+            order = np.argsort(keys, kind="stable")
+            sorted_keys = keys[order]
+            # Pares de indivíduos da mesma chave, a 'offset' posições de distância na ordem
+            offset = 1
+            while offset < size:
+                same = np.flatnonzero(sorted_keys[offset:] == sorted_keys[:-offset])
+                if not len(same):
+                    break
+                first, second = order[same], order[same + offset]
+                pair_codes.append(np.minimum(first, second) * size + np.maximum(first, second))
+                offset += 1
+
+        if not pair_codes:
+            empty = np.zeros(0, dtype=np.int64)
+            return empty, empty, np.zeros(0)
+        codes = np.unique(np.concatenate(pair_codes))
+        first, second = codes // size, codes % size
+        distances = np.mean(signatures[first] != signatures[second], axis=1)
+        close = distances < max_distance
+        return first[close], second[close], distances[close]
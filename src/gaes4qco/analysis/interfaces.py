@@ -1,4 +1,7 @@
 from abc import ABC, abstractmethod
+from typing import List, Tuple
+
+import numpy as np
 
 from quantum_circuit.circuit import Circuit
 from .data_models import ResultData
@@ -26,3 +29,40 @@ class IDistanceMetric(ABC):
     def calculate(ind1: Circuit, ind2: Circuit) -> float:
         """Calcula a distância entre dois indivíduos."""
         pass
+
+    def calculate_matrix(self, individuals: List[Circuit]) -> np.ndarray:
+        """
+        Retorna a matriz simétrica (P x P) das distâncias entre todos os pares de indivíduos.
+        Implementação padrão: chama 'calculate' para cada par. Métricas com uma forma
+        vetorizada devem sobrescrevê-la.
+        """
+        size = len(individuals)
+        distances = np.zeros((size, size))
+        for i in range(size):
+            for j in range(i + 1, size):
+                distances[i, j] = distances[j, i] = self.calculate(individuals[i], individuals[j])
+        return distances
+
+    def calculate_cross(self, row_individuals: List[Circuit], col_individuals: List[Circuit]) -> np.ndarray:
+        """Retorna a matriz (len(row_individuals) x len(col_individuals)) das distâncias entre os dois grupos."""
+        distances = np.zeros((len(row_individuals), len(col_individuals)))
+        for i, ind1 in enumerate(row_individuals):
+            for j, ind2 in enumerate(col_individuals):
+                distances[i, j] = 0.0 if ind1 is ind2 else self.calculate(ind1, ind2)
+        return distances
+
+    def calculate_mean(self, individuals: List[Circuit]) -> float:
+        """Distância média entre todos os pares únicos de indivíduos (0.0 com menos de dois)."""
+        size = len(individuals)
+        if size < 2:
+            return 0.0
+        return float(self.calculate_matrix(individuals)[np.triu_indices(size, k=1)].mean())
+
+    def find_neighbors(self, individuals: List[Circuit], max_distance: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Retorna os pares (i, j), com i < j, a uma distância menor que 'max_distance',
+        como três arrays: índices i, índices j e distâncias.
+        """
+        distances = self.calculate_matrix(individuals)
+        rows, cols = np.nonzero(np.triu(distances < max_distance, k=1))
+        return rows, cols, distances[rows, cols]
@@ -6,17 +6,33 @@ from qiskit.providers.fake_provider.generic_backend_v2 import GenericBackendV2
 
 
 from experiment import checkpoint, runner
-from quantum_circuit import qiskit_adapter, circuit_factory, gate_factory, executor as quantum_executor
+from quantum_circuit import qiskit_adapter, circuit_factory, gate_factory, simulator, simplifier, fusion, executor as quantum_executor
 from evolutionary_algorithm import selection, crossover, mutation, population_factory, rate_adapter
-from optimization import fitness, observer, optimizer, fitness_shaper
-from analysis import error_analyzer
+from optimization import fitness, observer, optimizer, fitness_shaper, screening, multi_fidelity, multi_target, evaluation_cache, phenotype, evaluation_service, pareto_archive
+from analysis import error_analyzer, distance_metrics
 
 
 class QuantumCircuitContainer(containers.DeclarativeContainer):
     """Sub-container para os componentes da feature quantum_circuit."""
     config = providers.Configuration()
 
+    simplifier = providers.Factory(simplifier.CircuitSimplifier)
+    # Adapter da avaliação: simula a lista reduzida de operações, sem alterar o genoma
+    simulation_adapter = providers.Factory(
+        qiskit_adapter.SimplifyingQiskitAdapter,
+        simplifier=simplifier
+    )
     qiskit_adapter = providers.Factory(qiskit_adapter.QiskitAdapter)
+    # Compartilhado pelo simulador nativo: o cache de blocos fundidos vale para toda a execução
+    gate_fusion = providers.Singleton(
+        fusion.GateFusionCompiler,
+        max_fused_width=config.simulation.max_fused_width
+    )
+    native_simulator = providers.Singleton(
+        simulator.NativeStatevectorSimulator,
+        simplifier=simplifier,
+        fusion=gate_fusion
+    )
     gate_factory = providers.Factory(
         gate_factory.GateFactory,
         allowed_gates=config.quantum.allowed_gates
@@ -37,19 +53,121 @@ class OptimizationContainer(containers.DeclarativeContainer):
         data=config.quantum.target_statevector_data
     )
 
+    # Compartilhado por todos os avaliadores multi-alvo (otimizador e mutações)
+    multi_target_archive = providers.Singleton(
+        multi_target.MultiTargetArchive,
+        elite_size=config.evolution.elitism_size
+    )
+
+    # Índice de fenótipos: alimentado pelos avaliadores e usado pelo otimizador na seleção
+    phenotype_index = providers.Selector(
+        config.selection_strategy.phenotype,
+        dedup=providers.Singleton(
+            phenotype.PhenotypeIndex,
+            population_size=config.evolution.population_size,
+            near_tolerance=config.phenotype.near_tolerance,
+            max_size=config.phenotype.index_size
+        ),
+        default=providers.Singleton(
+            phenotype.NullPhenotypeIndex
+        ),
+    )
+
+    # Fronteira de Pareto (fidelidade x profundidade) de toda a execução, mantida entre as fases
+    pareto_archive = providers.Selector(
+        config.selection_strategy.pareto_archive,
+        archive=providers.Singleton(
+            pareto_archive.ParetoArchive,
+            max_size=config.pareto_archive.max_size
+        ),
+        default=providers.Singleton(
+            pareto_archive.NullParetoArchive
+        ),
+    )
+
+    # Cliente do servidor de avaliação; sem endereço (ou servidor fora do ar) simula no próprio processo
+    simulation_service = providers.Singleton(
+        evaluation_service.EvaluationServiceClient,
+        address=config.evaluation_service.address,
+        fallback=providers.Factory(
+            evaluation_service.InProcessSimulationService,
+            simulator=gateways.native_simulator
+        )
+    )
+
     # Seletor para a função de fitness
-    evaluator = providers.Selector(
+    base_evaluator = providers.Selector(
         config.selection_strategy.fitness,
+        service=providers.Factory(
+            fitness.ServiceFidelityFitnessEvaluator,
+            target_statevector=target_statevector,
+            service=simulation_service,
+            phenotype_index=phenotype_index
+        ),
+        multitarget=providers.Factory(
+            fitness.MultiTargetFidelityEvaluator,
+            target_statevector=target_statevector,
+            additional_targets_data=config.quantum.additional_targets_statevector_data,
+            simulator=gateways.native_simulator,
+            archive=multi_target_archive,
+            phenotype_index=phenotype_index
+        ),
         weighted=providers.Factory(
             fitness.WeightedFidelityFitnessEvaluator,
             target_statevector=target_statevector,
-            circuit_adapter=gateways.qiskit_adapter,
-            target_depth=config.quantum.target_depth
+            circuit_adapter=gateways.simulation_adapter,
+            target_depth=config.quantum.target_depth,
+            phenotype_index=phenotype_index
         ),
         default=providers.Factory(
             fitness.FidelityFitnessEvaluator,
             target_statevector=target_statevector,
-            circuit_adapter=gateways.qiskit_adapter
+            circuit_adapter=gateways.simulation_adapter,
+            phenotype_index=phenotype_index
+        ),
+    )
+
+    # Resultados indexados pela forma canônica do genoma, compartilhados por toda a execução
+    memory_evaluation_cache = providers.Singleton(
+        evaluation_cache.InMemoryEvaluationCache,
+        max_size=config.evaluation_cache.max_size
+    )
+    # Com 'disk', os resultados também são persistidos entre execuções e experimentos
+    evaluation_cache = providers.Selector(
+        config.evaluation_cache.backend,
+        disk=providers.Singleton(
+            evaluation_cache.SqliteEvaluationCache,
+            path=config.evaluation_cache.path,
+            target_statevector=target_statevector,
+            additional_targets_data=config.quantum.additional_targets_statevector_data,
+            target_depth=config.quantum.target_depth,
+            max_size_mb=config.evaluation_cache.max_size_mb,
+            memory_cache=memory_evaluation_cache
+        ),
+        memory=memory_evaluation_cache,
+    )
+    # Simulações exatas feitas pelo otimizador e pelas mutações que avaliam circuitos
+    evaluation_counter = providers.Singleton(fitness.EvaluationCounter)
+    evaluator = providers.Factory(
+        fitness.CachingFitnessEvaluator,
+        evaluator=base_evaluator,
+        cache=evaluation_cache,
+        counter=evaluation_counter,
+        phenotype_index=phenotype_index
+    )
+
+    # Distância estrutural usada na diversidade e nos nichos: estimada por MinHash/LSH, ou exata,
+    # com a matriz de distâncias mantida entre as gerações da execução
+    distance_metric = providers.Selector(
+        config.selection_strategy.diversity,
+        minhash=providers.Singleton(
+            distance_metrics.MinHashJaccardDistance,
+            signature_length=config.diversity.signature_length
+        ),
+        default=providers.Singleton(
+            distance_metrics.IncrementalDistanceMatrix,
+            metric=providers.Factory(distance_metrics.StructuralJaccardDistance),
+            max_size=config.diversity.matrix_size
         ),
     )
 
@@ -58,16 +176,55 @@ class OptimizationContainer(containers.DeclarativeContainer):
         sharing=providers.Factory(
             fitness_shaper.FitnessSharingShaper,
             sharing_radius=config.niching.sharing_radius,
-            alpha=config.niching.alpha
+            alpha=config.niching.alpha,
+            distance_metric=distance_metric
         ),
         default=providers.Factory(
             fitness_shaper.NullFitnessShaper
         ),
     )
 
+    fidelity_proxy = providers.Selector(
+        config.multi_fidelity.proxy,
+        amplitudes=providers.Factory(
+            multi_fidelity.AmplitudeSubsetProxy,
+            target_statevector=target_statevector,
+            simulator=gateways.native_simulator,
+            amplitude_fraction=config.multi_fidelity.amplitude_fraction
+        ),
+        columns=providers.Factory(
+            multi_fidelity.TruncatedColumnProxy,
+            target_statevector=target_statevector,
+            simulator=gateways.native_simulator,
+            max_columns=config.multi_fidelity.max_columns
+        ),
+    )
+
+    screener = providers.Selector(
+        config.selection_strategy.screener,
+        surrogate=providers.Factory(
+            screening.SurrogateOffspringScreener,
+            population_size=config.evolution.population_size,
+            top_fraction=config.surrogate.top_fraction,
+            exploration_rate=config.surrogate.exploration_rate,
+            min_samples=config.surrogate.min_samples
+        ),
+        multifidelity=providers.Factory(
+            multi_fidelity.MultiFidelityScreener,
+            proxy=fidelity_proxy,
+            population_size=config.evolution.population_size,
+            elitism_count=config.evolution.elitism_size,
+            margin=config.multi_fidelity.margin
+        ),
+        default=providers.Factory(
+            screening.NullOffspringScreener
+        ),
+    )
+
     observer = providers.Factory(
         observer.JsonProgressObserver,
-        filename=config.observer.filename
+        filename=config.observer.filename,
+        distance_metric=distance_metric
     )
 
 
@@ -140,10 +297,18 @@ class EvolutionaryAlgorithmContainer(containers.DeclarativeContainer):
     )
 
     # --- Estratégia de Crossover ---
-    crossover_population = providers.Factory(
-        crossover.PopulationCrossover,
-        crossover_strategy=crossover_strategy_selector,
-        crossover_rate=config.evolution.crossover_rate
+    crossover_population = providers.Selector(
+        config.selection_strategy.crossover_mode,
+        vectorized=providers.Factory(
+            crossover.BatchPopulationCrossover,
+            crossover_strategy=crossover_strategy_selector,
+            crossover_rate=config.evolution.crossover_rate
+        ),
+        default=providers.Factory(
+            crossover.PopulationCrossover,
+            crossover_strategy=crossover_strategy_selector,
+            crossover_rate=config.evolution.crossover_rate
+        )
     )
 
     # --- Estratégias de Mutação ---
@@ -176,6 +341,11 @@ class EvolutionaryAlgorithmContainer(containers.DeclarativeContainer):
             mutation_rate=config.evolution.mutation_rate,
             fitness_evaluator=optimization.evaluator
         ),
+        vectorized=providers.Factory(
+            mutation.BatchMutationSelector,
+            mutation_strategies=mutation_pool,
+            mutation_rate=config.evolution.mutation_rate
+        ),
         default=providers.Factory(
             mutation.RandomMutationSelector,
             mutation_strategies=mutation_pool,
@@ -233,7 +403,8 @@ class AppContainer(containers.DeclarativeContainer):
     )
     population_fac = providers.Factory(
         population_factory.PopulationFactory,
-        circuit_factory=circuit.circuit_factory
+        circuit_factory=circuit.circuit_factory,
+        bulk_generation=config.evolution.bulk_generation
     )
 
     checkpoint_manager = providers.Factory(
@@ -246,6 +417,7 @@ class AppContainer(containers.DeclarativeContainer):
     optimizer = providers.Factory(
         optimizer.Optimizer,
         fitness_evaluator=optimization.evaluator,
+        evaluation_counter=optimization.evaluation_counter,
         parent_selection=evolutionary_algorithm.parent_selector,
         survivor_selection=evolutionary_algorithm.survivor_selector,
         crossover=evolutionary_algorithm.crossover_population,
@@ -255,7 +427,13 @@ class AppContainer(containers.DeclarativeContainer):
         diversity_threshold=config.evolution.diversity_threshold,
         injection_rate=config.evolution.injection_rate,
         fitness_shaper=optimization.shaper,
-        observer=optimization.observer
+        observer=optimization.observer,
+        offspring_screener=optimization.screener,
+        phenotype_index=optimization.phenotype_index,
+        distance_metric=optimization.distance_metric,
+        pareto_archive=optimization.pareto_archive,
+        streaming_pipeline=config.evolution.streaming_pipeline,
+        use_evolutionary_strategy=config.evolution.stepsize
     )
 
     noisy_backend = providers.Factory(
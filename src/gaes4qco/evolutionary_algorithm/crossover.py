@@ -1,5 +1,7 @@
 import random
-from typing import Tuple, List
+from typing import Iterator, Tuple, List
+
+import numpy as np
 
 from quantum_circuit.gate import Gate
 from quantum_circuit.gate_factory import GateFactory
@@ -14,25 +16,60 @@ class PopulationCrossover(IPopulationCrossover):
         self.crossover_rate = crossover_rate
 
     def run(self, parent_population: Population) -> Population:
-        # 1. Extrai a lista de indivíduos do objeto Population.
-        parents_local = parent_population.get_individuals()
+        return Population(list(self.run_stream(parent_population.individuals)))
+
+    def run_stream(self, parents: List[Circuit]) -> Iterator[Circuit]:
+        # 1. Copia a lista de pais (que será embaralhada).
+        parents_local = list(parents)
         random.shuffle(parents_local)
-        offspring = []
 
         for i in range(0, len(parents_local), 2):
             if i + 1 >= len(parents_local):
-                offspring.append(parents_local[i])
+                yield parents_local[i]
                 continue
             parent1, parent2 = parents_local[i], parents_local[i + 1]
             if random.random() < self.crossover_rate:
                 child1, child2 = self.crossover_strategy.crossover(parent1, parent2)
-                offspring.extend([child1, child2])
+                yield child1
+                yield child2
             else:
-                offspring.extend([parent1, parent2])
+                yield parent1
+                yield parent2
+
+
+class BatchPopulationCrossover(IPopulationCrossover):
+    """
+    ## Versão vetorizada de PopulationCrossover: o embaralhamento dos pais, as decisões
+    ## de cruzamento e (via 'crossover_batch' da estratégia) os pontos de corte são
+    ## sorteados como arrays NumPy, e os filhos de todos os pares são montados de uma vez.
+    ## Mesma semântica dos operadores, mas consome o gerador do NumPy em vez do 'random'.
+    """
+
+    def __init__(self, crossover_strategy: ICrossoverStrategy, crossover_rate: float = 0.8):
+        self.crossover_strategy = crossover_strategy
+        self.crossover_rate = crossover_rate
+
+    def run(self, parent_population: Population) -> Population:
+        parents = parent_population.individuals
+        order = np.random.permutation(len(parents)).tolist()
+        shuffled = [parents[i] for i in order]
+        num_pairs = len(shuffled) // 2
+        offspring = list(shuffled)
+
+        crossed = np.flatnonzero(np.random.random(num_pairs) < self.crossover_rate)
+        if crossed.size:
+            children_1, children_2 = self.crossover_strategy.crossover_batch(
+                [shuffled[2 * k] for k in crossed.tolist()],
+                [shuffled[2 * k + 1] for k in crossed.tolist()]
+            )
+            for k, child_1, child_2 in zip(crossed.tolist(), children_1, children_2):
+                offspring[2 * k], offspring[2 * k + 1] = child_1, child_2
 
         return Population(offspring)
 
 
+# Os filhos compartilham as colunas e os gates dos pais (sem cópia). Os operadores de
+# mutação fazem copy-on-write via Circuit.column_for_write antes de alterar uma coluna.
 class MultiPointCrossover(ICrossoverStrategy):
     def crossover(self, parent_1: Circuit, parent_2: Circuit) -> Tuple[Circuit, Circuit]:
         min_depth = min(parent_1.depth, parent_2.depth)
@@ -41,20 +78,37 @@ class MultiPointCrossover(ICrossoverStrategy):
 
         for i in range(min_depth):
             if crossover_points[i] == 0:
-                child1_cols.append(parent_1.columns[i].copy())
-                child2_cols.append(parent_2.columns[i].copy())
+                child1_cols.append(parent_1.columns[i])
+                child2_cols.append(parent_2.columns[i])
             else:
-                child1_cols.append(parent_2.columns[i].copy())
-                child2_cols.append(parent_1.columns[i].copy())
+                child1_cols.append(parent_2.columns[i])
+                child2_cols.append(parent_1.columns[i])
 
         if parent_1.depth > min_depth:
-            child1_cols.extend([col.copy() for col in parent_1.columns[min_depth:]])
+            child1_cols.extend(parent_1.columns[min_depth:])
         if parent_2.depth > min_depth:
-            child2_cols.extend([col.copy() for col in parent_2.columns[min_depth:]])
+            child2_cols.extend(parent_2.columns[min_depth:])
 
         num_qubits = parent_1.count_qubits
         return Circuit(num_qubits, child1_cols), Circuit(num_qubits, child2_cols)
 
+    def crossover_batch(self, parents_1: List[Circuit], parents_2: List[Circuit]) -> Tuple[List[Circuit], List[Circuit]]:
+        min_depths = np.array([min(p1.depth, p2.depth) for p1, p2 in zip(parents_1, parents_2)], dtype=np.int64)
+        # Um bit de troca por coluna comum de cada par, sorteados de uma vez
+        swap_bits = np.random.randint(0, 2, size=int(min_depths.sum())).astype(bool).tolist()
+        bounds = np.concatenate([[0], np.cumsum(min_depths)]).tolist()
+
+        children_1, children_2 = [], []
+        for p1, p2, start, stop in zip(parents_1, parents_2, bounds[:-1], bounds[1:]):
+            swaps = swap_bits[start:stop]
+            depth = stop - start
+            cols_1, cols_2 = p1.columns, p2.columns
+            child1_cols = [c2 if swap else c1 for c1, c2, swap in zip(cols_1, cols_2, swaps)] + cols_1[depth:]
+            child2_cols = [c1 if swap else c2 for c1, c2, swap in zip(cols_1, cols_2, swaps)] + cols_2[depth:]
+            children_1.append(Circuit(p1.count_qubits, child1_cols))
+            children_2.append(Circuit(p1.count_qubits, child2_cols))
+        return children_1, children_2
+
 
 class BlockwiseCrossover(ICrossoverStrategy):
     """
@@ -76,12 +130,102 @@ class BlockwiseCrossover(ICrossoverStrategy):
         child2 = self._build_child(parent_2, parent_1, split_col, split_qubit, num_qubits, min_depth)
 
         if parent_1.depth > min_depth:
-            child1.columns.extend(col.copy() for col in parent_1.columns[min_depth:])
+            child1.columns.extend(parent_1.columns[min_depth:])
         if parent_2.depth > min_depth:
-            child2.columns.extend(col.copy() for col in parent_2.columns[min_depth:])
+            child2.columns.extend(parent_2.columns[min_depth:])
 
         return child1, child2
 
+    def crossover_batch(self, parents_1: List[Circuit], parents_2: List[Circuit]) -> Tuple[List[Circuit], List[Circuit]]:
+        num_qubits = np.array([max(p1.count_qubits, p2.count_qubits) for p1, p2 in zip(parents_1, parents_2)])
+        depths_1 = np.array([p.depth for p in parents_1], dtype=np.int64)
+        depths_2 = np.array([p.depth for p in parents_2], dtype=np.int64)
+        min_depths = np.minimum(depths_1, depths_2)
+
+        split_cols = np.random.randint(0, min_depths)
+        split_qubits = np.random.randint(0, num_qubits)
+
+        children_1 = self._build_children(parents_1, parents_2, split_cols, split_qubits, num_qubits, min_depths)
+        children_2 = self._build_children(parents_2, parents_1, split_cols, split_qubits, num_qubits, min_depths)
+        for children, parents in ((children_1, parents_1), (children_2, parents_2)):
+            for child, parent, depth in zip(children, parents, min_depths.tolist()):
+                if parent.depth > depth:
+                    child.columns.extend(parent.columns[depth:])
+        return children_1, children_2
+
+    @staticmethod
+    def _gate_table(parents: List[Circuit], depths: np.ndarray):
+        """
+        Lista os gates das 'depths[k]' primeiras colunas de cada pai com o par, a coluna,
+        o menor e o maior qubit de cada gate, e os qubits concatenados (com o gate de cada um).
+        """
+        gates, rows, cols, qubits, qubit_counts = [], [], [], [], []
+        for row, (parent, depth) in enumerate(zip(parents, depths.tolist())):
+            for i_col, column in enumerate(parent.columns[:depth]):
+                for gate in column.get_gates():
+                    gates.append(gate)
+                    rows.append(row)
+                    cols.append(i_col)
+                    qubits.extend(gate.qubits)
+                    qubit_counts.append(len(gate.qubits))
+        qubits = np.array(qubits, dtype=np.int64)
+        qubit_counts = np.array(qubit_counts, dtype=np.int64)
+        if not gates:
+            empty = np.zeros(0, dtype=np.int64)
+            return gates, empty, empty, empty, empty, qubits, empty
+        starts = np.cumsum(qubit_counts) - qubit_counts
+        return (
+            gates, np.array(rows), np.array(cols),
+            np.minimum.reduceat(qubits, starts), np.maximum.reduceat(qubits, starts),
+            qubits, np.repeat(np.arange(len(gates)), qubit_counts)
+        )
+
+    def _build_children(
+        self, own: List[Circuit], other: List[Circuit], split_c: np.ndarray, split_q: np.ndarray,
+        num_qubits: np.ndarray, depths: np.ndarray
+    ) -> List[Circuit]:
+        """Versão vetorizada de '_build_child' para todos os pares (sem as colunas excedentes)."""
+        own_gates, own_rows, own_cols, _, own_max, own_qubits, own_owner = self._gate_table(own, depths)
+        other_gates, other_rows, other_cols, other_min, _, other_qubits, other_owner = self._gate_table(other, depths)
+
+        # Antes da coluna de corte vem tudo do próprio pai; a partir dela, os gates do próprio
+        # pai até o qubit de corte e os do outro pai acima dele
+        keep_own = (own_cols < split_c[own_rows]) | (own_max <= split_q[own_rows])
+        keep_other = (other_cols >= split_c[other_rows]) & (other_min > split_q[other_rows])
+
+        column_offsets = np.cumsum(depths) - depths
+        own_slots = column_offsets[own_rows] + own_cols
+        other_slots = column_offsets[other_rows] + other_cols
+        num_slots = int(depths.sum())
+
+        # Qubits ocupados em cada coluna dos filhos; os livres recebem identidades
+        occupied = np.zeros((num_slots, int(num_qubits.max(initial=1))), dtype=bool)
+        own_mask = keep_own[own_owner]
+        occupied[own_slots[own_owner[own_mask]], own_qubits[own_mask]] = True
+        other_mask = keep_other[other_owner]
+        occupied[other_slots[other_owner[other_mask]], other_qubits[other_mask]] = True
+        slot_rows = np.repeat(np.arange(len(depths)), depths)
+        free = ~occupied & (np.arange(occupied.shape[1]) < num_qubits[slot_rows][:, None])
+        identity_slots, identity_qubits = np.nonzero(free)
+
+        # Em cada coluna: gates do próprio pai, do outro pai e identidades, nessa ordem
+        items = (
+            [own_gates[i] for i in np.flatnonzero(keep_own).tolist()]
+            + [other_gates[i] for i in np.flatnonzero(keep_other).tolist()]
+            + [self._gate_factory.build_identity_gate(q) for q in identity_qubits.tolist()]
+        )
+        slots = np.concatenate([own_slots[keep_own], other_slots[keep_other], identity_slots])
+        order = np.argsort(slots, kind="stable").tolist()
+        items = [items[i] for i in order]
+        bounds = np.concatenate([[0], np.cumsum(np.bincount(slots, minlength=num_slots))]).tolist()
+        columns = [Column(items[a:b]) for a, b in zip(bounds[:-1], bounds[1:])]
+
+        col_bounds = np.concatenate([[0], np.cumsum(depths)]).tolist()
+        return [
+            Circuit(q, columns[a:b])
+            for q, a, b in zip(num_qubits.tolist(), col_bounds[:-1], col_bounds[1:])
+        ]
+
     def _build_child(
         self, p1: Circuit, p2: Circuit, split_c: int, split_q: int, num_qubits: int, depth: int
     ) -> Circuit:
@@ -91,12 +235,12 @@ class BlockwiseCrossover(ICrossoverStrategy):
             new_col_gates: List[Gate] = []
             if i < split_c:
                 if i < p1.depth:
-                    new_col_gates.extend(g.copy() for g in p1.columns[i].get_gates())
+                    new_col_gates.extend(p1.columns[i].get_gates())
             else:
                 if i < p1.depth:
-                    new_col_gates.extend(g.copy() for g in p1.columns[i].get_gates() if all(q <= split_q for q in g.qubits))
+                    new_col_gates.extend(g for g in p1.columns[i].get_gates() if all(q <= split_q for q in g.qubits))
                 if i < p2.depth:
-                    new_col_gates.extend(g.copy() for g in p2.columns[i].get_gates() if all(q > split_q for q in g.qubits))
+                    new_col_gates.extend(g for g in p2.columns[i].get_gates() if all(q > split_q for q in g.qubits))
             free_qubits = set(range(num_qubits))
             for g in new_col_gates:
                 free_qubits -= set(g.qubits)
@@ -121,12 +265,28 @@ class SinglePointCrossover(ICrossoverStrategy):
         crossover_point = random.randint(1, min_depth - 1)
 
         # Cria os filhos trocando as colunas a partir do ponto de crossover
-        child1_cols = [col.copy() for col in parent_1.columns[:crossover_point]] + \
-                      [col.copy() for col in parent_2.columns[crossover_point:]]
-        child2_cols = [col.copy() for col in parent_2.columns[:crossover_point]] + \
-                      [col.copy() for col in parent_1.columns[crossover_point:]]
+        child1_cols = parent_1.columns[:crossover_point] + parent_2.columns[crossover_point:]
+        child2_cols = parent_2.columns[:crossover_point] + parent_1.columns[crossover_point:]
 
         num_qubits = max(parent_1.count_qubits, parent_2.count_qubits)
         child1 = Circuit(num_qubits, child1_cols)
         child2 = Circuit(num_qubits, child2_cols)
         return child1, child2
+
+    def crossover_batch(self, parents_1: List[Circuit], parents_2: List[Circuit]) -> Tuple[List[Circuit], List[Circuit]]:
+        min_depths = np.array([min(p1.depth, p2.depth) for p1, p2 in zip(parents_1, parents_2)], dtype=np.int64)
+        # Todos os pontos de corte de uma vez (pares com profundidade mínima 1 não são cortados)
+        has_point = min_depths > 1
+        points = np.zeros(len(min_depths), dtype=np.int64)
+        points[has_point] = np.random.randint(1, min_depths[has_point])
+
+        children_1, children_2 = [], []
+        for p1, p2, point in zip(parents_1, parents_2, points.tolist()):
+            if point == 0:
+                children_1.append(p1.copy())
+                children_2.append(p2.copy())
+                continue
+            num_qubits = max(p1.count_qubits, p2.count_qubits)
+            children_1.append(Circuit(num_qubits, p1.columns[:point] + p2.columns[point:]))
+            children_2.append(Circuit(num_qubits, p2.columns[:point] + p1.columns[point:]))
+        return children_1, children_2
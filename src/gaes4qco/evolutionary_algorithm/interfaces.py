@@ -1,5 +1,7 @@
 from abc import ABC, abstractmethod
-from typing import Tuple
+from typing import Iterable, Iterator, List, Tuple
+
+import numpy as np
 
 from quantum_circuit.circuit import Circuit
 from .population import Population           # Importamos nossa classe Population
@@ -9,17 +11,31 @@ class ISelectionStrategy(ABC):
     """
     ## Interface para estratégias que selecionam uma sub-população
     ## a partir de uma população existente (ex: seleção de pais).
+    ## As estratégias escolhem índices (podendo repetir) sobre os arrays de fitness
+    ## e fidelidade da população; 'select' apenas monta a população selecionada.
     """
     @abstractmethod
+    def select_indices(self, population: Population) -> np.ndarray:
+        """Recebe uma população e retorna os índices dos indivíduos selecionados, em ordem."""
+        pass
+
     def select(self, population: Population) -> Population:
         """Recebe uma população e retorna uma nova população selecionada."""
-        pass
+        individuals = population.individuals
+        return Population([individuals[i] for i in self.select_indices(population).tolist()])
 
 
 class IPopulationCrossover(ABC):
     def run(self, population: Population) -> Population:
         pass
 
+    def run_stream(self, parents: List[Circuit]) -> Iterator[Circuit]:
+        """
+        ## Gera os descendentes sob demanda, sem montar populações intermediárias.
+        ## Por padrão delega a 'run' (que precisa de todos os pais de uma vez).
+        """
+        yield from self.run(Population(list(parents)))
+
 
 class ICrossoverStrategy(ABC):
     """
@@ -32,6 +48,15 @@ class ICrossoverStrategy(ABC):
         """
         pass
 
+    def crossover_batch(self, parents_1: List[Circuit], parents_2: List[Circuit]) -> Tuple[List[Circuit], List[Circuit]]:
+        """
+        ## Cruza os pares (parents_1[k], parents_2[k]) e retorna as listas de primeiros e
+        ## segundos filhos. Por padrão aplica 'crossover' par a par; as estratégias podem
+        ## sortear todos os pontos de corte de uma vez e montar os filhos com arrays.
+        """
+        children = [self.crossover(p1, p2) for p1, p2 in zip(parents_1, parents_2)]
+        return [c1 for c1, _ in children], [c2 for _, c2 in children]
+
 
 class IMutationPopulation(ABC):
     @abstractmethod
@@ -41,6 +66,13 @@ class IMutationPopulation(ABC):
         """
         pass
 
+    def mutate_stream(self, individuals: Iterable[Circuit]) -> Iterator[Circuit]:
+        """
+        ## Aplica as mutações indivíduo a indivíduo, à medida que são consumidos.
+        ## Por padrão materializa a entrada e delega a 'mutate' (ex: mutação em lote).
+        """
+        yield from self.mutate(Population(list(individuals)))
+
 
 class IMutationStrategy(ABC):
     """
@@ -59,3 +91,17 @@ class IMutationStrategy(ABC):
         ## Recebe um circuito e diz se essa mutação é capaz de ser executada
         """
         pass
+
+    def applicable_mask(self, individuals: List[Circuit]) -> np.ndarray:
+        """
+        ## Máscara booleana com 'can_apply' de cada indivíduo. As estratégias podem
+        ## calculá-la a partir das contagens de genes, sem percorrer os gates.
+        """
+        return np.fromiter((self.can_apply(ind) for ind in individuals), dtype=bool, count=len(individuals))
+
+    def mutate_batch(self, individuals: List[Circuit]) -> List[Circuit]:
+        """
+        ## Aplica a mutação a todos os indivíduos (já copiados pelo chamador). Por padrão
+        ## chama 'mutate_individual' um a um; as estratégias podem sortear tudo de uma vez.
+        """
+        return [self.mutate_individual(ind) for ind in individuals]
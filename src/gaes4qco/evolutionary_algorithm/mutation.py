@@ -1,6 +1,8 @@
 import random
 import math
-from typing import List, Optional
+from typing import Iterable, Iterator, List, Optional
+
+import numpy as np
 from .interfaces import IMutationStrategy, IMutationPopulation
 from .population import Population
 from quantum_circuit.circuit import Circuit, Column
@@ -15,19 +17,56 @@ class RandomMutationSelector(IMutationPopulation):
         self.mutation_rate = mutation_rate
 
     def mutate(self, population: Population) -> Population:
-        mutated_individuals = []
-        for circuit in population.get_individuals():
-            individual_copy = circuit.copy()
+        return Population(list(self.mutate_stream(population)))
+
+    def mutate_stream(self, individuals: Iterable[Circuit]) -> Iterator[Circuit]:
+        for circuit in individuals:
+            # Indivíduos não mutados seguem sem cópia; a cópia dos mutados compartilha as colunas
             if random.random() < self.mutation_rate:
-                applicable_strategies = [s for s in self._strategies if s.can_apply(individual_copy)]
+                applicable_strategies = [s for s in self._strategies if s.can_apply(circuit)]
                 if applicable_strategies:
                     strategy = random.choice(applicable_strategies)
-                    mutated_circuit = strategy.mutate_individual(individual_copy)
-                    mutated_individuals.append(mutated_circuit)
+                    yield strategy.mutate_individual(circuit.copy())
                 else:
-                    mutated_individuals.append(individual_copy)
+                    yield circuit
             else:
-                mutated_individuals.append(individual_copy)
+                yield circuit
+
+
+class BatchMutationSelector(IMutationPopulation):
+    """
+    ## Versão vetorizada de RandomMutationSelector: quem sofre mutação, a aplicabilidade
+    ## de cada estratégia (máscaras booleanas sobre a população) e a estratégia escolhida
+    ## (uniforme entre as aplicáveis) são sorteadas como arrays NumPy; cada estratégia é
+    ## então aplicada de uma vez a todos os seus indivíduos via 'mutate_batch'.
+    ## Mesma semântica, mas consome o gerador do NumPy em vez do 'random'.
+    """
+
+    def __init__(self, mutation_strategies: List[IMutationStrategy], mutation_rate: float = 0.1):
+        self._strategies = mutation_strategies
+        self.mutation_rate = mutation_rate
+
+    def mutate(self, population: Population) -> Population:
+        individuals = population.individuals
+        mutated_individuals = list(individuals)
+        selected = np.flatnonzero(np.random.random(len(individuals)) < self.mutation_rate)
+        if not selected.size or not self._strategies:
+            return Population(mutated_individuals)
+
+        candidates = [individuals[i] for i in selected.tolist()]
+        applicable = np.stack([strategy.applicable_mask(candidates) for strategy in self._strategies])
+        # Estratégia uniforme entre as aplicáveis: a de maior chave aleatória
+        keys = np.where(applicable, np.random.random(applicable.shape), -1.0)
+        chosen = np.where(applicable.any(axis=0), keys.argmax(axis=0), -1)
+
+        for s_idx, strategy in enumerate(self._strategies):
+            members = np.flatnonzero(chosen == s_idx).tolist()
+            if not members:
+                continue
+            # Indivíduos não mutados seguem sem cópia; a cópia dos mutados compartilha as colunas
+            mutated = strategy.mutate_batch([candidates[m].copy() for m in members])
+            for m, circuit in zip(members, mutated):
+                mutated_individuals[selected[m]] = circuit
         return Population(mutated_individuals)
 
 
@@ -81,16 +120,27 @@ class BanditMutationSelector(IMutationPopulation):
         return next(s for s in applicable_strategies if s.__class__.__name__ == best_strategy_name)
 
     def mutate(self, population: Population) -> Population:
-        mutated_individuals = []
-        for circuit in population.get_individuals():
-            individual_copy = circuit.copy()
+        return Population(list(self.mutate_stream(population)))
+
+    def mutate_stream(self, individuals: Iterable[Circuit]) -> Iterator[Circuit]:
+        for circuit in individuals:
             if random.random() < self.mutation_rate:
+                individual_copy = circuit.copy()
                 strategy = self._select_strategy(individual_copy)
 
                 # Avaliação antes e depois da mutação
                 original_fitness, _ = self._fitness_evaluator.evaluate(individual_copy)
+                original_version = individual_copy.version
                 mutated_circuit = strategy.mutate_individual(individual_copy)
-                mutated_fitness, _ = self._fitness_evaluator.evaluate(mutated_circuit)
+                if mutated_circuit.version == original_version:
+                    # A estratégia não alterou o genoma
+                    mutated_fitness = original_fitness
+                elif mutated_circuit.needs_evaluation:
+                    mutated_fitness, mutated_fidelity = self._fitness_evaluator.evaluate(mutated_circuit)
+                    mutated_circuit.set_evaluation(mutated_fitness, mutated_fidelity)
+                else:
+                    # A estratégia já avaliou a versão mutada (ex: GateParameterMutation)
+                    mutated_fitness = mutated_circuit.fitness
 
                 reward = mutated_fitness - original_fitness
 
@@ -100,11 +150,9 @@ class BanditMutationSelector(IMutationPopulation):
                 self._rewards[strategy_name] += reward
                 self._total_applications += 1
 
-                mutated_individuals.append(mutated_circuit)
+                yield mutated_circuit
             else:
-                mutated_individuals.append(individual_copy)
-
-        return Population(mutated_individuals)
+                yield circuit
 
 
 # --- Classes de Estratégia de Mutação Específicas ---
@@ -117,8 +165,23 @@ class SwapColumnsMutation(IMutationStrategy):
         col1_idx, col2_idx = random.sample(range(circuit.depth), 2)
         circuit.columns[col1_idx], circuit.columns[col2_idx] = \
             circuit.columns[col2_idx], circuit.columns[col1_idx]
+        circuit.mark_dirty()
         return circuit
 
+    def applicable_mask(self, individuals: List[Circuit]) -> np.ndarray:
+        return np.array([circuit.depth for circuit in individuals], dtype=np.int64) > 1
+
+    def mutate_batch(self, individuals: List[Circuit]) -> List[Circuit]:
+        # Par ordenado de colunas distintas, uniforme como em random.sample
+        depths = np.array([circuit.depth for circuit in individuals], dtype=np.int64)
+        first = np.random.randint(0, depths)
+        second = np.random.randint(0, depths - 1)
+        second += second >= first
+        for circuit, i, j in zip(individuals, first.tolist(), second.tolist()):
+            circuit.columns[i], circuit.columns[j] = circuit.columns[j], circuit.columns[i]
+            circuit.mark_dirty()
+        return individuals
+
 
 class SingleGateFlipMutation(IMutationStrategy):
     def __init__(self, gate_factory: GateFactory, use_evolutionary_strategy: bool):
@@ -129,15 +192,33 @@ class SingleGateFlipMutation(IMutationStrategy):
         return any(col.gates for col in circuit.columns)
 
     def mutate_individual(self, circuit: Circuit) -> Circuit:
-        non_empty_cols = [(i, col) for i, col in enumerate(circuit.columns) if col.gates]
-        col_idx, target_col = random.choice(non_empty_cols)
+        non_empty_cols = [i for i, col in enumerate(circuit.columns) if col.gates]
+        col_idx = random.choice(non_empty_cols)
+        target_col = circuit.column_for_write(col_idx)
         gate_idx_to_remove = random.randrange(len(target_col.gates))
         removed_gate = target_col.gates.pop(gate_idx_to_remove)
         new_gate = self._gate_factory.build_gate(removed_gate.qubits, self.use_evolutionary_strategy)
         target_col.add_gate(new_gate)
-        circuit.columns[col_idx] = target_col
+        circuit.mark_dirty()
         return circuit
 
+    def applicable_mask(self, individuals: List[Circuit]) -> np.ndarray:
+        return np.array([circuit.get_gene_counts()[0] for circuit in individuals], dtype=np.int64) > 0
+
+    def mutate_batch(self, individuals: List[Circuit]) -> List[Circuit]:
+        non_empty = [[i for i, col in enumerate(circuit.columns) if col.gates] for circuit in individuals]
+        col_picks = np.random.randint(0, np.array([len(cols) for cols in non_empty], dtype=np.int64))
+        col_indices = [cols[pick] for cols, pick in zip(non_empty, col_picks.tolist())]
+        num_gates = np.array([len(c.columns[i].gates) for c, i in zip(individuals, col_indices)], dtype=np.int64)
+        gate_indices = np.random.randint(0, num_gates).tolist()
+
+        for circuit, col_idx, gate_idx in zip(individuals, col_indices, gate_indices):
+            target_col = circuit.column_for_write(col_idx)
+            removed_gate = target_col.gates.pop(gate_idx)
+            target_col.add_gate(self._gate_factory.build_gate(removed_gate.qubits, self.use_evolutionary_strategy))
+            circuit.mark_dirty()
+        return individuals
+
 
 class ChangeDepthMutation(IMutationStrategy):
     """
@@ -174,20 +255,63 @@ class ChangeDepthMutation(IMutationStrategy):
 
         elif actual_change > 0:  # Adiciona colunas
             for _ in range(actual_change):
-                new_column = Column()
-                qubits_free = list(range(circuit.count_qubits))
-                while qubits_free:
-                    try:
-                        new_gate = self._gate_factory.build_gate(qubits_free, self.use_evolutionary_strategy)
-                        new_column.add_gate(new_gate)
-                        for q in new_gate.qubits:
-                            qubits_free.remove(q)
-                    except ValueError:
-                        break  # Não há mais gates que possam ser adicionados
-                circuit.columns.append(new_column)
+                circuit.columns.append(self._random_column(circuit.count_qubits))
 
+        if actual_change != 0:
+            circuit.mark_dirty()
         return circuit
 
+    def _random_column(self, count_qubits: int) -> Column:
+        new_column = Column()
+        qubits_free = list(range(count_qubits))
+        while qubits_free:
+            try:
+                new_gate = self._gate_factory.build_gate(qubits_free, self.use_evolutionary_strategy)
+                new_column.add_gate(new_gate)
+                for q in new_gate.qubits:
+                    qubits_free.remove(q)
+            except ValueError:
+                break  # Não há mais gates que possam ser adicionados
+        return new_column
+
+    def applicable_mask(self, individuals: List[Circuit]) -> np.ndarray:
+        return np.ones(len(individuals), dtype=bool)
+
+    def mutate_batch(self, individuals: List[Circuit]) -> List[Circuit]:
+        count = len(individuals)
+        random_gauss = np.random.standard_normal(count)
+        change = np.where(np.random.random(count) < 0.5, np.ceil(random_gauss), np.floor(random_gauss)).astype(np.int64)
+        is_zero = change == 0
+        change[is_zero] = np.where(np.random.random(int(is_zero.sum())) < 0.5, -1, 1)
+
+        depths = np.array([circuit.depth for circuit in individuals], dtype=np.int64)
+        actual_change = np.clip(depths + change, 1, self.max_depth) - depths
+
+        # Remoção: as colunas de menor chave aleatória de cada circuito, como sorteios sem reposição
+        shrinking = np.flatnonzero(actual_change < 0)
+        rows = np.repeat(np.arange(shrinking.size), depths[shrinking])
+        order = np.lexsort((np.random.random(rows.size), rows))
+        starts = np.cumsum(depths[shrinking]) - depths[shrinking]
+        positions = np.arange(rows.size) - starts[rows]
+        removed = np.zeros(rows.size, dtype=bool)
+        removed[order[positions < -actual_change[shrinking][rows]]] = True
+        for circuit, start, depth in zip([individuals[i] for i in shrinking.tolist()], starts.tolist(), depths[shrinking].tolist()):
+            drop = removed[start:start + depth].tolist()
+            circuit.columns[:] = [col for col, is_removed in zip(circuit.columns, drop) if not is_removed]
+
+        # Adição: as colunas novas de todos os circuitos são geradas em um único lote
+        growing = np.flatnonzero(actual_change > 0)
+        column_qubits = np.repeat([individuals[i].count_qubits for i in growing.tolist()], actual_change[growing])
+        new_columns = iter(self._gate_factory.build_random_columns(column_qubits, self.use_evolutionary_strategy))
+        for i in growing.tolist():
+            circuit = individuals[i]
+            for _ in range(int(actual_change[i])):
+                circuit.columns.append(Column(next(new_columns)))
+
+        for i in np.flatnonzero(actual_change != 0).tolist():
+            individuals[i].mark_dirty()
+        return individuals
+
 
 class GateParameterMutation(IMutationStrategy):
     """
@@ -216,35 +340,80 @@ class GateParameterMutation(IMutationStrategy):
                     mutable_params.append((i_col, i_gate, i_param))
         original_fitness, _ = self._fitness_evaluator.evaluate(circuit)
 
-        # Escolhe um parâmetro e o modifica
+        # Escolhe um parâmetro e o modifica (em uma cópia exclusiva da coluna, com seus StepSizes)
         i_col, i_gate, i_param = random.choice(mutable_params)
-        target_gate = circuit.columns[i_col].gates[i_gate]
+        target_gate = circuit.column_for_write(i_col).gates[i_gate]
         if any(gate.steps_sizes for col in circuit.columns for gate in col.get_gates()):
             step_size = target_gate.steps_sizes[i_param]
 
             # Modifica o ângulo
             change = random.gauss(0, step_size.sigma)
             target_gate.parameters[i_param] = (target_gate.parameters[i_param] + change) % (2 * math.pi)
-            circuit.columns[i_col].gates[i_gate] = target_gate
-            # Avalia o fitness DEPOIS da mutação
-            mutated_fitness, _ = self._fitness_evaluator.evaluate(circuit)
-
-            # Regra de 1/5 de sucesso para atualizar o StepSize
-            success = mutated_fitness > original_fitness
-            step_size.history.append(int(success))
-            if len(step_size.history) > step_size.history_len:
-                step_size.history.pop(0)
-
-            success_rate = sum(step_size.history) / len(step_size.history)
-            if success_rate > 1 / 5:
-                step_size.sigma /= self._c_factor
-            elif success_rate < 1 / 5:
-                step_size.sigma *= self._c_factor
+            circuit.mark_dirty()
+            # Avalia o fitness DEPOIS da mutação e registra o resultado, evitando uma nova simulação
+            mutated_fitness, mutated_fidelity = self._fitness_evaluator.evaluate(circuit)
+            circuit.set_evaluation(mutated_fitness, mutated_fidelity)
+
+            self._update_step_size(step_size, mutated_fitness > original_fitness)
         else:
             target_gate.parameters[i_param] = (target_gate.parameters[i_param] + random.gauss(0, math.pi / 4)) % (2 * math.pi)
-            circuit.columns[i_col].gates[i_gate] = target_gate
+            circuit.mark_dirty()
         return circuit
 
+    def _update_step_size(self, step_size, success: bool):
+        # Regra de 1/5 de sucesso para atualizar o StepSize
+        step_size.history.append(int(success))
+        if len(step_size.history) > step_size.history_len:
+            step_size.history.pop(0)
+
+        success_rate = sum(step_size.history) / len(step_size.history)
+        if success_rate > 1 / 5:
+            step_size.sigma /= self._c_factor
+        elif success_rate < 1 / 5:
+            step_size.sigma *= self._c_factor
+
+    def applicable_mask(self, individuals: List[Circuit]) -> np.ndarray:
+        return np.array([circuit.get_gene_counts()[1] for circuit in individuals], dtype=np.int64) > 0
+
+    def mutate_batch(self, individuals: List[Circuit]) -> List[Circuit]:
+        mutable_params = [
+            [
+                (i_col, i_gate, i_param)
+                for i_col, col in enumerate(circuit.columns)
+                for i_gate, gate in enumerate(col.get_gates())
+                for i_param in range(len(gate.parameters))
+            ]
+            for circuit in individuals
+        ]
+        picks = np.random.randint(0, np.array([len(params) for params in mutable_params], dtype=np.int64)).tolist()
+        noise = np.random.standard_normal(len(individuals)).tolist()
+        uses_steps = [
+            any(gate.steps_sizes for col in circuit.columns for gate in col.get_gates()) for circuit in individuals
+        ]
+
+        # Fitness antes e depois da mutação avaliados em lote, só para quem usa a regra de 1/5
+        evolving = [circuit for circuit, steps in zip(individuals, uses_steps) if steps]
+        original_results = self._fitness_evaluator.evaluate_many(evolving)
+
+        step_sizes = []
+        for circuit, params, pick, z, steps in zip(individuals, mutable_params, picks, noise, uses_steps):
+            i_col, i_gate, i_param = params[pick]
+            target_gate = circuit.column_for_write(i_col).gates[i_gate]
+            if steps:
+                step_size = target_gate.steps_sizes[i_param]
+                target_gate.parameters[i_param] = (target_gate.parameters[i_param] + z * step_size.sigma) % (2 * math.pi)
+                step_sizes.append(step_size)
+            else:
+                target_gate.parameters[i_param] = (target_gate.parameters[i_param] + z * math.pi / 4) % (2 * math.pi)
+            circuit.mark_dirty()
+
+        mutated_results = self._fitness_evaluator.evaluate_many(evolving)
+        for circuit, step_size, (original_fitness, _), (mutated_fitness, mutated_fidelity) in zip(
+                evolving, step_sizes, original_results, mutated_results):
+            circuit.set_evaluation(mutated_fitness, mutated_fidelity)
+            self._update_step_size(step_size, mutated_fitness > original_fitness)
+        return individuals
+
 
 class SwapControlTargetMutation(IMutationStrategy):
     """
@@ -266,7 +435,7 @@ class SwapControlTargetMutation(IMutationStrategy):
 
         # Escolhe um gate
         i_col, i_gate = random.choice(mutable_gates)
-        target_gate = circuit.columns[i_col].gates[i_gate]
+        target_gate = circuit.column_for_write(i_col).gates[i_gate]
 
         num_controls = target_gate.extra_controls
 
@@ -285,5 +454,35 @@ class SwapControlTargetMutation(IMutationStrategy):
         new_qubits[idx_control], new_qubits[idx_target] = new_qubits[idx_target], new_qubits[idx_control]
 
         target_gate.qubits = new_qubits
-        circuit.columns[i_col].gates[i_gate] = target_gate
+        circuit.mark_dirty()
         return circuit
+
+    def applicable_mask(self, individuals: List[Circuit]) -> np.ndarray:
+        return np.array([circuit.get_gene_counts()[2] for circuit in individuals], dtype=np.int64) > 0
+
+    def mutate_batch(self, individuals: List[Circuit]) -> List[Circuit]:
+        mutable_gates = [
+            [
+                (i_col, i_gate)
+                for i_col, col in enumerate(circuit.columns)
+                for i_gate, gate in enumerate(col.get_gates())
+                if gate.extra_controls > 0
+            ]
+            for circuit in individuals
+        ]
+        picks = np.random.randint(0, np.array([len(gates) for gates in mutable_gates], dtype=np.int64)).tolist()
+        chosen = [gates[pick] for gates, pick in zip(mutable_gates, picks)]
+        gates = [circuit.columns[i_col].gates[i_gate] for circuit, (i_col, i_gate) in zip(individuals, chosen)]
+        num_controls = np.array([gate.extra_controls for gate in gates], dtype=np.int64)
+        num_targets = np.array([len(gate.qubits) for gate in gates], dtype=np.int64) - num_controls
+        # Posições do controle e do alvo trocados (os qubits de um gate são distintos)
+        control_positions = np.random.randint(0, num_controls).tolist()
+        target_positions = (num_controls + np.random.randint(0, num_targets)).tolist()
+
+        for circuit, (i_col, i_gate), idx_control, idx_target in zip(individuals, chosen, control_positions, target_positions):
+            target_gate = circuit.column_for_write(i_col).gates[i_gate]
+            new_qubits = list(target_gate.qubits)
+            new_qubits[idx_control], new_qubits[idx_target] = new_qubits[idx_target], new_qubits[idx_control]
+            target_gate.qubits = new_qubits
+            circuit.mark_dirty()
+        return individuals
@@ -1,7 +1,9 @@
-from itertools import combinations
-from typing import List, Iterator
+from typing import Dict, List, Iterator, Optional, Sequence, Tuple
+
+import numpy as np
 
 from analysis.distance_metrics import StructuralJaccardDistance
+from analysis.interfaces import IDistanceMetric
 from quantum_circuit.circuit import Circuit
 
 
@@ -10,55 +12,148 @@ class Population:
     Encapsula uma coleção de indivíduos (Circuitos) e fornece
     operações úteis sobre o conjunto.
     """
+    # Total de populações criadas no processo (métrica de alocação por geração)
+    instance_count: int = 0
+
     def __init__(self, individuals: List[Circuit] = None):
+        Population.instance_count += 1
         self._individuals = individuals if individuals is not None else []
         self._distance_metric = StructuralJaccardDistance()
+        # Diversidade calculada para a composição '_diversity_signature' (métrica, ids e versões dos indivíduos)
+        self._diversity: Optional[float] = None
+        self._diversity_signature: Optional[Tuple] = None
+        # Metadados dos indivíduos em arrays contíguos, montados na época '_metadata_epoch' e válidos
+        # enquanto nenhum indivíduo desta população for alterado depois dela
+        self._metadata: Optional[Dict[str, np.ndarray]] = None
+        self._metadata_epoch: int = -1
 
     def add_individual(self, individual: Circuit):
         """Adiciona um indivíduo à população."""
         self._individuals.append(individual)
+        self._metadata = None
 
     def get_fittest(self) -> Circuit:
         """Encontra e retorna o indivíduo com o maior fitness."""
         if not self._individuals:
             raise ValueError("A população está vazia, não é possível encontrar o mais apto.")
-        return max(self._individuals, key=lambda ind: ind.fitness)
+        return self._individuals[int(np.argmax(self.fitness_values))]
 
     def get_individuals(self) -> List[Circuit]:
-        """Retorna a lista de todos os indivíduos."""
+        """Retorna uma cópia da lista de indivíduos (para quem precisa alterá-la)."""
         return list(self._individuals)
 
+    @property
+    def individuals(self) -> Sequence[Circuit]:
+        """Lista interna de indivíduos, sem cópia. Somente leitura: não deve ser alterada."""
+        return self._individuals
+
     @property
     def average_fitness(self) -> float:
         """Calcula e retorna a média do fitness da população."""
         if not self._individuals:
             return 0.0
-        total_fitness = sum(ind.fitness for ind in self._individuals)
-        return total_fitness / len(self._individuals)
+        return float(self.fitness_values.mean())
+
+    def _metadata_is_current(self) -> bool:
+        """Alterações em circuitos de outras populações avançam o relógio global, mas não invalidam estes arrays."""
+        if self._metadata_epoch == Circuit.metadata_epoch:
+            return True
+        return all(ind.last_metadata_epoch <= self._metadata_epoch for ind in self._individuals)
+
+    def _get_metadata(self) -> Dict[str, np.ndarray]:
+        """
+        Monta, em uma única passada, os arrays (somente leitura) de fitness, fitness ajustado,
+        fidelidade, profundidade, rank e distância de multidão, alinhados com os indivíduos.
+        """
+        if self._metadata is not None and self._metadata_is_current():
+            return self._metadata
+        count = len(self._individuals)
+        table = np.array([
+            (ind.fitness, ind.shaped_fitness, ind.fidelity, ind.depth, ind.rank, ind.crowding_distance)
+            for ind in self._individuals
+        ], dtype=np.float64).reshape(count, 6)
+        # Cada campo em um bloco contíguo; somente leitura antes de criar as visões das linhas
+        table = np.ascontiguousarray(table.T)
+        table.flags.writeable = False
+        metadata = {
+            "fitness": table[0],
+            "shaped_fitness": table[1],
+            "fidelity": table[2],
+            "depth": table[3].astype(np.int64),
+            "rank": table[4].astype(np.int64),
+            "crowding_distance": table[5],
+        }
+        for values in metadata.values():
+            values.flags.writeable = False
+        self._metadata = metadata
+        self._metadata_epoch = Circuit.metadata_epoch
+        return metadata
+
+    @property
+    def fitness_values(self) -> np.ndarray:
+        return self._get_metadata()["fitness"]
+
+    @property
+    def shaped_fitness_values(self) -> np.ndarray:
+        return self._get_metadata()["shaped_fitness"]
+
+    @property
+    def fidelity_values(self) -> np.ndarray:
+        return self._get_metadata()["fidelity"]
+
+    @property
+    def depth_values(self) -> np.ndarray:
+        return self._get_metadata()["depth"]
+
+    @property
+    def rank_values(self) -> np.ndarray:
+        return self._get_metadata()["rank"]
+
+    @property
+    def crowding_distance_values(self) -> np.ndarray:
+        return self._get_metadata()["crowding_distance"]
 
-    def calculate_structural_diversity(self) -> float:
+    @property
+    def genome_hashes(self) -> np.ndarray:
+        """
+        Hash (int64) da forma canônica de cada indivíduo. Válido apenas neste processo;
+        calculado sob demanda e guardado junto com os demais metadados.
+        """
+        metadata = self._get_metadata()
+        hashes = metadata.get("genome_hash")
+        if hashes is None:
+            hashes = np.fromiter(
+                (hash(ind.get_canonical_key()) for ind in self._individuals),
+                dtype=np.int64, count=len(self._individuals)
+            )
+            hashes.flags.writeable = False
+            metadata["genome_hash"] = hashes
+        return hashes
+
+    def calculate_structural_diversity(self, distance_metric: Optional[IDistanceMetric] = None) -> float:
         """
         Calcula a diversidade estrutural média da população.
-        Usa a distância de Jaccard, que mede a dissimilaridade entre conjuntos.
+        Usa a distância de Jaccard, que mede a dissimilaridade entre conjuntos
+        (exata por padrão, ou a métrica recebida, ex: a estimativa MinHash).
         O valor varia de 0 (todos os indivíduos são clones) a 1 (todos são completamente diferentes).
         """
         if len(self._individuals) < 2:
             return 0.0
 
-        total_distance = 0.0
-        # Cria todas as combinações de pares únicos de indivíduos
-        pairs = list(combinations(self._individuals, 2))
-
-        for ind1, ind2 in pairs:
-            total_distance += self._distance_metric.calculate(ind1, ind2)
-
-        # Retorna a média da distância entre todos os pares
-        return total_distance / len(pairs)
+        # O valor é reaproveitado enquanto a população e os genomas não mudam
+        # (o otimizador e o observador calculam a diversidade da mesma geração)
+        metric = distance_metric or self._distance_metric
+        signature = (id(metric),) + tuple((id(ind), ind.version) for ind in self._individuals)
+        if signature != self._diversity_signature:
+            # Média da distância entre todos os pares únicos
+            self._diversity = metric.calculate_mean(self._individuals)
+            self._diversity_signature = signature
+        return self._diversity
 
     def remove_duplicates(self):
         """
         Verifica e remove circuitos duplicados da população com base em sua
-        assinatura genética (estrutura e parâmetros).
+        assinatura genética (estrutura e parâmetros), na forma canônica.
         """
         if not self._individuals:
             return
@@ -66,18 +161,20 @@ class Population:
         seen_signatures = set()
         unique_individuals = []
         for individual in self._individuals:
-            signature = tuple(individual.get_structural_representation())
+            signature = individual.get_canonical_key()
             if signature not in seen_signatures:
                 seen_signatures.add(signature)
                 unique_individuals.append(individual)
 
         self._individuals = unique_individuals
+        self._metadata = None
 
     def without_duplicates(self) -> "Population":
+        """Retorna uma nova população mantendo o primeiro indivíduo de cada forma canônica."""
         seen_signatures = set()
         unique_individuals = []
         for individual in self._individuals:
-            signature = frozenset(individual.get_structural_representation())
+            signature = individual.get_canonical_key()
             if signature not in seen_signatures:
                 seen_signatures.add(signature)
                 unique_individuals.append(individual)
@@ -89,4 +186,7 @@ class Population:
 
     def __iter__(self) -> Iterator[Circuit]:
         """Permite iterar sobre os indivíduos: for circuit in population_object:"""
-        return iter(self.get_individuals())
+        return iter(self._individuals)
+
+    def __getitem__(self, index: int) -> Circuit:
+        return self._individuals[index]
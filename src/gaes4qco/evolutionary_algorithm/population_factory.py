@@ -9,8 +9,10 @@ class PopulationFactory:
     Responsável por criar uma instância de Population com indivíduos
     gerados aleatoriamente.
     """
-    def __init__(self, circuit_factory: CircuitFactory):
+    def __init__(self, circuit_factory: CircuitFactory, bulk_generation: bool = False):
         self._circuit_factory = circuit_factory
+        # Gera todos os circuitos com sorteios do NumPy em lote, em vez de um a um com o 'random'
+        self._bulk_generation = bulk_generation
 
     def create(
         self,
@@ -26,6 +28,15 @@ class PopulationFactory:
         if population_size == 0:
             raise ValueError("Population size cannot be zero")
 
+        if self._bulk_generation:
+            return Population(self._circuit_factory.create_random_circuits(
+                count=population_size,
+                num_qubits=num_qubits,
+                max_depth=max_depth,
+                min_depth=min_depth,
+                use_evolutionary_strategy=use_evolutionary_strategy
+            ))
+
         individuals = []
         for _ in range(population_size):
             circuit = self._circuit_factory.create_random_circuit(
@@ -1,8 +1,11 @@
+import bisect
 import random
 from abc import ABC, abstractmethod
 from typing import List
 from enum import Enum
 
+import numpy as np
+
 from quantum_circuit.circuit import Circuit
 from .interfaces import ISelectionStrategy
 from .population import Population
@@ -15,22 +18,34 @@ class SelectionType(Enum):
     NSGA2 = "nsga2"
 
 
+def _top_indices(values: np.ndarray, count: int) -> np.ndarray:
+    """Índices dos 'count' maiores valores, em ordem decrescente (argpartition + ordenação apenas dos escolhidos)."""
+    count = min(count, len(values))
+    if count <= 0:
+        return np.zeros(0, dtype=np.int64)
+    if count < len(values):
+        top = np.argpartition(-values, count - 1)[:count]
+    else:
+        top = np.arange(len(values))
+    return top[np.argsort(-values[top], kind="stable")]
+
+
+def _tournament_winners(fitness: np.ndarray, candidates: np.ndarray, tournament_size: int, num_tournaments: int) -> np.ndarray:
+    """Sorteia 'num_tournaments' torneios (matriz de índices com reposição) entre 'candidates' e retorna os vencedores."""
+    groups = candidates[np.random.randint(0, len(candidates), size=(num_tournaments, min(tournament_size, len(candidates))))]
+    return groups[np.arange(num_tournaments), np.argmax(fitness[groups], axis=1)]
+
+
 class TournamentParentSelection(ISelectionStrategy):
     def __init__(self, population_size: int, tournament_size: int):
         self.population_size = population_size
         self.tournament_size = tournament_size
 
-    def select(self, population: Population) -> Population:
+    def select_indices(self, population: Population) -> np.ndarray:
         if not population:
-            return Population()
-
-        individuals = population.get_individuals()
-        next_gen_parents = []
-        for _ in range(self.population_size):
-            group = random.sample(individuals, min(self.tournament_size, len(individuals)))
-            champion = max(group, key=lambda ind: ind.fitness)
-            next_gen_parents.append(champion)
-        return Population(next_gen_parents)
+            return np.zeros(0, dtype=np.int64)
+        fitness = population.shaped_fitness_values
+        return _tournament_winners(fitness, np.arange(len(fitness)), self.tournament_size, self.population_size)
 
 
 class TournamentSurvivorSelection(ISelectionStrategy):
@@ -39,36 +54,38 @@ class TournamentSurvivorSelection(ISelectionStrategy):
         self.tournament_size = tournament_size
         self.elitism_count = elitism_count
 
-    def select(self, population: Population) -> Population:
+    def select_indices(self, population: Population) -> np.ndarray:
         if not population:
-            return Population()
+            return np.zeros(0, dtype=np.int64)
 
-        individuals = population.get_individuals()
-        sorted_population = sorted(individuals, key=lambda ind: ind.fidelity, reverse=True)
+        fitness = population.shaped_fitness_values
+        elites = _top_indices(population.fidelity_values, self.elitism_count)
+        available = np.ones(len(fitness), dtype=bool)
+        available[elites] = False
+        survivors = [elites]
+        num_survivors = len(elites)
 
-        elites = sorted_population[:self.elitism_count]
-        competitors = sorted_population[self.elitism_count:]
-        survivors = elites[:]
+        # Cada rodada sorteia um torneio por vaga restante; vencedores repetidos ficam para a próxima
+        while num_survivors < self.population_size and available.any():
+            competitors = np.flatnonzero(available)
+            winners = _tournament_winners(fitness, competitors, self.tournament_size, self.population_size - num_survivors)
+            _, first = np.unique(winners, return_index=True)
+            winners = winners[np.sort(first)]
+            survivors.append(winners)
+            available[winners] = False
+            num_survivors += len(winners)
 
-        while len(survivors) < self.population_size and competitors:
-            group = random.sample(competitors, min(self.tournament_size, len(competitors)))
-            champion = max(group, key=lambda ind: ind.fitness)
-            survivors.append(champion)
-            competitors.remove(champion)
-
-        return Population(survivors)
+        return np.concatenate(survivors)
 
 
 class RandomParentSelection(ISelectionStrategy):
     def __init__(self, population_size: int):
         self.population_size = population_size
 
-    def select(self, population: Population) -> Population:
+    def select_indices(self, population: Population) -> np.ndarray:
         if not population:
-            return Population()
-        individuals = population.get_individuals()
-        selected = random.choices(individuals, k=self.population_size)
-        return Population(selected)
+            return np.zeros(0, dtype=np.int64)
+        return np.random.randint(0, len(population), size=self.population_size)
 
 
 class RandomSurvivorSelection(ISelectionStrategy):
@@ -76,34 +93,34 @@ class RandomSurvivorSelection(ISelectionStrategy):
         self.population_size = population_size
         self.elitism_count = elitism_count
 
-    def select(self, population: Population) -> Population:
+    def select_indices(self, population: Population) -> np.ndarray:
         if not population:
-            return Population()
+            return np.zeros(0, dtype=np.int64)
+
+        elites = _top_indices(population.fidelity_values, self.elitism_count)
+        remaining_slots = max(0, self.population_size - len(elites))
+        sampled = np.random.choice(len(population), min(remaining_slots, len(population)), replace=False)
+        return np.concatenate([elites, sampled])
 
-        individuals = population.get_individuals()
-        elites = sorted(individuals, key=lambda ind: ind.fidelity, reverse=True)[:self.elitism_count]
-        remaining_slots = self.population_size - len(elites)
-        survivors = elites + random.sample(individuals, min(remaining_slots, len(individuals)))
-        return Population(survivors)
+
+def _roulette(fitness: np.ndarray, candidates: np.ndarray, count: int) -> np.ndarray:
+    """Sorteia 'count' candidatos com reposição, proporcionalmente ao fitness (uniforme se o total for zero)."""
+    total_fitness = fitness[candidates].sum()
+    if total_fitness == 0:
+        # fallback: random uniforme
+        return candidates[np.random.randint(0, len(candidates), size=count)]
+    return np.random.choice(candidates, size=count, p=fitness[candidates] / total_fitness)
 
 
 class RouletteParentSelection(ISelectionStrategy):
     def __init__(self, population_size: int):
         self.population_size = population_size
 
-    def select(self, population: Population) -> Population:
+    def select_indices(self, population: Population) -> np.ndarray:
         if not population:
-            return Population()
-
-        individuals = population.get_individuals()
-        total_fitness = sum(ind.fitness for ind in individuals)
-        if total_fitness == 0:
-            # fallback: random uniforme
-            selected = random.choices(individuals, k=self.population_size)
-        else:
-            weights = [ind.fitness / total_fitness for ind in individuals]
-            selected = random.choices(individuals, weights=weights, k=self.population_size)
-        return Population(selected)
+            return np.zeros(0, dtype=np.int64)
+        fitness = population.shaped_fitness_values
+        return _roulette(fitness, np.arange(len(fitness)), self.population_size)
 
 
 class RouletteSurvivorSelection(ISelectionStrategy):
@@ -111,25 +128,20 @@ class RouletteSurvivorSelection(ISelectionStrategy):
         self.population_size = population_size
         self.elitism_count = elitism_count
 
-    def select(self, population: Population) -> Population:
+    def select_indices(self, population: Population) -> np.ndarray:
         if not population:
-            return Population()
+            return np.zeros(0, dtype=np.int64)
 
-        individuals = population.get_individuals()
-        elites = sorted(individuals, key=lambda ind: ind.fidelity, reverse=True)[:self.elitism_count]
+        fitness = population.shaped_fitness_values
+        elites = _top_indices(population.fidelity_values, self.elitism_count)
+        is_competitor = np.ones(len(fitness), dtype=bool)
+        is_competitor[elites] = False
+        competitors = np.flatnonzero(is_competitor)
 
-        competitors = [ind for ind in individuals if ind not in elites]
-        total_fitness = sum(ind.fitness for ind in competitors)
-
-        survivors = list(elites)
-
-        if total_fitness == 0:
-            survivors.extend(random.choices(competitors, k=self.population_size - len(survivors)))
-        else:
-            weights = [ind.fitness / total_fitness for ind in competitors]
-            survivors.extend(random.choices(competitors, weights=weights, k=self.population_size - len(survivors)))
-
-        return Population(survivors)
+        remaining_slots = self.population_size - len(elites)
+        if remaining_slots <= 0 or not len(competitors):
+            return elites
+        return np.concatenate([elites, _roulette(fitness, competitors, remaining_slots)])
 
 
 class IMultiObjectiveService(ABC):
@@ -156,38 +168,75 @@ class IMultiObjectiveService(ABC):
 
 
 class NSGA2Service(IMultiObjectiveService):
-    """Core NSGA-II operators (non-dominated sort, dominance check, crowding distance)."""
+    """
+    ## Operadores do NSGA-II (ordenação não dominada, dominância e distância de multidão).
+    ## Os objetivos são extraídos uma única vez para um array NumPy (N x M):
+    ## - com dois objetivos (fidelidade, -profundidade), as fronteiras saem de uma varredura
+    ##   em O(N log N): em ordem decrescente do 1º objetivo, cada ponto entra na primeira
+    ##   fronteira cujo último ponto tem o 2º objetivo menor que o seu (busca binária);
+    ## - com mais objetivos, usa a Efficient Non-dominated Sort (ENS-SS), comparando cada
+    ##   ponto de uma vez com todos os membros de cada fronteira.
+    ## Pontos com objetivos idênticos não se dominam e ficam na mesma fronteira; dentro de
+    ## cada fronteira os indivíduos seguem a ordem de entrada.
+    """
 
     def non_dominated_sort(self, individuals: List[Circuit]) -> List[List[Circuit]]:
-        fronts = [[]]
-        for p in individuals:
-            p.domination_count = 0
-            p.dominated_solutions = []
-            for q in individuals:
-                if p is q:
-                    continue
-                if self.dominates(p, q):
-                    p.dominated_solutions.append(q)
-                elif self.dominates(q, p):
-                    p.domination_count += 1
-            if p.domination_count == 0:
-                p.rank = 0
-                fronts[0].append(p)
-
-        i = 0
-        while i < len(fronts) and fronts[i]:
-            next_front = []
-            for p in fronts[i]:
-                for q in p.dominated_solutions:
-                    q.domination_count -= 1
-                    if q.domination_count == 0:
-                        q.rank = i + 1
-                        next_front.append(q)
-            i += 1
-            if next_front:
-                fronts.append(next_front)
+        if not individuals:
+            return [[]]
+        objectives = np.array([ind.objectives for ind in individuals], dtype=float)
+        ranks = self.front_ranks(objectives)
+        fronts: List[List[Circuit]] = [[] for _ in range(int(ranks.max()) + 1)]
+        for individual, rank in zip(individuals, ranks.tolist()):
+            individual.rank = rank
+            fronts[rank].append(individual)
         return fronts
 
+    def front_ranks(self, objectives: np.ndarray) -> np.ndarray:
+        """Índice da fronteira de cada linha de 'objectives' (todos os objetivos são maximizados)."""
+        # Objetivos idênticos recebem a mesma fronteira: ordena apenas os pontos distintos
+        unique_points, inverse = np.unique(objectives, axis=0, return_inverse=True)
+        # Ordem lexicográfica decrescente: nenhum ponto é dominado por um ponto posterior
+        order = np.lexsort(-unique_points.T[::-1])
+        if unique_points.shape[1] == 2:
+            unique_ranks = self._sweep_two_objectives(unique_points[order])
+        else:
+            unique_ranks = self._efficient_non_dominated_sort(unique_points[order])
+        ranks = np.empty(len(unique_points), dtype=np.int64)
+        ranks[order] = unique_ranks
+        return ranks[inverse.reshape(-1)]
+
+    @staticmethod
+    def _sweep_two_objectives(points: np.ndarray) -> np.ndarray:
+        # 'last_second[k]' é o 2º objetivo do último ponto da fronteira k (decrescente em k);
+        # um ponto só não é dominado pela fronteira k se tiver o 2º objetivo maior que ele
+        negated_last_second: List[float] = []
+        ranks = np.empty(len(points), dtype=np.int64)
+        for i, second in enumerate(points[:, 1].tolist()):
+            rank = bisect.bisect_right(negated_last_second, -second)
+            if rank == len(negated_last_second):
+                negated_last_second.append(-second)
+            else:
+                negated_last_second[rank] = -second
+            ranks[i] = rank
+        return ranks
+
+    @staticmethod
+    def _efficient_non_dominated_sort(points: np.ndarray) -> np.ndarray:
+        fronts: List[List[int]] = []
+        ranks = np.empty(len(points), dtype=np.int64)
+        for i, point in enumerate(points):
+            rank = 0
+            while rank < len(fronts):
+                members = points[fronts[rank]]
+                if not np.any(np.all(members >= point, axis=1) & np.any(members > point, axis=1)):
+                    break
+                rank += 1
+            if rank == len(fronts):
+                fronts.append([])
+            fronts[rank].append(i)
+            ranks[i] = rank
+        return ranks
+
     def dominates(self, p: Circuit, q: Circuit) -> bool:
         p_objectives, q_objectives = p.objectives, q.objectives
         at_least_one_better = any(p_obj > q_obj for p_obj, q_obj in zip(p_objectives, q_objectives))
@@ -195,22 +244,29 @@ class NSGA2Service(IMultiObjectiveService):
         return at_least_one_better and none_worse
 
     def crowding_distance_assignment(self, front: List[Circuit]):
+        """
+        Calcula a distância de multidão de toda a fronteira de forma vetorizada.
+        Como na versão por objetivo, a fronteira termina ordenada (de forma estável)
+        pelo último objetivo, a partir da ordem pelos objetivos anteriores.
+        """
         if not front:
             return
-        for ind in front:
-            ind.crowding_distance = 0.0
-        num_objectives = len(front[0].objectives)
-        for m in range(num_objectives):
-            front.sort(key=lambda x: x.objectives[m])
-            front[0].crowding_distance = float('inf')
-            front[-1].crowding_distance = float('inf')
-            min_obj, max_obj = front[0].objectives[m], front[-1].objectives[m]
-            range_obj = max_obj - min_obj
+        objectives = np.array([ind.objectives for ind in front], dtype=float)
+        distances = np.zeros(len(front))
+        order = np.arange(len(front))
+        for m in range(objectives.shape[1]):
+            order = order[np.argsort(objectives[order, m], kind="stable")]
+            values = objectives[order, m]
+            distances[order[0]] = float('inf')
+            distances[order[-1]] = float('inf')
+            range_obj = values[-1] - values[0]
             if range_obj == 0:
                 continue
-            for i in range(1, len(front) - 1):
-                distance = front[i + 1].objectives[m] - front[i - 1].objectives[m]
-                front[i].crowding_distance += distance / range_obj
+            distances[order[1:-1]] += (values[2:] - values[:-2]) / range_obj
+
+        front[:] = [front[i] for i in order]
+        for individual, distance in zip(front, distances[order].tolist()):
+            individual.crowding_distance = distance
 
 
 class NSGA2SurvivorSelection(ISelectionStrategy):
@@ -219,26 +275,29 @@ class NSGA2SurvivorSelection(ISelectionStrategy):
         self.elitism_count = max(elitism_count, 1)
         self._nsga2 = nsga2_service
 
-    def select(self, population: Population) -> Population:
-        individuals = population.get_individuals()
+    def select_indices(self, population: Population) -> np.ndarray:
+        individuals = population.individuals
         if not individuals:
-            return Population()
+            return np.zeros(0, dtype=np.int64)
 
-        sorted_by_fidelity = sorted(individuals, key=lambda ind: ind.fidelity, reverse=True)
+        sorted_by_fidelity = np.argsort(-population.fidelity_values, kind="stable")
         elites = sorted_by_fidelity[:self.elitism_count]
 
-        remaining = sorted_by_fidelity[self.elitism_count:]
-        fronts = self._nsga2.non_dominated_sort(remaining)
+        remaining = sorted_by_fidelity[self.elitism_count:].tolist()
+        index_of = {id(individuals[i]): i for i in remaining}
+        fronts = self._nsga2.non_dominated_sort([individuals[i] for i in remaining])
 
-        survivors = list(elites)
+        survivors = [elites]
+        num_survivors = len(elites)
         for front in fronts:
-            if len(survivors) + len(front) <= self.population_size:
-                survivors.extend(front)
+            if num_survivors + len(front) <= self.population_size:
+                survivors.append(np.array([index_of[id(ind)] for ind in front], dtype=np.int64))
+                num_survivors += len(front)
             else:
                 self._nsga2.crowding_distance_assignment(front)
                 front.sort(key=lambda x: x.crowding_distance, reverse=True)
-                needed = self.population_size - len(survivors)
-                survivors.extend(front[:needed])
+                needed = self.population_size - num_survivors
+                survivors.append(np.array([index_of[id(ind)] for ind in front[:needed]], dtype=np.int64))
                 break
 
-        return Population(survivors)
+        return np.concatenate(survivors)
@@ -1,5 +1,5 @@
 import enum
-from dataclasses import dataclass, field, asdict, is_dataclass
+from dataclasses import dataclass, field, fields, asdict, is_dataclass, MISSING
 from typing import List, Any, Optional, Generator
 from pathlib import Path
 import json
@@ -10,6 +10,25 @@ from shared.value_objects import CrossoverType
 
 PROJECT_ROOT = Path(__file__).resolve().parents[3]
 
+# Campos marcados com estes metadados só entram no hash da configuração quando diferem
+# do valor padrão. Assim, novas opções não alteram o hash (e as pastas de resultado/
+# checkpoints) dos experimentos que não as utilizam.
+HASH_WHEN_SET = {"hash_when_set": True}
+
+
+def _hash_neutral_defaults(cls) -> dict:
+    """Retorna {nome: default} dos campos de 'cls' marcados com HASH_WHEN_SET."""
+    return {
+        f.name: f.default_factory() if f.default is MISSING else f.default
+        for f in fields(cls) if f.metadata.get("hash_when_set")
+    }
+
+
+def _drop_unset_fields(data: dict, cls) -> dict:
+    """Remove de 'data' os campos HASH_WHEN_SET que estão com o valor padrão."""
+    defaults = _hash_neutral_defaults(cls)
+    return {k: v for k, v in data.items() if not (k in defaults and v == defaults[k])}
+
 
 @dataclass
 class PhaseConfig:
@@ -24,6 +43,12 @@ class PhaseConfig:
     crossover_strategy: CrossoverType
     generations: int
     fidelity_threshold_stop: Optional[float]
+    use_surrogate_screening: bool = field(default=False, metadata=HASH_WHEN_SET)
+    # Ignorado quando use_surrogate_screening está ativo (um único filtro por fase)
+    use_multi_fidelity: bool = field(default=False, metadata=HASH_WHEN_SET)
+    use_phenotype_dedup: bool = field(default=False, metadata=HASH_WHEN_SET)
+    # Substitui os piores indivíduos do início da fase por pontos do arquivo de Pareto (requer pareto_archive_size)
+    seed_from_pareto_archive: bool = field(default=False, metadata=HASH_WHEN_SET)
 
 
 @dataclass
@@ -53,6 +78,44 @@ class ExperimentConfig:
     sharing_radius: float = 0.3
     alpha: float = 1.0
     c_factor: float = 1.2   # StepSize
+    surrogate_top_fraction: float = field(default=0.3, metadata=HASH_WHEN_SET)
+    surrogate_exploration_rate: float = field(default=0.1, metadata=HASH_WHEN_SET)
+    surrogate_min_samples: int = field(default=50, metadata=HASH_WHEN_SET)
+    # "columns" (simula só as primeiras colunas) ou "amplitudes" (simula o estado inteiro; não economiza simulação)
+    multi_fidelity_proxy: str = field(default="columns", metadata=HASH_WHEN_SET)
+    multi_fidelity_margin: float = field(default=0.05, metadata=HASH_WHEN_SET)
+    multi_fidelity_amplitude_fraction: float = field(default=0.5, metadata=HASH_WHEN_SET)
+    multi_fidelity_max_columns: int = field(default=10, metadata=HASH_WHEN_SET)
+    max_fused_width: int = field(default=3, metadata=HASH_WHEN_SET)  # Fusão de gates do simulador nativo (< 2 desativa)
+    phenotype_near_tolerance: float = field(default=1e-4, metadata=HASH_WHEN_SET)  # Infidelidade máxima entre quase-duplicatas
+    phenotype_index_size: int = field(default=4096, metadata=HASH_WHEN_SET)  # Estados guardados no índice de fenótipos
+    # Avaliações guardadas por forma canônica (0 desativa). Com o índice de fenótipos ativo, cada
+    # entrada guarda também o estado de saída (2^n amplitudes em precisão simples)
+    evaluation_cache_size: int = field(default=50000, metadata=HASH_WHEN_SET)
+    # Cache persistente compartilhado entre execuções (relativo à raiz do projeto; vazio desativa)
+    evaluation_cache_path: str = field(default="results/evaluation_cache.sqlite", metadata=HASH_WHEN_SET)
+    evaluation_cache_max_mb: float = field(default=512.0, metadata=HASH_WHEN_SET)
+    # Servidor local de avaliação compartilhado pelos experimentos paralelos (fitness de fidelidade)
+    use_evaluation_service: bool = field(default=False, metadata=HASH_WHEN_SET)
+    evaluation_service_batch_size: int = field(default=256, metadata=HASH_WHEN_SET)
+    # Distância estrutural da diversidade e dos nichos: "exact" ou "minhash" (estimada, para populações grandes)
+    diversity_mode: str = field(default="exact", metadata=HASH_WHEN_SET)
+    minhash_signature_length: int = field(default=128, metadata=HASH_WHEN_SET)
+    # Arquivo externo da fronteira de Pareto (fidelidade x profundidade) da execução (0 desativa)
+    pareto_archive_size: int = field(default=0, metadata=HASH_WHEN_SET)
+    # Crossover de todos os pares em lote, com sorteios do NumPy (mesma semântica, outra sequência aleatória)
+    vectorized_crossover: bool = field(default=False, metadata=HASH_WHEN_SET)
+    # Mutação aleatória em lote, com sorteios do NumPy (ignorado nas fases com mutação por bandit)
+    vectorized_mutation: bool = field(default=False, metadata=HASH_WHEN_SET)
+    # Geração como pipeline de geradores, com a deduplicação por genoma depois da mutação
+    streaming_pipeline: bool = field(default=False, metadata=HASH_WHEN_SET)
+    # Populações iniciais e injetadas geradas em lote, com sorteios do NumPy
+    vectorized_initialization: bool = field(default=False, metadata=HASH_WHEN_SET)
+    # Preenchido pelo ParallelExperimentManager em tempo de execução; não entra no hash
+    evaluation_service_address: Optional[str] = None
+    # Modo multi-alvo: alvos extras avaliados com as mesmas simulações do alvo principal
+    additional_target_filenames: List[str] = field(default_factory=list, metadata=HASH_WHEN_SET)
+    additional_targets_statevector_data: List[Any] = field(default_factory=list, metadata=HASH_WHEN_SET)
     # O nome do arquivo de resultados é derivado da semente
     # results_filename: str = field(init=False)
 
@@ -73,9 +136,12 @@ class ExperimentConfig:
         """
         Gera um hash SHA256 curto e único para a configuração do experimento.
         """
-        data = asdict(self).copy()
+        data = _drop_unset_fields(asdict(self), ExperimentConfig)
+        data["phases"] = [_drop_unset_fields(phase, PhaseConfig) for phase in data["phases"]]
         data.pop("target_statevector_data", None)
+        data.pop("additional_targets_statevector_data", None)
         data.pop("resume_from_checkpoint", None)
+        data.pop("evaluation_service_address", None)
 
         def custom_serializer(o):
             if is_dataclass(o):
@@ -91,6 +157,10 @@ class ExperimentConfig:
             hasher = hashlib.sha256(canonical_string.encode("utf-8"))
             yield hasher.hexdigest()[:8]
 
+    @property
+    def is_multi_target(self) -> bool:
+        return bool(self.additional_targets_statevector_data)
+
     @property
     def config_file_path(self) -> Generator[str, Any, None]:
         folder_path = PROJECT_ROOT / "results"
@@ -102,7 +172,9 @@ class ExperimentConfig:
         """Converte a configuração para um dicionário, excluindo dados grandes."""
         data = asdict(self)
         del data["target_statevector_data"]
+        del data["additional_targets_statevector_data"]
         del data["resume_from_checkpoint"]
         del data["phases"]
         data.pop("config_file_path", None)
+        data.pop("evaluation_service_address", None)
         return data
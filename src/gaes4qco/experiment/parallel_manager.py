@@ -1,9 +1,12 @@
+import os
+import tempfile
 import time
 from dataclasses import asdict
-from multiprocessing import Pool, cpu_count
-from typing import List
+from multiprocessing import Pool, Process, cpu_count
+from typing import List, Optional
 
 from containers import ExperimentContainer
+from optimization.evaluation_service import run_evaluation_server, shutdown_evaluation_server
 from .config import ExperimentConfig
 from .runner import ExperimentRunner
 
@@ -24,22 +27,69 @@ class ParallelExperimentManager:
 
         print(f"Iniciando {num_experiments} experimentos em {num_processes} processos paralelos...")
         start_time = time.time()
+        server, address = self._start_evaluation_server()
         experiments = []
         for i, cfg in enumerate(self.configs):
             config_dict = asdict(cfg)
+            config_dict["evaluation_service_address"] = address if cfg.use_evaluation_service else None
             self.experiment_container.config.from_dict(config_dict)
             runner = self.experiment_container.runner()
             experiments.append((runner, self.filenames[i]))
 
-        with Pool(num_processes) as pool:
-            # Usa starmap para passar cada objeto de configuração para a função de execução
-            results = pool.starmap(run_experiment, experiments)
+        try:
+            with Pool(num_processes) as pool:
+                # Usa starmap para passar cada objeto de configuração para a função de execução
+                results = pool.starmap(run_experiment, experiments)
+        finally:
+            self._stop_evaluation_server(server, address)
 
         total_duration = time.time() - start_time
         print(f"--- Fim de todos os experimentos | Duração Total: {total_duration:.2f}s ---")
 
         return results
 
+    def _start_evaluation_server(self):
+        """Inicia o servidor de avaliação se algum experimento o utiliza. Retorna (processo, endereço)."""
+        service_configs = [cfg for cfg in self.configs if cfg.use_evaluation_service]
+        if not service_configs:
+            return None, None
+        # Um único servidor atende todos os experimentos: as configurações dele precisam coincidir
+        for name in ("max_fused_width", "evaluation_service_batch_size"):
+            values = {getattr(cfg, name) for cfg in service_configs}
+            if len(values) > 1:
+                raise ValueError(
+                    f"Experiments using the evaluation service must share '{name}' (found {sorted(values)})."
+                )
+
+        # Diretório privado: apenas este usuário pode se conectar ao socket
+        address = os.path.join(tempfile.mkdtemp(prefix="gaes4qco_"), "evaluation.sock")
+        server = Process(
+            target=run_evaluation_server,
+            args=(address, service_configs[0].max_fused_width, service_configs[0].evaluation_service_batch_size),
+            daemon=True
+        )
+        server.start()
+
+        deadline = time.time() + 30.0
+        while not os.path.exists(address) and server.is_alive() and time.time() < deadline:
+            time.sleep(0.05)
+        if not os.path.exists(address):
+            print("⚠️ Servidor de avaliação não iniciou; os experimentos simularão no próprio processo.")
+        return server, address
+
+    @staticmethod
+    def _stop_evaluation_server(server: Optional[Process], address: Optional[str]):
+        if server is None:
+            return
+        if server.is_alive() and os.path.exists(address):
+            shutdown_evaluation_server(address)
+        server.join(timeout=10.0)
+        if server.is_alive():
+            server.terminate()
+        if os.path.exists(address):
+            os.remove(address)
+        os.rmdir(os.path.dirname(address))
+
 
 def run_experiment(runner: ExperimentRunner, filename: str) -> dict:
     """Executa um experimento e anexa o nome do arquivo de origem."""
@@ -9,7 +9,7 @@ import numpy as np
 from evolutionary_algorithm.population import Population
 from quantum_circuit.circuit import Circuit
 from quantum_circuit.interfaces import IQuantumCircuitAdapter
-from .config import ExperimentConfig, PhaseConfig
+from .config import ExperimentConfig, PhaseConfig, PROJECT_ROOT
 
 
 def save_circuit_details(circuit: Circuit, adapter: IQuantumCircuitAdapter, filepath_base: str):
@@ -57,18 +57,24 @@ class ExperimentRunner:
         self.container.config.from_dict({
             "quantum": {
                 "target_statevector_data": self.config.target_statevector_data,
+                "additional_targets_statevector_data": self.config.additional_targets_statevector_data,
                 "num_qubits": self.config.num_qubits,
                 "target_depth": self.config.target_depth,
                 "allowed_gates": self.config.allowed_gates
             },
             "selection_strategy": {
-                "fitness": "weighted" if phase_config.use_weighted_fitness else "default",
+                "fitness": self._fitness_name(phase_config),
                 "fitness_shaper": "sharing" if phase_config.use_fitness_sharing else "default",
                 "rate_adapter": "adaptive" if phase_config.use_adaptive_rates else "default",
-                "mutation": "bandit" if phase_config.use_bandit_mutation else "default",
+                "mutation": self._mutation_name(phase_config),
+                "screener": self._screener_name(phase_config),
+                "phenotype": "dedup" if phase_config.use_phenotype_dedup else "default",
+                "diversity": "minhash" if self.config.diversity_mode == "minhash" else "default",
+                "pareto_archive": "archive" if self.config.pareto_archive_size > 0 else "default",
                 "parent_selection": phase_config.parent_selection.value,
                 "survivor_selection": phase_config.survivor_selection.value,
-                "crossover": phase_config.crossover_strategy
+                "crossover": phase_config.crossover_strategy,
+                "crossover_mode": "vectorized" if self.config.vectorized_crossover else "default"
             },
             "evolution": {
                 "population_size": self.config.population_size,
@@ -80,7 +86,9 @@ class ExperimentRunner:
                 "diversity_threshold": self.config.diversity_threshold,
                 "injection_rate": self.config.injection_rate,
                 "stepsize": phase_config.use_stepsize,
-                "c_factor": self.config.c_factor
+                "c_factor": self.config.c_factor,
+                "streaming_pipeline": self.config.streaming_pipeline,
+                "bulk_generation": self.config.vectorized_initialization
             },
             "adaptive_rates": {
                 "min_mutation_rate": self.config.min_mutation_rate,
@@ -92,12 +100,121 @@ class ExperimentRunner:
                 "sharing_radius": self.config.sharing_radius,
                 "alpha": self.config.alpha
             },
+            "surrogate": {
+                "top_fraction": self.config.surrogate_top_fraction,
+                "exploration_rate": self.config.surrogate_exploration_rate,
+                "min_samples": self.config.surrogate_min_samples
+            },
+            "simulation": {
+                "max_fused_width": self.config.max_fused_width
+            },
+            "diversity": {
+                "signature_length": self.config.minhash_signature_length,
+                # População mesclada (pais e descendentes) mais os indivíduos injetados
+                "matrix_size": 3 * self.config.population_size
+            },
+            "pareto_archive": {
+                "max_size": self.config.pareto_archive_size
+            },
+            "phenotype": {
+                "near_tolerance": self.config.phenotype_near_tolerance,
+                "index_size": self.config.phenotype_index_size
+            },
+            "evaluation_service": {
+                "address": self.config.evaluation_service_address
+            },
+            "evaluation_cache": {
+                "backend": "disk" if self.config.evaluation_cache_path else "memory",
+                "path": str(PROJECT_ROOT / self.config.evaluation_cache_path) if self.config.evaluation_cache_path else None,
+                "max_size_mb": self.config.evaluation_cache_max_mb,
+                "max_size": self.config.evaluation_cache_size
+            },
+            "multi_fidelity": {
+                "proxy": self.config.multi_fidelity_proxy,
+                "margin": self.config.multi_fidelity_margin,
+                "amplitude_fraction": self.config.multi_fidelity_amplitude_fraction,
+                "max_columns": self.config.multi_fidelity_max_columns
+            },
             "observer": {
                 "filename": observer_filename
             }
         })
         """Configura o container com os parâmetros de uma fase específica."""
 
+    def _fitness_name(self, phase_config: PhaseConfig) -> str:
+        """No modo multi-alvo o fitness ponderado não se aplica: usa-se a fidelidade multi-alvo."""
+        if self.config.is_multi_target:
+            return "multitarget"
+        if phase_config.use_weighted_fitness:
+            return "weighted"
+        return "service" if self.config.use_evaluation_service else "default"
+
+    def _mutation_name(self, phase_config: PhaseConfig) -> str:
+        """A mutação por bandit tem precedência sobre a mutação aleatória em lote."""
+        if phase_config.use_bandit_mutation:
+            return "bandit"
+        return "vectorized" if self.config.vectorized_mutation else "default"
+
+    @staticmethod
+    def _screener_name(phase_config: PhaseConfig) -> str:
+        """Escolhe o filtro de descendentes da fase (no máximo um fica ativo)."""
+        if phase_config.use_surrogate_screening:
+            return "surrogate"
+        if phase_config.use_multi_fidelity:
+            return "multifidelity"
+        return "default"
+
+    def _report_distance_estimation(self):
+        """Informa os limites de erro da diversidade e dos nichos estimados por MinHash/LSH."""
+        metric = self.container.optimization.distance_metric()
+        radius = self.config.sharing_radius
+        print(f"Distância estimada por MinHash ({self.config.minhash_signature_length} hashes): "
+              f"erro padrão <= {metric.standard_error:.3f}; vizinhos encontrados no nicho: "
+              f"{metric.neighbor_recall(radius / 2, radius):.1%} a d={radius / 2:.2f}, "
+              f"{metric.neighbor_recall(radius, radius):.1%} no raio d={radius:.2f}")
+
+    def _flush_evaluation_cache(self) -> dict:
+        """Persiste as avaliações pendentes e informa a taxa de acerto acumulada do cache."""
+        cache = self.container.optimization.evaluation_cache()
+        cache.flush()
+        stats = cache.stats()
+        print(f"Cache de avaliações: {stats['memory_hits'] + stats['disk_hits']}/{stats['lookups']} acertos "
+              f"({stats['hit_rate']:.1%}; {stats['disk_hits']} do disco)")
+        return stats
+
+    def _save_target_archive(self, config_file_path: Path):
+        """Salva a elite e a fronteira de Pareto de cada alvo do modo multi-alvo."""
+        archive = self.container.optimization.multi_target_archive()
+        target_names = [self.config.filename_target_circuit] + self.config.additional_target_filenames
+        archive_path = str(config_file_path).replace("_config.json", "_targets.json")
+        print(f"Salvando elite e fronteiras por alvo em: {archive_path}")
+        with open(archive_path, 'w', encoding='utf-8') as f:
+            json.dump(archive.to_dict(target_names), f, indent=4)
+
+    def _save_pareto_archive(self, config_file_path: Path):
+        """Salva a fronteira de Pareto acumulada na execução ao lado da população final."""
+        archive = self.container.optimization.pareto_archive()
+        archive_path = str(config_file_path).replace("_config.json", "_pareto.json")
+        print(f"Salvando arquivo de Pareto em: {archive_path}")
+        with open(archive_path, 'w', encoding='utf-8') as f:
+            json.dump(archive.to_dict(), f, indent=4)
+
+    def _seed_from_pareto_archive(self, population: Population) -> Population:
+        """Substitui os piores indivíduos por até 'elitism_size' pontos da fronteira arquivada nas fases anteriores."""
+        individuals = population.get_individuals()
+        present = {ind.get_canonical_key() for ind in individuals}
+        seeds = [
+            seed for seed in self.container.optimization.pareto_archive().seeds(self.config.elitism_size)
+            if seed.get_canonical_key() not in present
+        ]
+        if not seeds:
+            return population
+        for seed in seeds:
+            seed.mark_dirty()  # Reavaliado com a função de fitness da nova fase
+        individuals.sort(key=lambda ind: ind.fitness, reverse=True)
+        print(f"Semeando a fase com {len(seeds)} circuitos do arquivo de Pareto.")
+        return Population(individuals[:max(0, len(individuals) - len(seeds))] + seeds)
+
     def run(self) -> dict:
         """
         Configura o container, executa o otimizador e retorna os resultados.
@@ -109,6 +226,7 @@ class ExperimentRunner:
         np.random.seed(self.config.seed)
 
         population: Population = Population()
+        cache_stats = {"hit_rate": 0.0}
         for i, (phase, config_file_path_str) in enumerate(zip(self.config.phases, self.config.config_file_path)):
             print(f"\n--- FASE {i} ---")
             config_file_path = Path(config_file_path_str)
@@ -118,6 +236,8 @@ class ExperimentRunner:
                 json.dump(self.config.to_dict(), f, indent=4)
             results_file_path = str(config_file_path).replace("_config.json", "_results.json")
             self._configure_container_for_phase(phase, results_file_path)
+            if i == 0 and self.config.diversity_mode == "minhash":
+                self._report_distance_estimation()
 
             if self.config.resume_from_checkpoint:
                 checkpoint_manager = self.container.checkpoint_manager()
@@ -135,14 +255,22 @@ class ExperimentRunner:
                     use_evolutionary_strategy=phase.use_stepsize
                 )
 
+            if phase.seed_from_pareto_archive and self.config.pareto_archive_size > 0:
+                population = self._seed_from_pareto_archive(population)
+
             optimizer = self.container.optimizer()
             population = optimizer.run(population, phase.generations, phase.fidelity_threshold_stop)
 
             print("Optimization finished.")
+            cache_stats = self._flush_evaluation_cache()
             final_circuits = population.get_individuals()
 
             adapter = self.container.circuit.qiskit_adapter()
             save_final_population(final_circuits, adapter, config_file_path)
+            if self.config.is_multi_target:
+                self._save_target_archive(config_file_path)
+            if self.config.pareto_archive_size > 0:
+                self._save_pareto_archive(config_file_path)
 
         end_time = time.time()
         duration = end_time - start_time
@@ -152,5 +280,6 @@ class ExperimentRunner:
         return {
             "seed": self.config.seed,
             "best_fitness": best_circuit.fitness,
-            "duration_seconds": duration
+            "duration_seconds": duration,
+            "evaluation_cache_hit_rate": cache_stats["hit_rate"]
         }
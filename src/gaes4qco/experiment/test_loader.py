@@ -105,18 +105,28 @@ class TestConfigLoader:
             crossover_strategy=phase_dict["crossover_strategy"].lower(),
             generations=int(phase_dict["generations"]),
             fidelity_threshold_stop=phase_dict.get("fidelity_threshold_stop"),
+            use_surrogate_screening=phase_dict.get("use_surrogate_screening", False),
+            use_multi_fidelity=phase_dict.get("use_multi_fidelity", False),
+            use_phenotype_dedup=phase_dict.get("use_phenotype_dedup", False),
+            seed_from_pareto_archive=phase_dict.get("seed_from_pareto_archive", False),
         )
 
     def _build_experiment(self, cfg: dict) -> ExperimentConfig:
         """Constructs an ExperimentConfig, filling only required fields."""
         phases = [self._build_phase(p) for p in cfg["phases"]]
 
-        target_sv, target_filepath = self._load_or_create_target(
-            num_qubits=cfg.get("num_qubits", 4),
-            depth=cfg["target_depth"],
-            seed_target=cfg["seed_target"],
-            allowed_gates=cfg.get("allowed_gates"),
-        )
+        # 'seed_targets' ativa o modo multi-alvo: o primeiro é o alvo principal
+        seed_targets = cfg.get("seed_targets") or [cfg["seed_target"]]
+        targets = [
+            self._load_or_create_target(
+                num_qubits=cfg.get("num_qubits", 4),
+                depth=cfg["target_depth"],
+                seed_target=seed_target,
+                allowed_gates=cfg.get("allowed_gates"),
+            )
+            for seed_target in seed_targets
+        ]
+        target_sv, target_filepath = targets[0]
 
         # --- Campos obrigatórios ---
         required_kwargs = dict(
@@ -128,6 +138,8 @@ class TestConfigLoader:
             filename_target_circuit=target_filepath,
             phases=phases,
             resume_from_checkpoint=cfg["resume_from_checkpoint"],
+            additional_target_filenames=[filepath for _, filepath in targets[1:]],
+            additional_targets_statevector_data=[sv for sv, _ in targets[1:]],
         )
 
         # --- Campos opcionais (se existirem, sobrescrevem os defaults do dataclass) ---
@@ -137,7 +149,16 @@ class TestConfigLoader:
             "min_mutation_rate", "max_mutation_rate",
             "min_crossover_rate", "max_crossover_rate",
             "diversity_threshold", "injection_rate",
-            "sharing_radius", "alpha", "c_factor"
+            "sharing_radius", "alpha", "c_factor",
+            "surrogate_top_fraction", "surrogate_exploration_rate", "surrogate_min_samples",
+            "multi_fidelity_proxy", "multi_fidelity_margin",
+            "multi_fidelity_amplitude_fraction", "multi_fidelity_max_columns",
+            "max_fused_width", "evaluation_cache_size", "evaluation_cache_path", "evaluation_cache_max_mb",
+            "phenotype_near_tolerance", "phenotype_index_size",
+            "use_evaluation_service", "evaluation_service_batch_size",
+            "diversity_mode", "minhash_signature_length", "pareto_archive_size",
+            "vectorized_crossover", "vectorized_mutation", "streaming_pipeline",
+            "vectorized_initialization"
         ]
         for key in optional_keys:
             if key in cfg:
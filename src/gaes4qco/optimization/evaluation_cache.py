@@ -0,0 +1,228 @@
+import hashlib
+import os
+import sqlite3
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional
+
+import numpy as np
+from qiskit.quantum_info import Statevector
+
+from .interfaces import CachedEvaluation, IEvaluationCache
+
+
+class InMemoryEvaluationCache(IEvaluationCache):
+    """
+    Cache LRU, em memória, dos resultados de avaliação. Compartilhado entre o otimizador
+    e as mutações que avaliam circuitos. Com 'max_size' 0 nada é guardado.
+    """
+
+    def __init__(self, max_size: int):
+        self._max_size = max_size or 0
+        self._entries: "OrderedDict[Hashable, CachedEvaluation]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[CachedEvaluation]:
+        result = self._entries.get(key)
+        if result is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return result
+
+    def put(self, key: Hashable, result: CachedEvaluation):
+        if self._max_size <= 0:
+            return
+        self._entries[key] = result
+        self._entries.move_to_end(key)
+        if len(self._entries) > self._max_size:
+            self._entries.popitem(last=False)
+
+    def flush(self):
+        pass
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            "lookups": lookups,
+            "memory_hits": self.hits,
+            "disk_hits": 0,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SqliteEvaluationCache(IEvaluationCache):
+    """
+    ## Cache persistente em um único arquivo SQLite, compartilhado entre execuções,
+    ## experimentos e os processos do ParallelExperimentManager.
+    ## - Endereçado por conteúdo: a chave é (hash dos alvos, hash da forma canônica do
+    ##   genoma). Além de fitness e fidelidade, guarda os detalhes da avaliação
+    ##   (fidelidades por alvo, float64) e o estado de saída do índice de fenótipos
+    ##   (complex64) como BLOBs. Fitness e fidelidade nunca são sobrescritos; detalhes
+    ##   e estados ausentes (ex: gravados com o índice desativado) são completados
+    ##   quando o circuito volta a ser avaliado.
+    ## - Concorrência: modo WAL (leitores não bloqueiam escritores) e espera de até
+    ##   'busy_timeout' segundos por locks; as escritas são agrupadas em lotes.
+    ## - Compactação: quando o arquivo passa de 'max_size_mb', as entradas mais antigas
+    ##   são removidas até restar metade do limite.
+    ## Um InMemoryEvaluationCache na frente evita consultas repetidas ao disco.
+    """
+
+    def __init__(
+            self,
+            path: str,
+            target_statevector: Statevector,
+            additional_targets_data: Optional[List[Any]],
+            target_depth: int,
+            max_size_mb: float,
+            memory_cache: InMemoryEvaluationCache,
+            flush_every: int = 256,
+            busy_timeout: float = 60.0
+    ):
+        self._path = path
+        self._target_hash = self._hash_targets(target_statevector, additional_targets_data, target_depth)
+        self._max_size_bytes = int((max_size_mb or 0) * 1024 * 1024)
+        self._memory = memory_cache
+        self._flush_every = flush_every
+        self._busy_timeout = busy_timeout
+
+        self._pending: Dict[str, CachedEvaluation] = {}
+        # A conexão é aberta no processo que usa o cache (os runners são enviados aos workers)
+        self._connection: Optional[sqlite3.Connection] = None
+        self._pid: Optional[int] = None
+
+        self.disk_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _hash_targets(target_statevector: Statevector, additional_targets_data: Optional[List[Any]], target_depth: int) -> str:
+        """Identifica o problema: estados alvo (arredondados) e a profundidade alvo usada pelo fitness ponderado."""
+        digest = hashlib.blake2b(digest_size=16)
+        for data in [target_statevector.data] + [Statevector(d).data for d in (additional_targets_data or [])]:
+            digest.update(np.round(np.asarray(data, dtype=np.complex128), 12).tobytes())
+        digest.update(str(target_depth).encode())
+        return digest.hexdigest()
+
+    @staticmethod
+    def _hash_genome(key: Hashable) -> str:
+        return hashlib.blake2b(repr(key).encode(), digest_size=16).hexdigest()
+
+    def _db(self) -> sqlite3.Connection:
+        if self._connection is None or self._pid != os.getpid():
+            directory = os.path.dirname(self._path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._connection = sqlite3.connect(self._path, timeout=self._busy_timeout)
+            self._pid = os.getpid()
+            self._pending.clear()
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("PRAGMA synchronous=NORMAL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS evaluations ("
+                " target_hash TEXT NOT NULL, genome_hash TEXT NOT NULL,"
+                " fitness REAL NOT NULL, fidelity REAL NOT NULL, details BLOB, phenotype BLOB,"
+                " UNIQUE (target_hash, genome_hash))"
+            )
+            # Arquivos criados antes das colunas de detalhes e de estado
+            columns = {row[1] for row in self._connection.execute("PRAGMA table_info(evaluations)")}
+            for column in ("details", "phenotype"):
+                if column not in columns:
+                    self._connection.execute(f"ALTER TABLE evaluations ADD COLUMN {column} BLOB")
+            self._connection.commit()
+            self._compact_if_needed()
+        return self._connection
+
+    def get(self, key: Hashable) -> Optional[CachedEvaluation]:
+        result = self._memory.get(key)
+        if result is not None:
+            return result
+
+        genome_hash = self._hash_genome(key)
+        result = self._pending.get(genome_hash)
+        if result is None:
+            row = self._db().execute(
+                "SELECT fitness, fidelity, details, phenotype FROM evaluations WHERE target_hash = ? AND genome_hash = ?",
+                (self._target_hash, genome_hash)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            details = tuple(np.frombuffer(row[2], dtype=np.float64).tolist()) if row[2] is not None else None
+            phenotype = np.frombuffer(row[3], dtype=np.complex64) if row[3] is not None else None
+            result = (row[0], row[1], details, phenotype)
+
+        self.disk_hits += 1
+        self._memory.put(key, result)
+        return result
+
+    def put(self, key: Hashable, result: CachedEvaluation):
+        self._memory.put(key, result)
+        self._db()
+        fitness, fidelity, details, phenotype = result
+        self._pending[self._hash_genome(key)] = (float(fitness), float(fidelity), details, phenotype)
+        if len(self._pending) >= self._flush_every:
+            self.flush()
+
+    def flush(self):
+        if not self._pending:
+            return
+        db = self._db()
+        rows = [
+            (self._target_hash, genome_hash, fitness, fidelity,
+             np.asarray(details, dtype=np.float64).tobytes() if details is not None else None,
+             np.asarray(phenotype, dtype=np.complex64).tobytes() if phenotype is not None else None)
+            for genome_hash, (fitness, fidelity, details, phenotype) in self._pending.items()
+        ]
+        try:
+            with db:
+                db.executemany(
+                    "INSERT INTO evaluations (target_hash, genome_hash, fitness, fidelity, details, phenotype)"
+                    " VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT (target_hash, genome_hash) DO UPDATE SET"
+                    " details = COALESCE(details, excluded.details),"
+                    " phenotype = COALESCE(phenotype, excluded.phenotype)",
+                    rows
+                )
+        except sqlite3.OperationalError as e:
+            # Banco ocupado por outro processo além do timeout: tenta de novo no próximo lote
+            print(f"  -> Cache de avaliações indisponível ({e}); {len(rows)} resultados pendentes.")
+            return
+        self._pending.clear()
+        self._compact_if_needed()
+
+    def _file_size(self) -> int:
+        db = self._connection
+        page_size = db.execute("PRAGMA page_size").fetchone()[0]
+        used_pages = db.execute("PRAGMA page_count").fetchone()[0] - db.execute("PRAGMA freelist_count").fetchone()[0]
+        return page_size * used_pages
+
+    def _compact_if_needed(self):
+        if self._max_size_bytes <= 0 or self._file_size() <= self._max_size_bytes:
+            return
+        db = self._connection
+        try:
+            with db:
+                total = db.execute("SELECT COUNT(*) FROM evaluations").fetchone()[0]
+                keep = int(total * self._max_size_bytes / 2 / self._file_size())
+                db.execute(
+                    "DELETE FROM evaluations WHERE rowid NOT IN "
+                    "(SELECT rowid FROM evaluations ORDER BY rowid DESC LIMIT ?)",
+                    (keep,)
+                )
+            db.execute("VACUUM")
+        except sqlite3.OperationalError as e:
+            # Outro processo está usando o arquivo: a compactação fica para a próxima vez
+            print(f"  -> Compactação do cache de avaliações adiada ({e}).")
+
+    def stats(self) -> Dict[str, float]:
+        memory_hits = self._memory.hits
+        lookups = memory_hits + self.disk_hits + self.misses
+        return {
+            "lookups": lookups,
+            "memory_hits": memory_hits,
+            "disk_hits": self.disk_hits,
+            "hit_rate": (memory_hits + self.disk_hits) / lookups if lookups else 0.0,
+        }
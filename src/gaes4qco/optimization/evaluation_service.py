@@ -0,0 +1,242 @@
+import os
+import threading
+import time
+from collections import deque
+from multiprocessing.connection import Client, Connection, Listener, wait
+from typing import Deque, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .interfaces import ISimulationService
+from quantum_circuit.circuit import Circuit
+from quantum_circuit.compact import CompactGenome
+from quantum_circuit.fusion import GateFusionCompiler
+from quantum_circuit.simplifier import CircuitSimplifier
+from quantum_circuit.simulator import NativeStatevectorSimulator
+
+
+class InProcessSimulationService(ISimulationService):
+    """Simula os lotes no próprio processo. Usado quando não há servidor de avaliação (e em testes)."""
+
+    def __init__(self, simulator: NativeStatevectorSimulator):
+        self._simulator = simulator
+
+    def simulate_batch(self, circuits: List[Circuit]) -> List[np.ndarray]:
+        return [self._simulator.simulate(circuit) for circuit in circuits]
+
+
+class EvaluationServiceClient(ISimulationService):
+    """
+    Cliente do EvaluationServer. Envia cada lote pelo socket Unix em 'address' e bloqueia
+    até a resposta (no máximo um pedido pendente por cliente, o que limita a fila do
+    servidor). Se o servidor não estiver disponível, simula no próprio processo.
+    """
+
+    def __init__(self, address: Optional[str], fallback: InProcessSimulationService):
+        self._address = address
+        self._fallback = fallback
+        self._connection: Optional[Connection] = None
+        self._pid: Optional[int] = None
+        self._use_fallback = not address
+
+    def _connect(self) -> Optional[Connection]:
+        # A conexão pertence ao processo que a abriu (os runners são enviados aos workers)
+        if self._connection is None or self._pid != os.getpid():
+            self._connection = Client(self._address, family="AF_UNIX")
+            self._pid = os.getpid()
+        return self._connection
+
+    def simulate_batch(self, circuits: List[Circuit]) -> List[np.ndarray]:
+        if not circuits:
+            return []
+        if not self._use_fallback:
+            try:
+                connection = self._connect()
+                # Genomas compactos: o pickle é um dump dos buffers, bem menor que o do Circuit
+                connection.send(("simulate", [CompactGenome.from_circuit(circuit) for circuit in circuits]))
+                return connection.recv()
+            except (OSError, EOFError) as e:
+                print(f"  -> Servidor de avaliação indisponível ({e}); simulando no próprio processo.")
+                self._use_fallback = True
+                self._connection = None
+        return self._fallback.simulate_batch(circuits)
+
+    def stats(self) -> dict:
+        """Estatísticas de vazão do servidor (vazio quando em modo local)."""
+        if self._use_fallback:
+            return {}
+        connection = self._connect()
+        connection.send(("stats", None))
+        return connection.recv()
+
+
+class _PendingRequest:
+    __slots__ = ("connection", "circuits", "results", "remaining")
+
+    def __init__(self, connection: Connection, circuits: List[CompactGenome]):
+        self.connection = connection
+        self.circuits = circuits
+        self.results: List[Optional[np.ndarray]] = [None] * len(circuits)
+        self.remaining = len(circuits)
+
+
+class EvaluationServer:
+    """
+    ## Processo único que concentra as simulações dos experimentos em execução.
+    ## - Lotes: os pedidos pendentes de todos os clientes são fundidos em lotes de até
+    ##   'max_batch_size' circuitos; circuitos com a mesma forma canônica (comuns entre
+    ##   experimentos com o mesmo alvo e a mesma semente) são simulados uma única vez, e os
+    ##   caches de matrizes e de blocos fundidos do simulador são compartilhados.
+    ## - Justiça: cada lote é montado em rodízio, um circuito de cada cliente por vez.
+    ## - Contrapressão: cada cliente tem no máximo um pedido pendente e o servidor deixa de
+    ##   ler novos pedidos enquanto houver mais de 'max_pending' circuitos na fila.
+    ## - Estatísticas: circuitos/s, tamanho médio dos lotes, simulações evitadas e
+    ##   circuitos atendidos por cliente.
+    """
+
+    def __init__(self, address: str, max_fused_width: int, max_batch_size: int = 256, max_pending: int = 4096):
+        self._address = address
+        self._simulator = NativeStatevectorSimulator(CircuitSimplifier(), GateFusionCompiler(max_fused_width))
+        self._max_batch_size = max_batch_size
+        self._max_pending = max_pending
+
+        self._connections: List[Connection] = []
+        self._new_connections: List[Connection] = []
+        self._lock = threading.Lock()
+        self._queues: Dict[Connection, Deque[Tuple[_PendingRequest, int]]] = {}
+        self._client_ids: Dict[Connection, int] = {}
+        self._running = True
+
+        self._start_time = time.time()
+        self._num_circuits = 0
+        self._num_simulations = 0
+        self._num_batches = 0
+        self._served_per_client: Dict[int, int] = {}
+
+    def serve_forever(self):
+        listener = Listener(self._address, family="AF_UNIX")
+        threading.Thread(target=self._accept_loop, args=(listener,), daemon=True).start()
+        print(f"Servidor de avaliação ouvindo em {self._address}")
+        try:
+            while self._running:
+                self._register_new_connections()
+                self._read_requests()
+                self._process_batch()
+        finally:
+            listener.close()
+            print(f"Servidor de avaliação encerrado: {self.stats()}")
+
+    def _accept_loop(self, listener: Listener):
+        while self._running:
+            try:
+                connection = listener.accept()
+            except OSError:
+                return
+            with self._lock:
+                self._new_connections.append(connection)
+
+    def _register_new_connections(self):
+        with self._lock:
+            new_connections, self._new_connections = self._new_connections, []
+        for connection in new_connections:
+            self._connections.append(connection)
+            self._queues[connection] = deque()
+            self._client_ids[connection] = len(self._client_ids)
+
+    def _read_requests(self):
+        if not self._connections:
+            time.sleep(0.01)
+            return
+        # Contrapressão: só lê de clientes sem pedido pendente e enquanto a fila tiver espaço
+        readable = [c for c in self._connections if not self._queues[c]]
+        if self._pending_count() >= self._max_pending or not readable:
+            return
+        has_pending = self._pending_count() > 0
+        for connection in wait(readable, timeout=0 if has_pending else 0.05):
+            try:
+                kind, payload = connection.recv()
+            except (EOFError, OSError):
+                self._drop(connection)
+                continue
+            if kind == "simulate":
+                request = _PendingRequest(connection, payload)
+                self._queues[connection].extend((request, i) for i in range(len(payload)))
+            elif kind == "stats":
+                connection.send(self.stats())
+            elif kind == "shutdown":
+                self._running = False
+
+    def _pending_count(self) -> int:
+        return sum(len(queue) for queue in self._queues.values())
+
+    def _drop(self, connection: Connection):
+        self._connections.remove(connection)
+        self._queues.pop(connection, None)
+        connection.close()
+
+    def _next_batch(self) -> List[Tuple[_PendingRequest, int]]:
+        batch = []
+        active = [c for c in self._connections if self._queues[c]]
+        while active and len(batch) < self._max_batch_size:
+            for connection in list(active):
+                queue = self._queues[connection]
+                batch.append(queue.popleft())
+                if not queue:
+                    active.remove(connection)
+                if len(batch) >= self._max_batch_size:
+                    break
+        return batch
+
+    def _process_batch(self):
+        batch = self._next_batch()
+        if not batch:
+            return
+
+        states: Dict[tuple, np.ndarray] = {}
+        for request, index in batch:
+            circuit = request.circuits[index]
+            key = (circuit.count_qubits, circuit.get_canonical_key())
+            state = states.get(key)
+            if state is None:
+                state = self._simulator.simulate(circuit)
+                states[key] = state
+            request.results[index] = state
+            request.remaining -= 1
+            if request.remaining == 0:
+                self._reply(request)
+
+        self._num_batches += 1
+        self._num_circuits += len(batch)
+        self._num_simulations += len(states)
+
+    def _reply(self, request: _PendingRequest):
+        client_id = self._client_ids[request.connection]
+        self._served_per_client[client_id] = self._served_per_client.get(client_id, 0) + len(request.circuits)
+        try:
+            request.connection.send(request.results)
+        except (OSError, EOFError):
+            if request.connection in self._connections:
+                self._drop(request.connection)
+
+    def stats(self) -> dict:
+        elapsed = max(time.time() - self._start_time, 1e-9)
+        return {
+            "circuits": self._num_circuits,
+            "simulations": self._num_simulations,
+            "batches": self._num_batches,
+            "mean_batch_size": self._num_circuits / self._num_batches if self._num_batches else 0.0,
+            "circuits_per_second": self._num_circuits / elapsed,
+            "served_per_client": dict(self._served_per_client),
+        }
+
+
+def run_evaluation_server(address: str, max_fused_width: int, max_batch_size: int):
+    """Ponto de entrada do processo do servidor de avaliação."""
+    EvaluationServer(address, max_fused_width, max_batch_size).serve_forever()
+
+
+def shutdown_evaluation_server(address: str):
+    """Pede ao servidor que termine após os pedidos em andamento."""
+    connection = Client(address, family="AF_UNIX")
+    connection.send(("shutdown", None))
+    connection.close()
@@ -1,9 +1,12 @@
-from typing import Tuple
+from typing import Any, Dict, List, Optional, Tuple
 
+import numpy as np
 from qiskit.quantum_info import Statevector, state_fidelity
-from .interfaces import IFitnessEvaluator
+from .interfaces import CachedEvaluation, EvaluationResult, IFitnessEvaluator, IEvaluationCache, IPhenotypeIndex, ISimulationService
+from .multi_target import MultiTargetArchive
 from quantum_circuit.circuit import Circuit
 from quantum_circuit.interfaces import IQuantumCircuitAdapter
+from quantum_circuit.simulator import NativeStatevectorSimulator
 
 
 class FidelityFitnessEvaluator(IFitnessEvaluator):
@@ -12,9 +15,10 @@ class FidelityFitnessEvaluator(IFitnessEvaluator):
     ## Esta classe substitui a antiga função 'fidelityFitnessFunction'.
     """
 
-    def __init__(self, target_statevector: Statevector, circuit_adapter: IQuantumCircuitAdapter):
+    def __init__(self, target_statevector: Statevector, circuit_adapter: IQuantumCircuitAdapter, phenotype_index: IPhenotypeIndex):
         self._target_sv = target_statevector
         self._adapter = circuit_adapter
+        self._phenotype_index = phenotype_index
 
     def evaluate(self, circuit: Circuit) -> Tuple[float, float]:
         """
@@ -28,6 +32,7 @@ class FidelityFitnessEvaluator(IFitnessEvaluator):
         solution_sv = Statevector.from_instruction(qiskit_circuit)
         fidelity = state_fidelity(solution_sv, self._target_sv)
         circuit.fidelity = fidelity
+        self._phenotype_index.record(circuit, solution_sv.data)
         return max(0.0, fidelity), fidelity
 
 
@@ -36,11 +41,19 @@ class WeightedFidelityFitnessEvaluator(IFitnessEvaluator):
     Calcula o fitness combinando a fidelidade com uma penalidade baseada na profundidade.
     A penalidade aumenta drasticamente quando a fidelidade se aproxima de 1.0.
     """
+    depth_sensitive = True
 
-    def __init__(self, target_statevector: Statevector, circuit_adapter: IQuantumCircuitAdapter, target_depth: int):
+    def __init__(
+            self,
+            target_statevector: Statevector,
+            circuit_adapter: IQuantumCircuitAdapter,
+            target_depth: int,
+            phenotype_index: IPhenotypeIndex
+    ):
         self._target_sv = target_statevector
         self._adapter = circuit_adapter
         self._target_depth = target_depth  # Profundidade do circuito alvo para normalização
+        self._phenotype_index = phenotype_index
 
     def evaluate(self, circuit: Circuit) -> Tuple[float, float]:
         # 1. Calcula a fidelidade pura
@@ -50,6 +63,7 @@ class WeightedFidelityFitnessEvaluator(IFitnessEvaluator):
 
         # 2. Armazena a fidelidade pura no objeto do circuito
         circuit.fidelity = fidelity
+        self._phenotype_index.record(circuit, solution_sv.data)
 
         # 3. Calcula a penalidade de profundidade
         depth_ratio = circuit.depth / self._target_depth if self._target_depth > 0 else circuit.depth
@@ -66,3 +80,185 @@ class WeightedFidelityFitnessEvaluator(IFitnessEvaluator):
         # 4. O fitness final é a fidelidade ponderada pela penalidade de profundidade
         final_fitness = fidelity * depth_penalty
         return max(0.0, final_fitness), fidelity
+
+
+class MultiTargetFidelityEvaluator(IFitnessEvaluator):
+    """
+    Avalia um circuito contra vários estados alvo com uma única simulação.
+    As fidelidades de todos os alvos saem de um produto matriz-vetor (K, 2^n) @ (2^n,)
+    e alimentam o MultiTargetArchive (elite e fronteira de Pareto por alvo).
+    O fitness usado pela seleção é a maior fidelidade entre os alvos, de modo que a
+    população se distribui entre os alvos que cada circuito melhor atende.
+    """
+
+    uses_details = True
+
+    def __init__(
+            self,
+            target_statevector: Statevector,
+            additional_targets_data: List[Any],
+            simulator: NativeStatevectorSimulator,
+            archive: MultiTargetArchive,
+            phenotype_index: IPhenotypeIndex
+    ):
+        targets = [target_statevector] + [Statevector(data) for data in (additional_targets_data or [])]
+        self._targets_conj = np.stack([np.asarray(sv.data) for sv in targets]).conj()
+        self._simulator = simulator
+        self._archive = archive
+        self._phenotype_index = phenotype_index
+
+    def target_fidelities(self, circuit: Circuit) -> np.ndarray:
+        """Retorna o vetor (K,) com a fidelidade do circuito para cada alvo."""
+        solution = self._simulator.simulate(circuit)
+        self._phenotype_index.record(circuit, solution)
+        return np.abs(self._targets_conj @ solution) ** 2
+
+    def evaluate(self, circuit: Circuit) -> Tuple[float, float]:
+        fitness, fidelity, _ = self.evaluate_with_details(circuit)
+        return fitness, fidelity
+
+    def evaluate_with_details(self, circuit: Circuit) -> EvaluationResult:
+        """Os detalhes são as fidelidades de todos os alvos, para que acertos de cache também alimentem o arquivo."""
+        fidelities = self.target_fidelities(circuit)
+        fidelity = float(np.max(fidelities))
+        circuit.fidelity = fidelity
+        self._archive.update(circuit, fidelities, fidelity, fidelity)
+        return fidelity, fidelity, tuple(fidelities.tolist())
+
+    def evaluate_many_with_details(self, circuits: List[Circuit]) -> List[EvaluationResult]:
+        return [self.evaluate_with_details(circuit) for circuit in circuits]
+
+    def replay(self, circuit: Circuit, fitness: float, fidelity: float, details: Optional[Tuple[float, ...]]):
+        self._archive.update(circuit, np.asarray(details), fitness, fidelity)
+
+
+class EvaluationCounter:
+    """Número de simulações exatas da execução, somado por todos os avaliadores que compartilham a instância."""
+
+    def __init__(self):
+        self.count = 0
+
+
+class CachingFitnessEvaluator(IFitnessEvaluator):
+    """
+    Decorador que evita simular de novo genomas equivalentes.
+    A chave é a forma canônica do circuito (mais a profundidade, se o avaliador interno
+    depender dela) e o nome do avaliador, de modo que fases com funções de fitness
+    diferentes podem compartilhar o mesmo cache.
+    Só as consultas ausentes do cache (repassadas ao avaliador interno) são contadas em 'counter'.
+    Cada entrada guarda, além do resultado, os detalhes que o avaliador interno usa em 'replay'
+    e o estado de saída registrado no índice de fenótipos; um acerto refaz os dois efeitos,
+    de modo que é indistinguível de uma nova simulação. Entradas sem o que o avaliador ou
+    o índice precisam (ex: gravadas com o índice desativado) são tratadas como ausentes.
+    """
+
+    def __init__(
+            self,
+            evaluator: IFitnessEvaluator,
+            cache: IEvaluationCache,
+            counter: EvaluationCounter,
+            phenotype_index: IPhenotypeIndex
+    ):
+        self._evaluator = evaluator
+        self._cache = cache
+        self._counter = counter
+        self._phenotype_index = phenotype_index
+        self.depth_sensitive = evaluator.depth_sensitive
+
+    def cache_key(self, circuit: Circuit) -> tuple:
+        depth = circuit.depth if self.depth_sensitive else None
+        return type(self._evaluator).__name__, depth, circuit.get_canonical_key()
+
+    def _lookup(self, key: tuple) -> Optional[CachedEvaluation]:
+        """Entrada guardada para a chave, ou None se faltar algo que o acerto precisa refazer."""
+        cached = self._cache.get(key)
+        if cached is None:
+            return None
+        if self._evaluator.uses_details and cached[2] is None:
+            return None
+        if self._phenotype_index.stores_states and cached[3] is None:
+            return None
+        return cached
+
+    def _store(self, key: tuple, circuit: Circuit, result: EvaluationResult) -> CachedEvaluation:
+        """Guarda o resultado com o estado que o índice de fenótipos registrou durante a avaliação."""
+        entry = result + (self._phenotype_index.summary(circuit),)
+        self._cache.put(key, entry)
+        return entry
+
+    def _apply(self, circuit: Circuit, entry: CachedEvaluation, replay: bool):
+        """
+        Aplica o resultado guardado ao circuito e devolve o estado ao índice de fenótipos.
+        Com 'replay' (acerto de cache), o avaliador interno também refaz os efeitos da avaliação.
+        """
+        fitness, fidelity, details, phenotype = entry
+        circuit.fidelity = fidelity
+        if phenotype is not None:
+            self._phenotype_index.restore(circuit, phenotype)
+        if replay:
+            self._evaluator.replay(circuit, fitness, fidelity, details)
+
+    def evaluate(self, circuit: Circuit) -> Tuple[float, float]:
+        key = self.cache_key(circuit)
+        entry = self._lookup(key)
+        hit = entry is not None
+        if not hit:
+            self._counter.count += 1
+            entry = self._store(key, circuit, self._evaluator.evaluate_with_details(circuit))
+        self._apply(circuit, entry, replay=hit)
+        return entry[0], entry[1]
+
+    def evaluate_many(self, circuits: List[Circuit]) -> List[Tuple[float, float]]:
+        """Consulta o cache e repassa ao avaliador interno, em um único lote, um representante de cada chave ausente."""
+        keys = [self.cache_key(circuit) for circuit in circuits]
+        results: Dict[tuple, CachedEvaluation] = {}
+        pending: Dict[tuple, Circuit] = {}
+        for key, circuit in zip(keys, circuits):
+            if key in results or key in pending:
+                continue
+            cached = self._lookup(key)
+            if cached is not None:
+                results[key] = cached
+            else:
+                pending[key] = circuit
+
+        if pending:
+            self._counter.count += len(pending)
+            evaluated = self._evaluator.evaluate_many_with_details(list(pending.values()))
+            for (key, circuit), result in zip(pending.items(), evaluated):
+                results[key] = self._store(key, circuit, result)
+
+        # Os representantes já foram avaliados; os demais recebem o resultado como acerto de cache.
+        # Todos devolvem o estado ao índice, na ordem do lote, para que a ordem do índice não
+        # dependa de quais chaves já estavam no cache
+        representatives = {id(circuit) for circuit in pending.values()}
+        for key, circuit in zip(keys, circuits):
+            self._apply(circuit, results[key], replay=id(circuit) not in representatives)
+        return [results[key][:2] for key in keys]
+
+
+class ServiceFidelityFitnessEvaluator(IFitnessEvaluator):
+    """
+    Fitness de fidelidade (como FidelityFitnessEvaluator) com a simulação delegada a um
+    ISimulationService, que recebe a população pendente em um único lote. Com o servidor
+    de avaliação, os lotes de vários experimentos são simulados em conjunto.
+    """
+
+    def __init__(self, target_statevector: Statevector, service: ISimulationService, phenotype_index: IPhenotypeIndex):
+        self._target_conj = np.asarray(target_statevector.data).conj()
+        self._service = service
+        self._phenotype_index = phenotype_index
+
+    def evaluate(self, circuit: Circuit) -> Tuple[float, float]:
+        return self.evaluate_many([circuit])[0]
+
+    def evaluate_many(self, circuits: List[Circuit]) -> List[Tuple[float, float]]:
+        if not circuits:
+            return []
+        results = []
+        for circuit, state in zip(circuits, self._service.simulate_batch(circuits)):
+            fidelity = float(abs(self._target_conj @ state) ** 2)
+            circuit.fidelity = fidelity
+            self._phenotype_index.record(circuit, state)
+            results.append((fidelity, fidelity))
+        return results
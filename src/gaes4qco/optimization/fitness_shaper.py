@@ -1,3 +1,7 @@
+from typing import Optional
+
+import numpy as np
+
 from analysis.distance_metrics import StructuralJaccardDistance
 from analysis.interfaces import IDistanceMetric
 
@@ -6,43 +10,48 @@ from evolutionary_algorithm.population import Population
 
 
 class NullFitnessShaper(IFitnessShaper):
-    """Um modelador que não faz nada. Usado quando o Fitness Sharing está desativado."""
+    """Um modelador neutro: o fitness de seleção é o próprio fitness. Usado quando o Fitness Sharing está desativado."""
 
     def shape(self, population: Population):
-        pass  # Não faz nenhuma alteração
+        for individual in population:
+            individual.shaped_fitness = individual.fitness
 
 
 class FitnessSharingShaper(IFitnessShaper):
     """
     Ajusta o fitness da população usando a técnica de Fitness Sharing.
     Penaliza indivíduos que são muito similares a outros.
+    O resultado vai para 'shaped_fitness', lido pelos operadores de seleção; o fitness
+    bruto não é alterado, então reaplicar o ajuste a sobreviventes não o acumula.
     """
 
-    def __init__(self, sharing_radius: float, alpha: float):
+    def __init__(self, sharing_radius: float, alpha: float, distance_metric: Optional[IDistanceMetric] = None):
         """
         Args:
             sharing_radius (float): O raio de nicho (sigma_share). A distância abaixo
                                     da qual dois indivíduos são considerados do mesmo nicho.
             alpha (float): Expoente que controla o formato da função de compartilhamento.
+            distance_metric (IDistanceMetric): Métrica usada para encontrar os vizinhos de
+                                    cada nicho (padrão: distância de Jaccard exata).
         """
         self._sigma_share = sharing_radius
         self._alpha = alpha
-        self._distance_metric = StructuralJaccardDistance()
+        self._distance_metric = distance_metric or StructuralJaccardDistance()
 
     def shape(self, population: Population):
-        """Ajusta o fitness de cada indivíduo na população."""
-        individuals = population.get_individuals()
-
-        for i in range(len(individuals)):
-            niche_count = 0
-            for j in range(len(individuals)):
-                distance = self._distance_metric.calculate(individuals[i], individuals[j])
-
-                # Calcula a função de compartilhamento
-                if distance < self._sigma_share:
-                    sh = 1 - (distance / self._sigma_share) ** self._alpha
-                    niche_count += sh
-
-            # Ajusta o fitness dividindo-o pela contagem do nicho
-            if niche_count > 0:
-                individuals[i].fitness /= niche_count
+        """Calcula o fitness ajustado (fitness / contagem do nicho) de cada indivíduo na população."""
+        individuals = population.individuals
+        if not individuals:
+            return
+        # Apenas os pares dentro do raio de nicho contribuem; cada indivíduo conta para o próprio nicho
+        rows, cols, distances = self._distance_metric.find_neighbors(individuals, self._sigma_share)
+        sharing = 1 - (distances / self._sigma_share) ** self._alpha
+        niche_counts = 1.0 + (
+            np.bincount(rows, weights=sharing, minlength=len(individuals))
+            + np.bincount(cols, weights=sharing, minlength=len(individuals))
+        )
+
+        # Ajusta o fitness dividindo-o pela contagem do nicho
+        shaped = population.fitness_values / niche_counts
+        for individual, shaped_fitness in zip(individuals, shaped.tolist()):
+            individual.shaped_fitness = shaped_fitness
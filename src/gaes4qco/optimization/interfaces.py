@@ -1,24 +1,168 @@
 from abc import ABC, abstractmethod
-from typing import Tuple
+from typing import Dict, Hashable, List, Optional, Tuple
+
+import numpy as np
 
 from quantum_circuit.circuit import Circuit
 from evolutionary_algorithm.population import Population
 
 
+# (fitness, fidelidade, detalhes): os detalhes são o que o avaliador precisa para refazer,
+# em um acerto de cache, os efeitos da avaliação (None quando não há nenhum)
+EvaluationResult = Tuple[float, float, Optional[Tuple[float, ...]]]
+# Entrada do cache de avaliações: o resultado e o estado de saída guardado pelo índice de
+# fenótipos ('IPhenotypeIndex.summary'), None quando o índice não guarda estados
+CachedEvaluation = Tuple[float, float, Optional[Tuple[float, ...]], Optional[np.ndarray]]
+
+
 class IFitnessEvaluator(ABC):
     """Interface para qualquer classe que calcula o fitness de um circuito."""
 
+    # True quando o fitness depende da profundidade nominal do genoma (e não só do estado preparado)
+    depth_sensitive: bool = False
+    # True quando 'replay' precisa dos detalhes devolvidos por 'evaluate_with_details'
+    uses_details: bool = False
+
     @abstractmethod
     def evaluate(self, circuit: Circuit) -> Tuple[float, float]:
         """Calcula e retorna o valor de fitness de um único circuito."""
         pass
 
+    def evaluate_many(self, circuits: List[Circuit]) -> List[Tuple[float, float]]:
+        """Avalia um lote de circuitos. Avaliadores que se beneficiam de lotes sobrescrevem este método."""
+        return [self.evaluate(circuit) for circuit in circuits]
+
+    def evaluate_with_details(self, circuit: Circuit) -> EvaluationResult:
+        """Como 'evaluate', devolvendo também os detalhes usados por 'replay' (None por padrão)."""
+        fitness, fidelity = self.evaluate(circuit)
+        return fitness, fidelity, None
+
+    def evaluate_many_with_details(self, circuits: List[Circuit]) -> List[EvaluationResult]:
+        """Como 'evaluate_many', devolvendo também os detalhes usados por 'replay'."""
+        return [(fitness, fidelity, None) for fitness, fidelity in self.evaluate_many(circuits)]
+
+    def replay(self, circuit: Circuit, fitness: float, fidelity: float, details: Optional[Tuple[float, ...]]):
+        """Refaz os efeitos de uma avaliação recuperada do cache (por padrão, nenhum)."""
+        pass
+
+
+class IEvaluationCache(ABC):
+    """Interface para caches de resultados de avaliação (fitness, fidelidade, detalhes, estado de saída)."""
+
+    @abstractmethod
+    def get(self, key: Hashable) -> Optional[CachedEvaluation]:
+        """Retorna o resultado guardado para a chave, ou None."""
+        pass
+
+    @abstractmethod
+    def put(self, key: Hashable, result: CachedEvaluation):
+        """Guarda o resultado da avaliação associado à chave."""
+        pass
+
+    @abstractmethod
+    def flush(self):
+        """Persiste os resultados ainda pendentes (se houver armazenamento externo)."""
+        pass
+
+    @abstractmethod
+    def stats(self) -> Dict[str, float]:
+        """Retorna os contadores de acertos/consultas e a taxa de acerto."""
+        pass
+
+
+class ISimulationService(ABC):
+    """Interface para serviços que simulam lotes de circuitos e devolvem seus vetores de estado."""
+
+    @abstractmethod
+    def simulate_batch(self, circuits: List[Circuit]) -> List[np.ndarray]:
+        """Retorna o vetor de estado (2**n,) de cada circuito, na mesma ordem."""
+        pass
+
 
 class IFitnessShaper(ABC):
     """Interface para classes que ajustam/modelam o fitness de uma população inteira."""
     @abstractmethod
     def shape(self, population: Population):
-        """Aplica uma transformação nos valores de fitness dos indivíduos da população."""
+        """Define o 'shaped_fitness' (usado na seleção) dos indivíduos, sem alterar o fitness bruto."""
+        pass
+
+
+class IFidelityProxy(ABC):
+    """Interface para estimativas baratas da fidelidade de um circuito."""
+
+    @abstractmethod
+    def estimate(self, circuit: Circuit) -> float:
+        """Retorna uma estimativa da fidelidade, sem alterar o circuito."""
+        pass
+
+
+class IOffspringScreener(ABC):
+    """Interface para classes que decidem quais descendentes recebem a avaliação exata."""
+
+    @abstractmethod
+    def screen(self, population: Population) -> Population:
+        """Retorna a população sem os indivíduos não avaliados que foram descartados."""
+        pass
+
+    @abstractmethod
+    def update(self, evaluated: List[Circuit]):
+        """Recebe os indivíduos que acabaram de ser avaliados de forma exata."""
+        pass
+
+    @abstractmethod
+    def collect_metrics(self) -> Dict[str, float]:
+        """Retorna (e reinicia) as métricas acumuladas desde a última coleta."""
+        pass
+
+
+class IPhenotypeIndex(ABC):
+    """Interface para índices dos estados de saída (fenótipos) dos circuitos avaliados."""
+
+    # True quando 'summary' devolve estados (que o cache de avaliações precisa guardar)
+    stores_states: bool = False
+
+    @abstractmethod
+    def record(self, circuit: Circuit, statevector: np.ndarray):
+        """Registra o vetor de estado preparado pelo circuito recém-avaliado."""
+        pass
+
+    @abstractmethod
+    def summary(self, circuit: Circuit) -> Optional[np.ndarray]:
+        """Retorna o estado guardado para o circuito (para acompanhar o resultado no cache), ou None."""
+        pass
+
+    @abstractmethod
+    def restore(self, circuit: Circuit, summary: np.ndarray):
+        """Registra, a partir de um estado devolvido por 'summary', um circuito cujo resultado veio do cache."""
+        pass
+
+    @abstractmethod
+    def cull(self, population: Population) -> Population:
+        """Retorna a população sem as duplicatas fenotípicas de menor fitness."""
+        pass
+
+    @abstractmethod
+    def collect_metrics(self, population: Population) -> Dict[str, float]:
+        """Retorna (e reinicia) as métricas do índice, incluindo a diversidade fenotípica da população."""
+        pass
+
+
+class IParetoArchive(ABC):
+    """Interface para arquivos externos das melhores soluções de compromisso (fidelidade x profundidade)."""
+
+    @abstractmethod
+    def update(self, individuals: List[Circuit]):
+        """Oferece ao arquivo os indivíduos recém-avaliados (os que ainda precisam de avaliação são ignorados)."""
+        pass
+
+    @abstractmethod
+    def seeds(self, count: int) -> List[Circuit]:
+        """Retorna até 'count' circuitos do arquivo, espalhados ao longo da fronteira, para semear uma população."""
+        pass
+
+    @abstractmethod
+    def to_dict(self) -> dict:
+        """Converte o arquivo para um dicionário serializável."""
         pass
 
 
@@ -30,6 +174,11 @@ class IProgressObserver(ABC):
         """Método chamado a cada geração para registrar o estado da população."""
         pass
 
+    @abstractmethod
+    def record_metric(self, name: str, value: float):
+        """Registra uma métrica escalar da geração corrente (ex: número de avaliações reais)."""
+        pass
+
     @abstractmethod
     def save(self):
         """Salva os dados coletados ao final da execução."""
@@ -0,0 +1,141 @@
+from typing import Dict, List
+
+import numpy as np
+from qiskit.quantum_info import Statevector
+
+from .interfaces import IOffspringScreener, IFidelityProxy
+from evolutionary_algorithm.population import Population
+from quantum_circuit.circuit import Circuit
+from quantum_circuit.simulator import NativeStatevectorSimulator
+
+
+class AmplitudeSubsetProxy(IFidelityProxy):
+    """
+    Estima a fidelidade pela sobreposição restrita a um subconjunto aleatório (fixo)
+    de amplitudes. O valor é a similaridade de cosseno ao quadrado no subconjunto: vale 1
+    quando o estado coincide com o alvo (a menos de fase global) e nunca ultrapassa 1.
+    O estado de saída é simulado por inteiro (em precisão simples) antes de ser restrito
+    ao subconjunto, de modo que este proxy custa quase o mesmo que a avaliação exata; o
+    padrão é o TruncatedColumnProxy, que de fato simula menos.
+    """
+
+    def __init__(
+            self,
+            target_statevector: Statevector,
+            simulator: NativeStatevectorSimulator,
+            amplitude_fraction: float,
+            seed: int = 0
+    ):
+        target = np.asarray(target_statevector.data)
+        num_amplitudes = max(1, int(round(amplitude_fraction * len(target))))
+        # Subconjunto fixo: não consome o gerador global, que é semeado pelo experimento
+        rng = np.random.default_rng(seed)
+        self._indices = np.sort(rng.choice(len(target), size=num_amplitudes, replace=False))
+        self._target = target[self._indices].astype(np.complex64)
+        self._target_norm = float(np.vdot(self._target, self._target).real)
+        self._simulator = simulator
+
+    def estimate(self, circuit: Circuit) -> float:
+        state = self._simulator.simulate(circuit, dtype=np.complex64)[self._indices]
+        state_norm = float(np.vdot(state, state).real)
+        if state_norm == 0.0 or self._target_norm == 0.0:
+            return 0.0
+        overlap = np.vdot(self._target, state)
+        return float(abs(overlap) ** 2 / (self._target_norm * state_norm))
+
+
+class TruncatedColumnProxy(IFidelityProxy):
+    """
+    Estima a fidelidade simulando apenas as primeiras 'max_columns' colunas do circuito.
+    Para circuitos com profundidade até 'max_columns' o valor é exato (em precisão simples).
+    """
+
+    def __init__(self, target_statevector: Statevector, simulator: NativeStatevectorSimulator, max_columns: int):
+        self._target = np.asarray(target_statevector.data).astype(np.complex64)
+        self._simulator = simulator
+        self._max_columns = max_columns
+
+    def estimate(self, circuit: Circuit) -> float:
+        state = self._simulator.simulate(circuit, max_columns=self._max_columns, dtype=np.complex64)
+        return float(abs(np.vdot(self._target, state)) ** 2)
+
+
+class MultiFidelityScreener(IOffspringScreener):
+    """
+    Avaliação em dois níveis. Todo descendente não avaliado recebe primeiro a estimativa
+    barata do 'proxy'. Apenas os candidatos cuja estimativa fica a menos de 'margin' do
+    corte atual dos sobreviventes de elite (a fidelidade do 'elitism_count'-ésimo melhor
+    indivíduo já avaliado) seguem para a simulação exata; os demais são descartados da
+    geração, como no filtro por modelo substituto. Se o descarte deixasse a população
+    menor que 'population_size', os descartados de maior estimativa voltam e também
+    recebem a avaliação exata. A estimativa nunca é usada como fitness: ela fica apenas
+    no filtro, para medir o erro do proxy.
+
+    Como o corte final da elite nunca é menor que o corte usado aqui, o conjunto de elite
+    é idêntico ao da avaliação exata sempre que o erro do proxy for menor que 'margin'.
+    O maior erro observado nos candidatos promovidos é reportado para calibrar a margem.
+    """
+
+    def __init__(self, proxy: IFidelityProxy, population_size: int, elitism_count: int, margin: float):
+        self._proxy = proxy
+        self._population_size = population_size
+        self._elitism_count = max(1, elitism_count)
+        self._margin = margin
+
+        self._estimates: Dict[int, float] = {}
+        self._num_discarded = 0
+        self._errors: List[float] = []
+
+    def _elite_cutoff(self, individuals: List[Circuit]) -> float:
+        evaluated_fidelities = sorted(
+            (ind.fidelity for ind in individuals if not ind.needs_evaluation),
+            reverse=True
+        )
+        if len(evaluated_fidelities) < self._elitism_count:
+            return float("-inf")
+        return evaluated_fidelities[self._elitism_count - 1]
+
+    def screen(self, population: Population) -> Population:
+        individuals = population.individuals
+        cutoff = self._elite_cutoff(individuals)
+        if cutoff == float("-inf"):
+            return population
+
+        rejected = []
+        for ind in individuals:
+            if not ind.needs_evaluation:
+                continue
+            estimate = self._proxy.estimate(ind)
+            if estimate >= cutoff - self._margin:
+                # Promovido: permanece pendente para a avaliação exata
+                self._estimates[id(ind)] = estimate
+            else:
+                rejected.append((estimate, ind))
+
+        # Os rejeitados de maior estimativa completam a população, se necessário
+        rejected.sort(key=lambda item: item[0], reverse=True)
+        num_refill = max(0, self._population_size - (len(individuals) - len(rejected)))
+        for estimate, ind in rejected[:num_refill]:
+            self._estimates[id(ind)] = estimate
+        discarded = {id(ind) for _, ind in rejected[num_refill:]}
+        if not discarded:
+            return population
+        self._num_discarded += len(discarded)
+        return Population([ind for ind in individuals if id(ind) not in discarded])
+
+    def update(self, evaluated: List[Circuit]):
+        for ind in evaluated:
+            estimate = self._estimates.pop(id(ind), None)
+            if estimate is not None:
+                self._errors.append(abs(estimate - ind.fidelity))
+
+    def collect_metrics(self) -> Dict[str, float]:
+        """Retorna quantos candidatos foram descartados pela estimativa e o maior erro do proxy."""
+        metrics = {
+            "proxy_evaluations_saved": self._num_discarded,
+            "proxy_max_error": max(self._errors) if self._errors else 0.0,
+        }
+        self._num_discarded = 0
+        self._errors = []
+        self._estimates.clear()
+        return metrics
@@ -0,0 +1,103 @@
+import heapq
+import itertools
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from quantum_circuit.circuit import Circuit
+from quantum_circuit.compact import CompactGenome
+
+
+class MultiTargetArchive:
+    """
+    Guarda, para cada estado alvo, os melhores circuitos (elite) e a fronteira de Pareto
+    (fidelidade x profundidade) encontrados ao longo de toda a execução.
+    Os circuitos são guardados como CompactGenome (use 'to_circuit' para voltar ao Circuit).
+    É alimentado com os vetores de fidelidade calculados a partir de uma única simulação
+    por circuito, de modo que todos os alvos aproveitam as mesmas avaliações.
+    """
+
+    def __init__(self, elite_size: int):
+        self._elite_size = max(1, elite_size)
+        self._counter = itertools.count()
+        # Min-heaps de (fidelidade, desempate, genoma) por alvo
+        self._elites: List[List[Tuple[float, int, CompactGenome]]] = []
+        # Melhor (fidelidade, genoma) para cada profundidade, por alvo
+        self._best_by_depth: List[Dict[int, Tuple[float, CompactGenome]]] = []
+
+    def _ensure_targets(self, num_targets: int):
+        while len(self._elites) < num_targets:
+            self._elites.append([])
+            self._best_by_depth.append({})
+
+    def update(self, circuit: Circuit, target_fidelities: np.ndarray, fitness: float, fidelity: float):
+        """
+        Registra as fidelidades de 'circuit' para todos os alvos. Compacta o circuito apenas se ele
+        entrar no arquivo, guardando 'fitness' e 'fidelity' (o circuito ainda não os recebeu).
+        """
+        self._ensure_targets(len(target_fidelities))
+        snapshot: Optional[CompactGenome] = None
+        depth = circuit.depth
+
+        for k, target_fidelity in enumerate(target_fidelities):
+            target_fidelity = float(target_fidelity)
+            elites = self._elites[k]
+            enters_elite = (
+                (len(elites) < self._elite_size or target_fidelity > elites[0][0])
+                and not self._already_in_elite(elites, circuit, target_fidelity)
+            )
+            best = self._best_by_depth[k].get(depth)
+            enters_front = best is None or target_fidelity > best[0]
+            if not (enters_elite or enters_front):
+                continue
+
+            if snapshot is None:
+                snapshot = CompactGenome.from_circuit(circuit)
+                snapshot.fitness, snapshot.fidelity = fitness, fidelity
+            if enters_elite:
+                entry = (target_fidelity, next(self._counter), snapshot)
+                if len(elites) < self._elite_size:
+                    heapq.heappush(elites, entry)
+                else:
+                    heapq.heapreplace(elites, entry)
+            if enters_front:
+                self._best_by_depth[k][depth] = (target_fidelity, snapshot)
+
+    @staticmethod
+    def _already_in_elite(elites: List[Tuple[float, int, CompactGenome]], circuit: Circuit, fidelity: float) -> bool:
+        """Evita que cópias do mesmo circuito ocupem várias vagas da elite."""
+        for elite_fidelity, _, elite_circuit in elites:
+            if elite_fidelity == fidelity and elite_circuit.get_canonical_key() == circuit.get_canonical_key():
+                return True
+        return False
+
+    @property
+    def num_targets(self) -> int:
+        return len(self._elites)
+
+    def elites(self, target_index: int) -> List[Tuple[float, CompactGenome]]:
+        """Elite do alvo, da maior para a menor fidelidade."""
+        ranked = sorted(self._elites[target_index], key=lambda entry: entry[0], reverse=True)
+        return [(fidelity, circuit) for fidelity, _, circuit in ranked]
+
+    def pareto_front(self, target_index: int) -> List[Tuple[float, CompactGenome]]:
+        """Pontos não dominados (maior fidelidade, menor profundidade), em ordem crescente de profundidade."""
+        front = []
+        best_fidelity = float("-inf")
+        for depth in sorted(self._best_by_depth[target_index]):
+            fidelity, circuit = self._best_by_depth[target_index][depth]
+            if fidelity > best_fidelity:
+                front.append((fidelity, circuit))
+                best_fidelity = fidelity
+        return front
+
+    def to_dict(self, target_names: Optional[List[str]] = None) -> dict:
+        """Converte o arquivo para um dicionário serializável."""
+        targets = []
+        for k in range(self.num_targets):
+            targets.append({
+                "target": target_names[k] if target_names and k < len(target_names) else k,
+                "elites": [dict(circuit.to_dict(), target_fidelity=f) for f, circuit in self.elites(k)],
+                "pareto_front": [dict(circuit.to_dict(), target_fidelity=f) for f, circuit in self.pareto_front(k)],
+            })
+        return {"targets": targets}
@@ -1,8 +1,11 @@
 # optimization/observer.py
 
 import json
+from typing import Optional
+
 import numpy as np
 from .interfaces import IProgressObserver
+from analysis.interfaces import IDistanceMetric
 from evolutionary_algorithm.population import Population
 
 
@@ -11,8 +14,9 @@ class JsonProgressObserver(IProgressObserver):
     ## Implementa um observador que coleta estatísticas e salva em um arquivo JSON.
     """
 
-    def __init__(self, filename: str):
+    def __init__(self, filename: str, distance_metric: Optional[IDistanceMetric] = None):
         self._filename = filename
+        self._distance_metric = distance_metric
         self._data_to_save = {
             "fitness_per_generation": [],
             "fidelity_per_generation": [],
@@ -23,11 +27,11 @@ class JsonProgressObserver(IProgressObserver):
 
     def update(self, generation: int, population: Population):
         """Coleta os dados de fitness da população atual."""
-        individuals = population.get_individuals()
-        individuals.sort(key=lambda individual: (individual.fitness, individual.fidelity), reverse=True)
-        fitness_values = [ind.fitness for ind in individuals]
-        fidelity_values = [ind.fidelity for ind in individuals]
-        diversity = population.calculate_structural_diversity()
+        # Ordena por (fitness, fidelidade) decrescentes diretamente sobre os arrays da população
+        order = np.lexsort((population.fidelity_values, population.fitness_values))[::-1]
+        fitness_values = population.fitness_values[order].tolist()
+        fidelity_values = population.fidelity_values[order].tolist()
+        diversity = population.calculate_structural_diversity(self._distance_metric)
 
         self._data_to_save["fitness_per_generation"].append(fitness_values)
         self._data_to_save["fidelity_per_generation"].append(fidelity_values)
@@ -43,6 +47,10 @@ class JsonProgressObserver(IProgressObserver):
                 f"Avg Fitness: {avg_fitness:.4f} | Diversity: {diversity:.4f}"
             )
 
+    def record_metric(self, name: str, value: float):
+        """Acumula a métrica em uma série '<name>_per_generation'."""
+        self._data_to_save.setdefault(f"{name}_per_generation", []).append(value)
+
     def save(self):
         """Salva o dicionário de dados no arquivo JSON."""
         print(f"Saving results to {self._filename}...")
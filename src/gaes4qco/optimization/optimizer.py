@@ -1,10 +1,17 @@
-from typing import List, Optional
+from itertools import chain
+from typing import Iterable, Iterator, List, Optional
+
+import numpy as np
+
+from analysis.interfaces import IDistanceMetric
+from quantum_circuit.circuit import Circuit
 
 from evolutionary_algorithm.population_factory import PopulationFactory
 from evolutionary_algorithm.interfaces import ISelectionStrategy, IMutationPopulation, IPopulationCrossover
 from evolutionary_algorithm.population import Population
 from evolutionary_algorithm.rate_adapter import IRateAdapter
-from .interfaces import IFitnessEvaluator, IProgressObserver, IFitnessShaper
+from .fitness import EvaluationCounter
+from .interfaces import IFitnessEvaluator, IProgressObserver, IFitnessShaper, IOffspringScreener, IPhenotypeIndex, IParetoArchive
 
 
 class Optimizer:
@@ -16,6 +23,7 @@ class Optimizer:
     def __init__(
             self,
             fitness_evaluator: IFitnessEvaluator,
+            evaluation_counter: EvaluationCounter,
             parent_selection: ISelectionStrategy,
             survivor_selection: ISelectionStrategy,
             crossover: IPopulationCrossover,
@@ -25,9 +33,16 @@ class Optimizer:
             diversity_threshold: float,
             injection_rate: float,
             fitness_shaper: IFitnessShaper,
-            observer: IProgressObserver
+            observer: IProgressObserver,
+            offspring_screener: IOffspringScreener,
+            phenotype_index: IPhenotypeIndex,
+            distance_metric: IDistanceMetric,
+            pareto_archive: IParetoArchive,
+            streaming_pipeline: bool = False,
+            use_evolutionary_strategy: bool = False
     ):
         self._fitness_evaluator = fitness_evaluator
+        self._evaluation_counter = evaluation_counter
         self._parent_selection = parent_selection
         self._survivor_selection = survivor_selection
         self._crossover = crossover
@@ -38,6 +53,23 @@ class Optimizer:
         self._injection_rate = injection_rate
         self._fitness_shaper = fitness_shaper
         self._observer = observer
+        self._offspring_screener = offspring_screener
+        self._phenotype_index = phenotype_index
+        self._distance_metric = distance_metric
+        self._pareto_archive = pareto_archive
+        # Gera os descendentes como um pipeline de geradores (seleção -> cruzamento -> mutação ->
+        # deduplicação por genoma), materializando apenas a população a ser avaliada
+        self._streaming_pipeline = streaming_pipeline
+        # Os indivíduos injetados recebem StepSizes quando a fase usa a Estratégia Evolucionária
+        self._use_evolutionary_strategy = use_evolutionary_strategy
+        self._duplicates_rejected = 0
+
+        # Avaliações já repassadas ao filtro de descendentes e ao arquivo de Pareto
+        self._offered_evaluations = set()
+
+        # Número de simulações exatas realizadas em cada geração, incluindo as feitas pelas
+        # mutações que avaliam circuitos (acertos do cache de avaliações não contam)
+        self.evaluations_per_generation: List[int] = []
 
     def run(
             self,
@@ -56,31 +88,47 @@ class Optimizer:
         for gen in range(max_generations):
             if self._observer:
                 self._observer.update(gen, current_population)
-            current_diversity = current_population.calculate_structural_diversity()
+            evaluations_before = self._evaluation_counter.count
+            self._duplicates_rejected = 0
+            populations_before = Population.instance_count
+            copies_before = Circuit.copy_count
+            current_diversity = current_population.calculate_structural_diversity(self._distance_metric)
             if current_diversity < self._diversity_threshold:
                 print(f"  -> Low diversity detected ({current_diversity:.4f}). Injecting fresh individuals.")
-                self._inject_fresh_blood(current_population)
+                current_population = self._inject_fresh_blood(current_population)
 
             current_rates = self._rate_adapter.adapt(current_diversity)
             self._crossover.crossover_rate = current_rates.crossover_rate
             self._mutation.mutation_rate = current_rates.mutation_rate
-            # 1. Seleção dos Pais
-            parent_population = self._parent_selection.select(current_population)
-
-            # 2. Cruzamento
-            offspring_population = self._crossover.run(parent_population)
-
-            # 3. Mistura a antiga população com a nova, evitando duplicatas
-            offspring_population = Population(offspring_population.get_individuals() + current_population.get_individuals())
-            population_without_duplicates = offspring_population.without_duplicates()
-
-            # 4. Mutação
-            mutated_population = self._mutation.mutate(population_without_duplicates)
-
-            # 5. Avaliação dos novos indivíduos
+            # 1-4. Seleção dos pais, cruzamento, mistura com a população atual, deduplicação e mutação
+            if self._streaming_pipeline:
+                mutated_population = self._breed_streaming(current_population)
+            else:
+                mutated_population = self._breed(current_population)
+
+            # 5. Pré-seleção (opcional) e avaliação dos novos indivíduos
+            mutated_population = self._offspring_screener.screen(mutated_population)
             self._evaluate_population(mutated_population)
 
+            # 6. Remove duplicatas fenotípicas (mesmo estado de saída) antes da seleção
+            mutated_population = self._phenotype_index.cull(mutated_population)
             current_population = self._survivor_selection.select(mutated_population)
+            # Só os sobreviventes (e suas cópias) podem voltar a aparecer
+            self._offered_evaluations = {ind.evaluation_id for ind in current_population}
+
+            num_evaluations = self._evaluation_counter.count - evaluations_before
+            self.evaluations_per_generation.append(num_evaluations)
+            generation_metrics = {
+                "populations_allocated": Population.instance_count - populations_before,
+                "circuit_copies": Circuit.copy_count - copies_before,
+                "duplicates_rejected": self._duplicates_rejected,
+            }
+            generation_metrics.update(self._offspring_screener.collect_metrics())
+            generation_metrics.update(self._phenotype_index.collect_metrics(current_population))
+            if self._observer:
+                self._observer.record_metric("evaluations", num_evaluations)
+                for name, value in generation_metrics.items():
+                    self._observer.record_metric(name, value)
 
             if fidelity_threshold:
                 best_ind = current_population.get_fittest()
@@ -93,35 +141,99 @@ class Optimizer:
 
         return current_population
 
-    def _evaluate_population(self, population: Population):
+    def _breed(self, current_population: Population) -> Population:
+        # 1. Seleção dos Pais
+        parent_population = self._parent_selection.select(current_population)
+
+        # 2. Cruzamento
+        offspring_population = self._crossover.run(parent_population)
+
+        # 3. Mistura a antiga população com a nova, evitando duplicatas
+        offspring_population = Population(offspring_population.get_individuals() + current_population.get_individuals())
+        population_without_duplicates = offspring_population.without_duplicates()
+        self._duplicates_rejected += len(offspring_population) - len(population_without_duplicates)
+
+        # 4. Mutação
+        return self._mutation.mutate(population_without_duplicates)
+
+    def _breed_streaming(self, current_population: Population) -> Population:
+        """
+        ## Mesmas etapas de '_breed' como geradores encadeados: cada indivíduo passa pelo
+        ## cruzamento, pela deduplicação, pela mutação (que só copia quem muda) e por uma
+        ## segunda deduplicação antes do próximo. Assim, mutantes que repetem um genoma já
+        ## gerado também são descartados antes de chegar ao avaliador.
+        """
+        individuals = current_population.individuals
+        parents = [individuals[i] for i in self._parent_selection.select_indices(current_population).tolist()]
+        offspring = self._crossover.run_stream(parents)
+        unique = self._unique_genomes(chain(offspring, individuals))
+        return Population(list(self._unique_genomes(self._mutation.mutate_stream(unique))))
+
+    def _unique_genomes(self, individuals: Iterable[Circuit]) -> Iterator[Circuit]:
+        """Repassa o primeiro indivíduo de cada forma canônica e descarta (e conta) as repetições."""
+        seen = set()
+        for individual in individuals:
+            key = individual.get_canonical_key()
+            if key in seen:
+                self._duplicates_rejected += 1
+                continue
+            seen.add(key)
+            yield individual
+
+    def _evaluate_population(self, population: Population) -> List[Circuit]:
         """
         ## Helper para calcular o fitness de cada indivíduo que ainda não foi avaliado.
         ## Substitui a antiga função 'applyFitnessIntoCircuit'.
+        ## Apenas indivíduos cujo genoma mudou desde a última avaliação são simulados.
+        ## Retorna os indivíduos efetivamente avaliados.
         """
-        for individual in population.get_individuals():
-            if individual.fitness == 0.0:  # Assume 0.0 como não avaliado
-                individual.fitness, individual.fidelity = self._fitness_evaluator.evaluate(individual)
+        evaluated = [individual for individual in population if individual.needs_evaluation]
+        results = self._fitness_evaluator.evaluate_many(evaluated)
+        for individual, (fitness, fidelity) in zip(evaluated, results):
+            individual.set_evaluation(fitness, fidelity)
+        fresh = self._unseen_evaluations(population)
+        self._offspring_screener.update(fresh)
+        self._pareto_archive.update(fresh)
         self._fitness_shaper.shape(population)
+        return evaluated
 
-    def _inject_fresh_blood(self, population: Population):
-        """Substitui os piores indivíduos por novos indivíduos aleatórios."""
+    def _unseen_evaluations(self, population: Population) -> List[Circuit]:
+        """
+        Indivíduos avaliados ainda não oferecidos ao filtro e ao arquivo, incluindo os
+        avaliados pelas próprias mutações (que já chegam sem precisar de avaliação).
+        """
+        fresh = []
+        for individual in population:
+            if individual.needs_evaluation or individual.evaluation_id in self._offered_evaluations:
+                continue
+            self._offered_evaluations.add(individual.evaluation_id)
+            fresh.append(individual)
+        return fresh
+
+    def _inject_fresh_blood(self, population: Population) -> Population:
+        """Retorna a população com os piores indivíduos substituídos por novos indivíduos aleatórios."""
         num_to_inject = int(len(population) * self._injection_rate)
         if num_to_inject == 0 or not population:
-            return
+            return population
 
-        sample_ind = population.get_individuals()[0]
+        sample_ind = population[0]
         min_depth = max(1, sample_ind.depth // 2)
 
         new_individuals_pop = self._population_factory.create(
             population_size=num_to_inject,
             num_qubits=sample_ind.count_qubits,
             max_depth=sample_ind.depth,
-            min_depth=min_depth
+            min_depth=min_depth,
+            use_evolutionary_strategy=self._use_evolutionary_strategy
         )
         self._evaluate_population(new_individuals_pop)
 
+        # Substitui os piores (do pior para o melhor) pelos novos
         individuals = population.get_individuals()
-        individuals.sort(key=lambda ind: ind.fitness)  # Ordena do pior para o melhor
-
-        # Substitui os piores pelos novos
-        individuals[:num_to_inject] = new_individuals_pop.get_individuals()
+        worst = np.argsort(population.fitness_values, kind="stable")[:num_to_inject]
+        for index, new_individual in zip(worst.tolist(), new_individuals_pop):
+            individuals[index] = new_individual
+        merged = Population(individuals)
+        # O fitness ajustado (ex: Fitness Sharing) depende da população inteira
+        self._fitness_shaper.shape(merged)
+        return merged
@@ -0,0 +1,96 @@
+import bisect
+from typing import List, Tuple
+
+import numpy as np
+
+from .interfaces import IParetoArchive
+from quantum_circuit.circuit import Circuit
+from quantum_circuit.compact import CompactGenome
+
+
+class NullParetoArchive(IParetoArchive):
+    """Implementação padrão: não guarda nenhuma solução."""
+
+    def update(self, individuals: List[Circuit]):
+        pass
+
+    def seeds(self, count: int) -> List[Circuit]:
+        return []
+
+    def to_dict(self) -> dict:
+        return {"pareto_front": []}
+
+
+class ParetoArchive(IParetoArchive):
+    """
+    ## Arquivo externo e limitado da fronteira de Pareto (maior fidelidade, menor profundidade)
+    ## de toda a execução, alimentado com as avaliações de cada geração.
+    ## Com dois objetivos, a fronteira ordenada por profundidade crescente tem fidelidades
+    ## estritamente crescentes, então listas ordenadas bastam:
+    ## - dominância: uma busca binária pela profundidade compara o candidato apenas com o
+    ##   vizinho de profundidade menor ou igual (O(log N));
+    ## - inserção: os pontos dominados pelo candidato são os vizinhos seguintes com fidelidade
+    ##   menor ou igual, um trecho contíguo removido de uma vez.
+    ## Acima de 'max_size' pontos, sai o ponto interior de menor distância de multidão.
+    ## Os circuitos são guardados como CompactGenome, independentes da população.
+    """
+
+    def __init__(self, max_size: int):
+        self._max_size = max(2, max_size)
+        self._depths: List[int] = []
+        self._fidelities: List[float] = []
+        self._genomes: List[CompactGenome] = []
+
+    def __len__(self) -> int:
+        return len(self._genomes)
+
+    def update(self, individuals: List[Circuit]):
+        for individual in individuals:
+            if individual.needs_evaluation:
+                continue
+            self._insert(individual)
+
+    def dominates(self, fidelity: float, depth: int) -> bool:
+        """Indica se algum ponto do arquivo domina (ou iguala) o ponto (fidelidade, profundidade)."""
+        position = bisect.bisect_right(self._depths, depth)
+        return position > 0 and self._fidelities[position - 1] >= fidelity
+
+    def _insert(self, individual: Circuit) -> bool:
+        fidelity, depth = individual.fidelity, individual.depth
+        if self.dominates(fidelity, depth):
+            return False
+
+        position = bisect.bisect_left(self._depths, depth)
+        end = bisect.bisect_right(self._fidelities, fidelity, lo=position)
+        self._depths[position:end] = [depth]
+        self._fidelities[position:end] = [fidelity]
+        self._genomes[position:end] = [CompactGenome.from_circuit(individual)]
+        if len(self._genomes) > self._max_size:
+            self._evict()
+        return True
+
+    def _evict(self):
+        """Remove o ponto interior de menor distância de multidão (os extremos são mantidos)."""
+        depths = np.array(self._depths, dtype=float)
+        fidelities = np.array(self._fidelities)
+        depth_range = max(depths[-1] - depths[0], 1e-12)
+        fidelity_range = max(fidelities[-1] - fidelities[0], 1e-12)
+        crowding = (depths[2:] - depths[:-2]) / depth_range + (fidelities[2:] - fidelities[:-2]) / fidelity_range
+        index = int(np.argmin(crowding)) + 1
+        del self._depths[index], self._fidelities[index], self._genomes[index]
+
+    def front(self) -> List[Tuple[float, int, CompactGenome]]:
+        """Pontos do arquivo (fidelidade, profundidade, genoma), em ordem crescente de profundidade."""
+        return list(zip(self._fidelities, self._depths, self._genomes))
+
+    def seeds(self, count: int) -> List[Circuit]:
+        if count <= 0 or not self._genomes:
+            return []
+        if count >= len(self._genomes):
+            chosen = range(len(self._genomes))
+        else:
+            chosen = np.unique(np.linspace(0, len(self._genomes) - 1, count).round().astype(int)).tolist()
+        return [self._genomes[i].to_circuit() for i in chosen]
+
+    def to_dict(self) -> dict:
+        return {"pareto_front": [genome.to_dict() for genome in self._genomes]}
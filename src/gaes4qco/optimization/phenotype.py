@@ -0,0 +1,193 @@
+import hashlib
+from collections import OrderedDict
+from typing import Dict, Hashable, List, Optional, Tuple
+
+import numpy as np
+
+from .interfaces import IPhenotypeIndex
+from evolutionary_algorithm.population import Population
+from quantum_circuit.circuit import Circuit
+
+
+class NullPhenotypeIndex(IPhenotypeIndex):
+    """Implementação padrão: não indexa estados e não remove indivíduos."""
+
+    def record(self, circuit: Circuit, statevector: np.ndarray):
+        pass
+
+    def summary(self, circuit: Circuit) -> Optional[np.ndarray]:
+        return None
+
+    def restore(self, circuit: Circuit, summary: np.ndarray):
+        pass
+
+    def cull(self, population: Population) -> Population:
+        return population
+
+    def collect_metrics(self, population: Population) -> Dict[str, float]:
+        return {}
+
+
+class _PhenotypeEntry:
+    __slots__ = ("exact_hash", "band_keys", "state")
+
+    def __init__(self, exact_hash: bytes, band_keys: Tuple[Tuple[int, int], ...], state: np.ndarray):
+        self.exact_hash = exact_hash
+        self.band_keys = band_keys
+        self.state = state
+
+
+class PhenotypeIndex(IPhenotypeIndex):
+    """
+    ## Índice dos estados de saída já avaliados, indexado pela forma canônica do genoma.
+    ## - Duplicatas exatas: hash do vetor de estado com a fase global normalizada
+    ##   (a maior amplitude passa a ser real e positiva) e quantizado em 'decimals' casas.
+    ## - Quase-duplicatas: LSH por projeções aleatórias (SimHash) em 'lsh_bits' bits,
+    ##   divididos em 'lsh_bands' faixas; candidatos que colidem em alguma faixa são
+    ##   confirmados pela fidelidade entre os estados (>= 1 - 'near_tolerance').
+    ## Na seleção de sobreviventes, mantém o indivíduo de maior fitness de cada fenótipo
+    ## e descarta os demais, sem deixar o conjunto menor que 'population_size'.
+    """
+
+    stores_states = True
+
+    def __init__(
+            self,
+            population_size: int,
+            near_tolerance: float,
+            max_size: int,
+            decimals: int = 6,
+            lsh_bits: int = 32,
+            lsh_bands: int = 4
+    ):
+        self._population_size = population_size
+        self._near_tolerance = near_tolerance
+        self._max_size = max(1, max_size or 0)
+        self._scale = 10.0 ** decimals
+        self._lsh_bits = lsh_bits
+        self._lsh_bands = lsh_bands
+        # Hiperplanos fixos: não consomem o gerador global, que é semeado pelo experimento
+        self._rng = np.random.default_rng(0)
+        self._planes: Optional[np.ndarray] = None
+
+        self._entries: "OrderedDict[Hashable, _PhenotypeEntry]" = OrderedDict()
+        self._num_culled = 0
+
+    def record(self, circuit: Circuit, statevector: np.ndarray):
+        key = circuit.get_canonical_key()
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            return
+        state = self._normalize_phase(np.asarray(statevector).reshape(-1))
+        self._insert(key, state.astype(np.complex64))
+
+    def summary(self, circuit: Circuit) -> Optional[np.ndarray]:
+        entry = self._entries.get(circuit.get_canonical_key())
+        return entry.state if entry is not None else None
+
+    def restore(self, circuit: Circuit, summary: np.ndarray):
+        key = circuit.get_canonical_key()
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            return
+        self._insert(key, np.asarray(summary, dtype=np.complex64))
+
+    def _insert(self, key: Hashable, state: np.ndarray):
+        """
+        Hash e faixas são calculados a partir do estado em precisão simples, o mesmo que
+        'summary' devolve, para que 'restore' reproduza exatamente a entrada original.
+        """
+        features = np.concatenate([state.real, state.imag]).astype(np.float64)
+        quantized = np.round(features * self._scale).astype(np.int64)
+        exact_hash = hashlib.blake2b(quantized.tobytes(), digest_size=16).digest()
+
+        self._entries[key] = _PhenotypeEntry(exact_hash, self._band_keys(features), state)
+        if len(self._entries) > self._max_size:
+            self._entries.popitem(last=False)
+
+    @staticmethod
+    def _normalize_phase(state: np.ndarray) -> np.ndarray:
+        """Remove a fase global: a primeira amplitude de maior módulo (após arredondamento) fica real positiva."""
+        magnitudes = np.abs(state)
+        reference = state[int(np.argmax(np.round(magnitudes, 6)))]
+        if abs(reference) == 0.0:
+            return state
+        return state * (np.conj(reference) / abs(reference))
+
+    def _band_keys(self, features: np.ndarray) -> Tuple[Tuple[int, int], ...]:
+        if self._planes is None or self._planes.shape[1] != len(features):
+            self._planes = self._rng.standard_normal((self._lsh_bits, len(features)))
+        bits = (self._planes @ features) >= 0.0
+        band_width = self._lsh_bits // self._lsh_bands
+        weights = 1 << np.arange(band_width)
+        return tuple(
+            (band, int(bits[band * band_width:(band + 1) * band_width] @ weights))
+            for band in range(self._lsh_bands)
+        )
+
+    def _entry_for(self, individual: Circuit) -> Optional[_PhenotypeEntry]:
+        """Somente indivíduos com avaliação vigente têm fenótipo conhecido."""
+        if individual.needs_evaluation:
+            return None
+        return self._entries.get(individual.get_canonical_key())
+
+    def _find_duplicates(self, individuals: List[Circuit]) -> List[bool]:
+        """
+        Marca, na ordem recebida, os indivíduos cujo fenótipo já é representado por outro
+        de fitness maior ou igual. Indivíduos sem fenótipo conhecido nunca são duplicatas.
+        """
+        is_duplicate = [False] * len(individuals)
+        seen_hashes = set()
+        buckets: Dict[Tuple[int, int], List[_PhenotypeEntry]] = {}
+
+        for idx in sorted(range(len(individuals)), key=lambda i: individuals[i].fitness, reverse=True):
+            entry = self._entry_for(individuals[idx])
+            if entry is None:
+                continue
+            if entry.exact_hash in seen_hashes or self._has_near_duplicate(entry, buckets):
+                is_duplicate[idx] = True
+                continue
+            seen_hashes.add(entry.exact_hash)
+            for band_key in entry.band_keys:
+                buckets.setdefault(band_key, []).append(entry)
+        return is_duplicate
+
+    def _has_near_duplicate(self, entry: _PhenotypeEntry, buckets: Dict[Tuple[int, int], List[_PhenotypeEntry]]) -> bool:
+        checked = set()
+        for band_key in entry.band_keys:
+            for candidate in buckets.get(band_key, ()):
+                if id(candidate) in checked:
+                    continue
+                checked.add(id(candidate))
+                fidelity = abs(np.vdot(candidate.state, entry.state)) ** 2
+                if fidelity >= 1.0 - self._near_tolerance:
+                    return True
+        return False
+
+    def cull(self, population: Population) -> Population:
+        individuals = population.individuals
+        is_duplicate = self._find_duplicates(individuals)
+        duplicates = sorted(
+            (ind for ind, dup in zip(individuals, is_duplicate) if dup),
+            key=lambda ind: ind.fitness, reverse=True
+        )
+        if not duplicates:
+            return population
+
+        # Reaproveita as melhores duplicatas se faltarem indivíduos distintos
+        num_unique = len(individuals) - len(duplicates)
+        refill = {id(ind) for ind in duplicates[:max(0, self._population_size - num_unique)]}
+        kept = [ind for ind, dup in zip(individuals, is_duplicate) if not dup or id(ind) in refill]
+        self._num_culled += len(individuals) - len(kept)
+        return Population(kept)
+
+    def collect_metrics(self, population: Population) -> Dict[str, float]:
+        """Diversidade fenotípica (fração de fenótipos distintos) e duplicatas removidas desde a última coleta."""
+        individuals = population.individuals
+        num_duplicates = sum(self._find_duplicates(individuals))
+        metrics = {
+            "phenotype_diversity": 1.0 - num_duplicates / len(individuals) if individuals else 0.0,
+            "phenotype_duplicates_culled": self._num_culled,
+        }
+        self._num_culled = 0
+        return metrics
@@ -0,0 +1,188 @@
+import math
+import random
+import zlib
+from typing import Dict, List
+
+import numpy as np
+
+from .interfaces import IOffspringScreener
+from evolutionary_algorithm.population import Population
+from quantum_circuit.circuit import Circuit
+
+
+class NullOffspringScreener(IOffspringScreener):
+    """Um filtro que não faz nada. Todos os descendentes recebem avaliação exata."""
+
+    def screen(self, population: Population) -> Population:
+        return population
+
+    def update(self, evaluated: List[Circuit]):
+        pass
+
+    def collect_metrics(self) -> Dict[str, float]:
+        return {}
+
+
+class CircuitFeaturizer:
+    """
+    Converte um circuito em um vetor de características de tamanho fixo.
+    Os genes estruturais de 'get_structural_representation' são projetados por
+    'feature hashing' (com e sem o índice da coluna), e são acrescentadas
+    estatísticas dos parâmetros e da profundidade.
+    """
+
+    NUM_NUMERIC_FEATURES = 6
+
+    def __init__(self, num_buckets: int = 256):
+        self._num_buckets = num_buckets
+        self._bucket_cache: Dict[tuple, int] = {}
+
+    @property
+    def size(self) -> int:
+        return self._num_buckets + self.NUM_NUMERIC_FEATURES
+
+    def _bucket(self, key: tuple) -> int:
+        # crc32 é estável entre processos, ao contrário de hash() para strings
+        bucket = self._bucket_cache.get(key)
+        if bucket is None:
+            bucket = zlib.crc32(repr(key).encode("utf-8")) % self._num_buckets
+            self._bucket_cache[key] = bucket
+        return bucket
+
+    def transform(self, circuit: Circuit) -> np.ndarray:
+        features = np.zeros(self.size)
+        num_gates = 0
+        for column in circuit.get_structural_representation():
+            for gene in column:
+                features[self._bucket(gene)] += 1.0
+                features[self._bucket(gene[:-1])] += 1.0  # mesmo gene, independente da coluna
+                num_gates += 1
+        if num_gates:
+            features[:self._num_buckets] /= num_gates
+
+        parameters = [p for col in circuit.columns for gate in col.get_gates() for p in gate.parameters]
+        angles = np.asarray(parameters, dtype=float)
+        numeric = features[self._num_buckets:]
+        numeric[0] = 1.0  # intercepto
+        numeric[1] = circuit.depth / 10.0
+        numeric[2] = num_gates / max(1, circuit.depth * circuit.count_qubits)
+        if angles.size:
+            numeric[3] = angles.size / max(1, num_gates)
+            numeric[4] = float(np.mean(np.cos(angles)))
+            numeric[5] = float(np.std(angles)) / math.pi
+        return features
+
+
+class RidgeSurrogateModel:
+    """
+    Regressão ridge incremental. Mantém as estatísticas suficientes (X^T X e X^T y),
+    de modo que cada nova avaliação exata é incorporada em O(d^2) e o modelo é
+    resolvido apenas quando uma predição é solicitada após novas amostras.
+    """
+
+    def __init__(self, num_features: int, regularization: float = 1.0):
+        self._xtx = regularization * np.eye(num_features)
+        self._xty = np.zeros(num_features)
+        self._weights = np.zeros(num_features)
+        self._stale = False
+        self.num_samples = 0
+
+    def add_samples(self, features: np.ndarray, targets: np.ndarray):
+        if len(targets) == 0:
+            return
+        self._xtx += features.T @ features
+        self._xty += features.T @ targets
+        self.num_samples += len(targets)
+        self._stale = True
+
+    def predict(self, features: np.ndarray) -> np.ndarray:
+        if self._stale:
+            self._weights = np.linalg.solve(self._xtx, self._xty)
+            self._stale = False
+        return features @ self._weights
+
+
+class SurrogateOffspringScreener(IOffspringScreener):
+    """
+    Pré-seleciona os descendentes antes da simulação exata.
+    Um modelo substituto (ridge incremental), treinado com todas as avaliações
+    exatas anteriores, prevê a fidelidade dos indivíduos ainda não avaliados.
+    Somente a fração superior das predições, mais uma cota aleatória de exploração,
+    segue para a simulação; os demais são descartados da geração.
+    Nunca descarta a ponto de a população ficar menor que 'population_size'.
+    """
+
+    def __init__(self, population_size: int, top_fraction: float, exploration_rate: float, min_samples: int):
+        """
+        Args:
+            population_size (int): Tamanho mínimo da população após o descarte.
+            top_fraction (float): Fração dos descendentes com maior fidelidade prevista que é avaliada.
+            exploration_rate (float): Fração adicional, sorteada entre os demais, também avaliada.
+            min_samples (int): Número mínimo de avaliações exatas antes de o modelo passar a filtrar.
+        """
+        if not (0 < top_fraction <= 1):
+            raise ValueError("top_fraction must be in (0, 1].")
+        if not (0 <= exploration_rate <= 1):
+            raise ValueError("exploration_rate must be in [0, 1].")
+        self._population_size = population_size
+        self._top_fraction = top_fraction
+        self._exploration_rate = exploration_rate
+        self._min_samples = min_samples
+        self._featurizer = CircuitFeaturizer()
+        self._model = RidgeSurrogateModel(self._featurizer.size)
+
+        self._predictions: Dict[int, float] = {}
+        self._skipped = 0
+        self._errors: List[float] = []
+
+    def screen(self, population: Population) -> Population:
+        individuals = population.individuals
+        candidates = [ind for ind in individuals if ind.needs_evaluation]
+        if not candidates or self._model.num_samples < self._min_samples:
+            return population
+
+        features = np.stack([self._featurizer.transform(ind) for ind in candidates])
+        predicted = self._model.predict(features)
+
+        num_already_evaluated = len(individuals) - len(candidates)
+        num_top = max(
+            math.ceil(self._top_fraction * len(candidates)),
+            self._population_size - num_already_evaluated
+        )
+        order = np.argsort(-predicted, kind="stable")
+        selected = set(order[:num_top].tolist())
+        remaining = order[num_top:].tolist()
+        num_explore = min(len(remaining), math.ceil(self._exploration_rate * len(candidates)))
+        selected.update(random.sample(remaining, num_explore))
+
+        rejected = set()
+        for idx, ind in enumerate(candidates):
+            if idx in selected:
+                self._predictions[id(ind)] = float(predicted[idx])
+            else:
+                rejected.add(id(ind))
+        self._skipped += len(rejected)
+
+        return Population([ind for ind in individuals if id(ind) not in rejected])
+
+    def update(self, evaluated: List[Circuit]):
+        if not evaluated:
+            return
+        for ind in evaluated:
+            prediction = self._predictions.pop(id(ind), None)
+            if prediction is not None:
+                self._errors.append(abs(prediction - ind.fidelity))
+        features = np.stack([self._featurizer.transform(ind) for ind in evaluated])
+        targets = np.array([ind.fidelity for ind in evaluated])
+        self._model.add_samples(features, targets)
+
+    def collect_metrics(self) -> Dict[str, float]:
+        """Retorna o erro absoluto médio do substituto e as avaliações economizadas desde a última coleta."""
+        metrics = {
+            "surrogate_mae": float(np.mean(self._errors)) if self._errors else 0.0,
+            "surrogate_evaluations_saved": self._skipped,
+        }
+        self._errors = []
+        self._skipped = 0
+        self._predictions.clear()
+        return metrics
@@ -0,0 +1,68 @@
+from typing import Dict, List, Sequence, Tuple
+
+from qiskit.circuit.library.standard_gates import PhaseGate
+
+from .column import Column
+from .gate import Gate
+from .simplifier import SELF_INVERSE_GATES, SYMMETRIC_GATES, ROTATION_GATES, is_identity_gate
+
+# Casas decimais mantidas nos parâmetros, para absorver ruído de ponto flutuante
+PARAMETER_DECIMALS = 12
+
+CanonicalGene = Tuple[str, Tuple[int, ...], int, bool, Tuple[float, ...]]
+CanonicalForm = Tuple[Tuple[CanonicalGene, ...], ...]
+
+
+def canonical_gene(gate: Gate) -> CanonicalGene:
+    """
+    Representação normalizada de um gate (incluindo os parâmetros):
+    - gates simétricos sem controles têm os qubits ordenados;
+    - gates que são o próprio inverso perdem a marca de inversão;
+    - rotações e fases invertidas viram a rotação de ângulo negado.
+    """
+    qubits = tuple(gate.qubits)
+    if gate.gate_class in SYMMETRIC_GATES and gate.extra_controls == 0:
+        qubits = tuple(sorted(qubits))
+
+    parameters = list(gate.parameters)
+    is_inverse = gate.is_inverse
+    if gate.gate_class in SELF_INVERSE_GATES:
+        is_inverse = False
+    elif is_inverse and (gate.gate_class in ROTATION_GATES or gate.gate_class is PhaseGate):
+        parameters = [-p for p in parameters]
+        is_inverse = False
+
+    return (
+        gate.gate_class.__name__,
+        qubits,
+        gate.extra_controls,
+        is_inverse,
+        tuple(round(p, PARAMETER_DECIMALS) + 0.0 for p in parameters)
+    )
+
+
+def canonical_form(columns: Sequence[Column]) -> CanonicalForm:
+    """
+    ## Forma canônica do genoma, usada como chave de deduplicação e dos caches de avaliação.
+    ## - identidades são descartadas (e, com elas, colunas que só continham identidades);
+    ## - cada gate é empurrado para a coluna mais à esquerda possível: gates em qubits
+    ##   disjuntos comutam, então o circuito resultante é exatamente o mesmo unitário;
+    ## - os gates de cada coluna são ordenados.
+    ## Genomas que diferem apenas nesses aspectos recebem a mesma forma canônica.
+    """
+    layers: List[List[CanonicalGene]] = []
+    # Índice da última camada que usa cada qubit
+    frontier: Dict[int, int] = {}
+
+    for column in columns:
+        for gate in column.get_gates():
+            if is_identity_gate(gate):
+                continue
+            layer = max((frontier.get(q, -1) for q in gate.qubits), default=-1) + 1
+            if layer == len(layers):
+                layers.append([])
+            layers[layer].append(canonical_gene(gate))
+            for q in gate.qubits:
+                frontier[q] = layer
+
+    return tuple(tuple(sorted(layer)) for layer in layers)
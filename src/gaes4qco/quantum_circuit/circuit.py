@@ -1,6 +1,22 @@
-from typing import List, Set, Tuple
+import zlib
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .canonical import CanonicalForm, canonical_form
 from .column import Column
 
+# Id estável (entre processos) de cada classe de gate, usado nos genes estruturais
+_GATE_CLASS_CODES: Dict[type, int] = {}
+
+
+def _gate_class_code(gate_class: type) -> int:
+    code = _GATE_CLASS_CODES.get(gate_class)
+    if code is None:
+        code = zlib.crc32(gate_class.__name__.encode("utf-8"))
+        _GATE_CLASS_CODES[gate_class] = code
+    return code
+
 
 class Circuit:
     """
@@ -9,6 +25,15 @@ class Circuit:
     ## Os métodos 'build' e 'gen_random_circuit' foram movidos para o Adapter e a Factory.
     """
 
+    # Relógio global, incrementado sempre que fitness, fidelidade, rank, distância de multidão
+    # ou o genoma de algum circuito mudam. Cada circuito guarda a época da sua última alteração,
+    # que as populações comparam com a época em que montaram seus arrays de metadados
+    metadata_epoch: int = 0
+    # Total de cópias feitas por 'copy' no processo (métrica de alocação por geração)
+    copy_count: int = 0
+    # Total de avaliações registradas por 'set_evaluation' no processo (fonte dos 'evaluation_id')
+    evaluation_count: int = 0
+
     def __init__(
             self,
             count_qubits: int,
@@ -18,13 +43,124 @@ class Circuit:
     ):
         self.count_qubits = count_qubits
         self.columns = columns
-        self.fitness = fitness
-        self.fidelity = fidelity
+        # Atribuídos sem os setters: um circuito novo ainda não está nos caches de nenhuma população
+        self._fitness = fitness
+        self._fidelity = fidelity
+        # Fitness usado pelos operadores de seleção: igual ao fitness bruto, ou o valor
+        # ajustado pelo modelador (ex: Fitness Sharing), que nunca altera o fitness bruto
+        self._shaped_fitness = fitness
+
+        self._rank = -1  # Rank da Fronteira de Pareto
+        self._crowding_distance = 0.0  # Distância de multidão para desempate
+        # Valor de 'Circuit.metadata_epoch' na última alteração deste circuito
+        self._last_metadata_epoch = 0
+
+        # Representação estrutural (tuplas e ids inteiros) calculada para a versão '_structural_version'
+        self._structural_representation: Optional[Tuple[Tuple]] = None
+        self._structural_genes: Optional[np.ndarray] = None
+        self._structural_column_ids: Optional[np.ndarray] = None
+        self._structural_version: int = -1
+        # Contagens (gates, parâmetros, gates controlados) calculadas para a versão '_gene_counts_version'
+        self._gene_counts: Tuple[int, int, int] = (0, 0, 0)
+        self._gene_counts_version: int = -1
+
+        # Controle explícito do estado de avaliação: cada alteração estrutural ou de
+        # parâmetros incrementa a versão, e a avaliação registra a versão avaliada.
+        self._version: int = 0
+        self._evaluated_version: int = -1
+        self._evaluation_id: int = -1
+        # Forma canônica calculada para a versão '_canonical_version' do genoma
+        self._canonical_key: Optional[CanonicalForm] = None
+        self._canonical_version: int = -1
+        # Colunas exclusivas deste circuito (criadas por 'column_for_write'); as demais
+        # podem estar compartilhadas com pais, filhos e cópias e não devem ser alteradas
+        self._owned_columns: Dict[int, Column] = {}
+
+    @property
+    def last_metadata_epoch(self) -> int:
+        """Época (valor de 'Circuit.metadata_epoch') da última alteração dos metadados ou do genoma."""
+        return self._last_metadata_epoch
+
+    def _metadata_changed(self):
+        Circuit.metadata_epoch += 1
+        self._last_metadata_epoch = Circuit.metadata_epoch
+
+    @property
+    def fitness(self) -> float:
+        return self._fitness
+
+    @fitness.setter
+    def fitness(self, value: float):
+        self._fitness = value
+        self._metadata_changed()
+
+    @property
+    def shaped_fitness(self) -> float:
+        return self._shaped_fitness
+
+    @shaped_fitness.setter
+    def shaped_fitness(self, value: float):
+        self._shaped_fitness = value
+        self._metadata_changed()
+
+    @property
+    def fidelity(self) -> float:
+        return self._fidelity
+
+    @fidelity.setter
+    def fidelity(self, value: float):
+        self._fidelity = value
+        self._metadata_changed()
+
+    @property
+    def rank(self) -> int:
+        return self._rank
+
+    @rank.setter
+    def rank(self, value: int):
+        self._rank = value
+        self._metadata_changed()
+
+    @property
+    def crowding_distance(self) -> float:
+        return self._crowding_distance
 
-        self.rank: int = -1  # Rank da Fronteira de Pareto
-        self.crowding_distance: float = 0.0  # Distância de multidão para desempate
+    @crowding_distance.setter
+    def crowding_distance(self, value: float):
+        self._crowding_distance = value
+        self._metadata_changed()
 
-        self._structural_representation: Set[Tuple] = set()
+    @property
+    def version(self) -> int:
+        """Versão do genoma, incrementada a cada alteração feita pelos operadores."""
+        return self._version
+
+    @property
+    def needs_evaluation(self) -> bool:
+        """Indica se o genoma mudou desde a última avaliação (ou se nunca foi avaliado)."""
+        return self._evaluated_version != self._version
+
+    @property
+    def evaluation_id(self) -> int:
+        """Identifica a avaliação registrada (-1 se nenhuma); cópias não alteradas mantêm o id do original."""
+        return self._evaluation_id
+
+    def mark_dirty(self):
+        """
+        Sinaliza que o genoma foi alterado. Deve ser chamado por todo operador
+        que modifica colunas, gates ou parâmetros do circuito.
+        """
+        self._version += 1
+        self._metadata_changed()
+
+    def set_evaluation(self, fitness: float, fidelity: float):
+        """Registra o resultado de uma avaliação exata para a versão atual do genoma."""
+        self.fitness = fitness
+        self.shaped_fitness = fitness
+        self.fidelity = fidelity
+        self._evaluated_version = self._version
+        Circuit.evaluation_count += 1
+        self._evaluation_id = Circuit.evaluation_count
 
     @property
     def objectives(self) -> Tuple[float, ...]:
@@ -48,10 +184,54 @@ class Circuit:
                 (('HGate', (0,), 0, False),),
                 (('CXGate', (0, 1), 0, False),)
             )
+        O valor é recalculado apenas quando a versão muda.
+        """
+        self._update_structural_cache()
+        return self._structural_representation
+
+    def get_structural_genes(self) -> np.ndarray:
+        """
+        Ids inteiros (int64, ordenados) dos genes de 'get_structural_representation':
+        hash da classe do gate, qubits, controles, inversão e coluna.
+        O array é somente leitura e recalculado apenas quando a versão muda.
         """
+        self._update_structural_cache()
+        return self._structural_genes
+
+    def get_structural_column_ids(self) -> np.ndarray:
+        """
+        Ids inteiros (int64, ordenados e únicos) das colunas de 'get_structural_representation',
+        cada um o hash da sequência de genes da coluna. É o conjunto comparado pela distância
+        estrutural de Jaccard. Somente leitura e recalculado apenas quando a versão muda.
+        """
+        self._update_structural_cache()
+        return self._structural_column_ids
+
+    def get_gene_counts(self) -> Tuple[int, int, int]:
+        """
+        Retorna (número de gates, número de parâmetros, número de gates com controles extras),
+        usados pelas mutações para saber se podem ser aplicadas. Recalculado apenas quando a versão muda.
+        """
+        if self._gene_counts_version != self._version:
+            num_gates = num_parameters = num_controlled = 0
+            for col in self.columns:
+                for gate in col.get_gates():
+                    num_gates += 1
+                    num_parameters += len(gate.parameters)
+                    num_controlled += gate.extra_controls > 0
+            self._gene_counts = (num_gates, num_parameters, num_controlled)
+            self._gene_counts_version = self._version
+        return self._gene_counts
+
+    def _update_structural_cache(self):
+        if self._structural_version == self._version:
+            return
         representation = []
+        gene_ids = []
+        column_ids = []
         for i_col, col in enumerate(self.columns):
             col_repr = []
+            col_gene_ids = []
             for gate in col.get_gates():
                 qubits_tuple = tuple(sorted(gate.qubits))
                 gene = (
@@ -62,9 +242,48 @@ class Circuit:
                     i_col
                 )
                 col_repr.append(gene)
+                # Tuplas de inteiros têm hash determinístico (não dependem de PYTHONHASHSEED)
+                col_gene_ids.append(hash((
+                    _gate_class_code(gate.gate_class), qubits_tuple, gate.extra_controls, int(gate.is_inverse), i_col
+                )))
             representation.append(tuple(col_repr))
+            gene_ids.extend(col_gene_ids)
+            column_ids.append(hash((i_col, tuple(col_gene_ids))))
 
-        return tuple(representation)
+        genes = np.array(gene_ids, dtype=np.int64)
+        genes.sort()
+        genes.flags.writeable = False
+        columns = np.unique(np.array(column_ids, dtype=np.int64))
+        columns.flags.writeable = False
+
+        self._structural_representation = tuple(representation)
+        self._structural_genes = genes
+        self._structural_column_ids = columns
+        self._structural_version = self._version
+
+    def column_for_write(self, index: int) -> Column:
+        """
+        Copy-on-write: retorna a coluna 'index' pronta para ser alterada. Se ela ainda
+        estiver compartilhada, é substituída por uma cópia exclusiva (com cópias dos gates).
+        Todo operador que altera gates ou a lista de gates de uma coluna deve usar este método.
+        """
+        column = self.columns[index]
+        if self._owned_columns.get(id(column)) is not column:
+            column = column.copy()
+            self.columns[index] = column
+            self._owned_columns[id(column)] = column
+        return column
+
+    def get_canonical_key(self) -> CanonicalForm:
+        """
+        Retorna a forma canônica do genoma (ver 'canonical_form'), que inclui os parâmetros.
+        Circuitos equivalentes por reordenação de gates comutáveis ou por colunas de
+        identidade têm a mesma chave. O valor é recalculado apenas quando a versão muda.
+        """
+        if self._canonical_version != self._version:
+            self._canonical_key = canonical_form(self.columns)
+            self._canonical_version = self._version
+        return self._canonical_key
 
     def to_dict(self) -> dict:
         """Converte o objeto Circuit e seus componentes para um dicionário serializável."""
@@ -80,13 +299,33 @@ class Circuit:
 
     def copy(self) -> "Circuit":
         """
-        Return a lightweight copy of the Circuit instance with copied columns.
-        Copies all Columns and their Gates, preserving the circuit's integrity.
-        Does not copy _structural_representation cache, as it will be recalculated when needed.
+        Return a lightweight copy of the Circuit instance that shares its Columns and Gates.
+        Shared columns are copied on write (see 'column_for_write'), so after the copy
+        neither circuit owns any column exclusively.
+        The canonical key and the structural caches are carried over while still valid.
+        The evaluation state is preserved: an unmodified copy does not need to be re-simulated.
         """
-        return Circuit(
+        self._owned_columns = {}
+        Circuit.copy_count += 1
+        circuit_copy = Circuit(
             count_qubits=self.count_qubits,
-            columns=[col.copy() for col in self.columns],
+            columns=list(self.columns),
             fitness=self.fitness,
             fidelity=self.fidelity
         )
+        circuit_copy.shaped_fitness = self.shaped_fitness
+        if not self.needs_evaluation:
+            circuit_copy._evaluated_version = circuit_copy._version
+            circuit_copy._evaluation_id = self._evaluation_id
+        if self._canonical_version == self._version:
+            circuit_copy._canonical_key = self._canonical_key
+            circuit_copy._canonical_version = circuit_copy._version
+        if self._structural_version == self._version:
+            circuit_copy._structural_representation = self._structural_representation
+            circuit_copy._structural_genes = self._structural_genes
+            circuit_copy._structural_column_ids = self._structural_column_ids
+            circuit_copy._structural_version = circuit_copy._version
+        if self._gene_counts_version == self._version:
+            circuit_copy._gene_counts = self._gene_counts
+            circuit_copy._gene_counts_version = circuit_copy._version
+        return circuit_copy
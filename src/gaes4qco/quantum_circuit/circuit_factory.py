@@ -1,5 +1,7 @@
 import random
 from typing import List, Dict, Any
+
+import numpy as np
 from .circuit import Circuit
 from .column import Column
 from .gate_factory import GateFactory  # <-- Importa a nova factory
@@ -30,9 +32,9 @@ class CircuitFactory:
                     new_gate = self._gate_factory.build_gate(qubits_free_in_column, use_evolutionary_strategy)
                     gates_in_column.append(new_gate)
 
-                    # Remove os qubits usados da lista de disponíveis na coluna
-                    for used_qubit in new_gate.qubits:
-                        qubits_free_in_column.remove(used_qubit)
+                    # Remove os qubits usados da lista de disponíveis na coluna (mantendo a ordem)
+                    used_qubits = set(new_gate.qubits)
+                    qubits_free_in_column = [q for q in qubits_free_in_column if q not in used_qubits]
                 except ValueError:
                     # Ocorre se não for possível criar mais gates com os qubits restantes
                     break
@@ -41,6 +43,23 @@ class CircuitFactory:
 
         return Circuit(count_qubits=num_qubits, columns=columns)
 
+    def create_random_circuits(
+            self, count: int, num_qubits: int, max_depth: int, min_depth: int, use_evolutionary_strategy: bool
+    ) -> List[Circuit]:
+        """
+        Versão em lote de 'create_random_circuit': sorteia as profundidades e todos os gates
+        dos 'count' circuitos de uma vez (ver GateFactory.build_random_columns).
+        """
+        depths = np.random.randint(min_depth, max_depth + 1, size=count)
+        gates_per_column = self._gate_factory.build_random_columns(
+            np.full(int(depths.sum()), num_qubits), use_evolutionary_strategy
+        )
+        bounds = np.concatenate([[0], np.cumsum(depths)]).tolist()
+        return [
+            Circuit(count_qubits=num_qubits, columns=[Column(gates=gates) for gates in gates_per_column[a:b]])
+            for a, b in zip(bounds[:-1], bounds[1:])
+        ]
+
     def create_from_dict(self, data: Dict[str, Any]) -> Circuit:
         """
         Reconstrói uma entidade Circuit a partir de um dicionário (proveniente de um JSON).
@@ -0,0 +1,244 @@
+from typing import Dict, Iterator, List, Type
+
+import numpy as np
+from qiskit.circuit import Gate as QiskitGate
+from qiskit.circuit.library import standard_gates
+
+from .canonical import CanonicalForm, canonical_form
+from .circuit import Circuit
+from .column import Column
+from .gate import Gate
+from shared.value_objects import StepSize
+
+# Registro das classes de gate do processo: o id é o índice na lista
+_GATE_CLASSES: List[Type[QiskitGate]] = []
+_GATE_IDS: Dict[Type[QiskitGate], int] = {}
+
+
+def gate_class_id(gate_class: Type[QiskitGate]) -> int:
+    """Retorna o id da classe de gate, registrando-a na primeira vez."""
+    gate_id = _GATE_IDS.get(gate_class)
+    if gate_id is None:
+        gate_id = len(_GATE_CLASSES)
+        _GATE_CLASSES.append(gate_class)
+        _GATE_IDS[gate_class] = gate_id
+    return gate_id
+
+
+# Tipos dos arrays do genoma compacto
+_DTYPES = {
+    "gate_ids": np.int16, "column_offsets": np.int32, "qubit_offsets": np.int32, "qubits": np.int16,
+    "parameter_offsets": np.int32, "parameters": np.float64, "extra_controls": np.int8,
+    "is_inverse": np.bool_, "step_offsets": np.int32, "step_sigmas": np.float64,
+    "step_history_lens": np.int16, "history_offsets": np.int32, "step_history": np.int8,
+}
+
+
+def _offsets(lengths: List[int]) -> np.ndarray:
+    offsets = np.zeros(len(lengths) + 1, dtype=np.int32)
+    np.cumsum(lengths, out=offsets[1:])
+    return offsets
+
+
+class GateView:
+    """Visão somente leitura de um gate de CompactGenome, com a mesma interface de leitura de Gate."""
+    __slots__ = ("_genome", "_index")
+
+    def __init__(self, genome: "CompactGenome", index: int):
+        self._genome = genome
+        self._index = index
+
+    @property
+    def gate_class(self) -> Type[QiskitGate]:
+        return _GATE_CLASSES[self._genome.gate_ids[self._index]]
+
+    @property
+    def qubits(self) -> List[int]:
+        g, i = self._genome, self._index
+        return g.qubits[g.qubit_offsets[i]:g.qubit_offsets[i + 1]].tolist()
+
+    @property
+    def parameters(self) -> List[float]:
+        g, i = self._genome, self._index
+        return g.parameters[g.parameter_offsets[i]:g.parameter_offsets[i + 1]].tolist()
+
+    @property
+    def steps_sizes(self) -> List[StepSize]:
+        g, i = self._genome, self._index
+        steps = []
+        for s in range(g.step_offsets[i], g.step_offsets[i + 1]):
+            history = g.step_history[g.history_offsets[s]:g.history_offsets[s + 1]].tolist()
+            steps.append(StepSize(sigma=float(g.step_sigmas[s]), history_len=int(g.step_history_lens[s]), history=history))
+        return steps
+
+    @property
+    def extra_controls(self) -> int:
+        return int(self._genome.extra_controls[self._index])
+
+    @property
+    def is_inverse(self) -> bool:
+        return bool(self._genome.is_inverse[self._index])
+
+    def to_dict(self) -> dict:
+        return self.copy().to_dict()
+
+    def copy(self) -> Gate:
+        """Materializa o gate como uma entidade Gate mutável."""
+        return Gate(
+            gate_class=self.gate_class,
+            qubits=self.qubits,
+            parameters=self.parameters,
+            steps_sizes=self.steps_sizes,
+            extra_controls=self.extra_controls,
+            is_inverse=self.is_inverse
+        )
+
+
+class ColumnView:
+    """Visão somente leitura de uma coluna de CompactGenome, com a mesma interface de leitura de Column."""
+    __slots__ = ("_genome", "_start", "_stop")
+
+    def __init__(self, genome: "CompactGenome", start: int, stop: int):
+        self._genome = genome
+        self._start = start
+        self._stop = stop
+
+    @property
+    def gates(self) -> List[GateView]:
+        return list(self.get_gates())
+
+    def get_gates(self) -> Iterator[GateView]:
+        for index in range(self._start, self._stop):
+            yield GateView(self._genome, index)
+
+    def to_dict(self) -> dict:
+        return {"gates": [gate.to_dict() for gate in self.get_gates()]}
+
+    def copy(self) -> Column:
+        """Materializa a coluna como uma entidade Column mutável."""
+        return Column([gate.copy() for gate in self.get_gates()])
+
+
+class CompactGenome:
+    """
+    ## Representação compacta de um circuito em poucos arrays NumPy, com os gates em
+    ## ordem de coluna e os campos de tamanho variável (qubits, parâmetros, step sizes)
+    ## concatenados e indexados por offsets.
+    ## - 'columns' devolve visões (ColumnView/GateView) com a interface de leitura de
+    ##   Column/Gate, suficiente para o simulador, o simplificador e a forma canônica;
+    ## - cópias são cópias de arrays, e a serialização ('to_bytes') é um dump dos buffers;
+    ## - 'to_circuit' reconstrói o Circuit mutável usado pelos operadores genéticos.
+    ## É usado onde os circuitos são guardados ou transmitidos, não nos operadores.
+    """
+    _ARRAYS = (
+        "gate_ids", "column_offsets", "qubit_offsets", "qubits", "parameter_offsets", "parameters",
+        "extra_controls", "is_inverse", "step_offsets", "step_sigmas", "step_history_lens",
+        "history_offsets", "step_history"
+    )
+    __slots__ = _ARRAYS + ("count_qubits", "fitness", "fidelity", "_canonical_key")
+
+    def __init__(self, count_qubits: int, fitness: float, fidelity: float, **arrays: np.ndarray):
+        self.count_qubits = count_qubits
+        self.fitness = fitness
+        self.fidelity = fidelity
+        for name in self._ARRAYS:
+            setattr(self, name, arrays[name])
+        self._canonical_key = None
+
+    @classmethod
+    def from_circuit(cls, circuit: Circuit) -> "CompactGenome":
+        gates = [gate for column in circuit.columns for gate in column.get_gates()]
+        steps = [step for gate in gates for step in gate.steps_sizes]
+        return cls(
+            count_qubits=circuit.count_qubits,
+            fitness=circuit.fitness,
+            fidelity=circuit.fidelity,
+            gate_ids=np.array([gate_class_id(gate.gate_class) for gate in gates], dtype=_DTYPES["gate_ids"]),
+            column_offsets=_offsets([len(column.gates) for column in circuit.columns]),
+            qubit_offsets=_offsets([len(gate.qubits) for gate in gates]),
+            qubits=np.array([q for gate in gates for q in gate.qubits], dtype=_DTYPES["qubits"]),
+            parameter_offsets=_offsets([len(gate.parameters) for gate in gates]),
+            parameters=np.array([p for gate in gates for p in gate.parameters], dtype=_DTYPES["parameters"]),
+            extra_controls=np.array([gate.extra_controls for gate in gates], dtype=_DTYPES["extra_controls"]),
+            is_inverse=np.array([gate.is_inverse for gate in gates], dtype=_DTYPES["is_inverse"]),
+            step_offsets=_offsets([len(gate.steps_sizes) for gate in gates]),
+            step_sigmas=np.array([step.sigma for step in steps], dtype=_DTYPES["step_sigmas"]),
+            step_history_lens=np.array([step.history_len for step in steps], dtype=_DTYPES["step_history_lens"]),
+            history_offsets=_offsets([len(step.history) for step in steps]),
+            step_history=np.array([h for step in steps for h in step.history], dtype=_DTYPES["step_history"]),
+        )
+
+    def to_circuit(self) -> Circuit:
+        """Reconstrói um Circuit mutável, já marcado como avaliado com o fitness guardado."""
+        circuit = Circuit(self.count_qubits, [column.copy() for column in self.columns])
+        circuit.set_evaluation(self.fitness, self.fidelity)
+        return circuit
+
+    @property
+    def columns(self) -> List[ColumnView]:
+        offsets = self.column_offsets
+        return [ColumnView(self, offsets[i], offsets[i + 1]) for i in range(len(offsets) - 1)]
+
+    @property
+    def depth(self) -> int:
+        return len(self.column_offsets) - 1
+
+    def get_canonical_key(self) -> CanonicalForm:
+        if self._canonical_key is None:
+            self._canonical_key = canonical_form(self.columns)
+        return self._canonical_key
+
+    @property
+    def nbytes(self) -> int:
+        return sum(getattr(self, name).nbytes for name in self._ARRAYS)
+
+    def copy(self) -> "CompactGenome":
+        return CompactGenome(
+            self.count_qubits, self.fitness, self.fidelity,
+            **{name: getattr(self, name).copy() for name in self._ARRAYS}
+        )
+
+    def to_dict(self) -> dict:
+        return {
+            "count_qubits": self.count_qubits,
+            "depth": self.depth,
+            "fitness": self.fitness,
+            "fidelity": self.fidelity,
+            "columns": [column.to_dict() for column in self.columns]
+        }
+
+    def to_bytes(self) -> bytes:
+        """
+        Serializa o genoma como um dump dos buffers: comprimentos (int32), fitness e
+        fidelidade (float64), nomes das classes de gate usadas e os arrays em sequência.
+        """
+        used_ids, gate_indices = np.unique(self.gate_ids, return_inverse=True)
+        names = ",".join(_GATE_CLASSES[i].__name__ for i in used_ids).encode()
+        arrays = [gate_indices.astype(np.int16)] + [getattr(self, name) for name in self._ARRAYS[1:]]
+        lengths = np.array([self.count_qubits, len(names)] + [len(a) for a in arrays], dtype=np.int32)
+        scalars = np.array([self.fitness, self.fidelity], dtype=np.float64)
+        return b"".join([lengths.tobytes(), scalars.tobytes(), names] + [a.tobytes() for a in arrays])
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "CompactGenome":
+        """Reconstrói o genoma sem copiar os arrays (ficam somente leitura, apontando para 'data')."""
+        num_lengths = 2 + len(cls._ARRAYS)
+        lengths = np.frombuffer(data, dtype=np.int32, count=num_lengths)
+        fitness, fidelity = np.frombuffer(data, dtype=np.float64, count=2, offset=lengths.nbytes).tolist()
+        position = lengths.nbytes + 16
+        names = data[position:position + lengths[1]].decode()
+        position += int(lengths[1])
+
+        arrays = {}
+        for name, length in zip(cls._ARRAYS, lengths[2:]):
+            dtype = np.dtype(_DTYPES[name])
+            arrays[name] = np.frombuffer(data, dtype=dtype, count=int(length), offset=position)
+            position += int(length) * dtype.itemsize
+
+        local_ids = np.array([gate_class_id(getattr(standard_gates, n)) for n in names.split(",") if n], dtype=np.int16)
+        arrays["gate_ids"] = local_ids[arrays["gate_ids"]] if len(local_ids) else arrays["gate_ids"]
+        return cls(int(lengths[0]), fitness, fidelity, **arrays)
+
+    def __reduce__(self):
+        # Os ids de gate são locais ao processo: o pickle leva os nomes das classes
+        return CompactGenome.from_bytes, (self.to_bytes(),)
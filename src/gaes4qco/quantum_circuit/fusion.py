@@ -0,0 +1,114 @@
+from collections import OrderedDict
+from typing import Callable, List, Sequence, Set, Tuple
+
+import numpy as np
+
+from .gate import Gate
+from .simulator import NativeStatevectorSimulator
+
+
+class FusedBlock:
+    """Unitário resultante da fusão de gates consecutivos sobre um pequeno conjunto de qubits."""
+    __slots__ = ("qubits", "matrix")
+
+    def __init__(self, qubits: Tuple[int, ...], matrix: np.ndarray):
+        self.qubits = qubits    # ordem little-endian da matriz: qubits[0] é o bit menos significativo
+        self.matrix = matrix
+
+
+class _OpenBlock:
+    __slots__ = ("qubits", "operations")
+
+    def __init__(self, qubits: Set[int], operations: List[Gate]):
+        self.qubits = qubits
+        self.operations = operations
+
+
+class GateFusionCompiler:
+    """
+    ## Agrupa operações consecutivas que agem sobre conjuntos pequenos e sobrepostos de
+    ## qubits em blocos de no máximo 'max_fused_width' qubits, e multiplica cada bloco em
+    ## um único unitário. O simulador passa a fazer uma passagem sobre o vetor de estado
+    ## por bloco, e não por gate.
+    ## Os unitários são guardados em cache pelo conteúdo do bloco (gates e posições
+    ## relativas), de modo que subestruturas repetidas na população reutilizam o produto.
+    """
+
+    def __init__(self, max_fused_width: int = 2, cache_size: int = 8192):
+        self.max_fused_width = max_fused_width or 0
+        self._cache: "OrderedDict[Tuple, np.ndarray]" = OrderedDict()
+        self._cache_size = cache_size
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_fused_width >= 2
+
+    def group(self, operations: Sequence[Gate]) -> List[List[Gate]]:
+        """
+        Particiona as operações em grupos fundíveis, preservando a ordem de dependência.
+        Blocos abertos têm qubits disjuntos (comutam entre si); uma operação que toca
+        blocos abertos os absorve se a união couber na largura máxima, senão os fecha.
+        """
+        groups: List[List[Gate]] = []
+        open_blocks: List[_OpenBlock] = []
+
+        for op in operations:
+            touched = [block for block in open_blocks if block.qubits.intersection(op.qubits)]
+            union = set(op.qubits).union(*(block.qubits for block in touched))
+
+            if len(union) <= self.max_fused_width:
+                merged = _OpenBlock(union, [o for block in touched for o in block.operations] + [op])
+                open_blocks = [block for block in open_blocks if block not in touched] + [merged]
+                continue
+
+            for block in touched:
+                groups.append(block.operations)
+            open_blocks = [block for block in open_blocks if block not in touched]
+            if len(op.qubits) <= self.max_fused_width:
+                open_blocks.append(_OpenBlock(set(op.qubits), [op]))
+            else:
+                groups.append([op])
+
+        groups.extend(block.operations for block in open_blocks)
+        return groups
+
+    def compile(self, operations: Sequence[Gate], gate_matrix: Callable[[Gate], np.ndarray]) -> List[FusedBlock]:
+        """Retorna a sequência de blocos fundidos equivalente às operações."""
+        return [self._fuse(group, gate_matrix) for group in self.group(operations)]
+
+    def _fuse(self, group: List[Gate], gate_matrix: Callable[[Gate], np.ndarray]) -> FusedBlock:
+        if len(group) == 1:
+            op = group[0]
+            return FusedBlock(tuple(op.qubits), gate_matrix(op))
+
+        block_qubits = tuple(sorted({q for op in group for q in op.qubits}))
+        local = {q: i for i, q in enumerate(block_qubits)}
+        key = tuple(
+            (op.gate_class, tuple(op.parameters), op.extra_controls, op.is_inverse,
+             tuple(local[q] for q in op.qubits))
+            for op in group
+        )
+
+        matrix = self._cache.get(key)
+        if matrix is not None:
+            self._cache.move_to_end(key)
+            self.cache_hits += 1
+            return FusedBlock(block_qubits, matrix)
+
+        self.cache_misses += 1
+        # Aplica os gates às colunas da identidade: o eixo extra (final) indexa a entrada
+        width = len(block_qubits)
+        dim = 2 ** width
+        unitary = np.eye(dim, dtype=np.complex128).reshape((2,) * width + (dim,))
+        for op in group:
+            unitary = NativeStatevectorSimulator.apply_matrix(
+                unitary, gate_matrix(op), [local[q] for q in op.qubits], width
+            )
+        matrix = unitary.reshape(dim, dim)
+
+        self._cache[key] = matrix
+        if len(self._cache) > self._cache_size:
+            self._cache.popitem(last=False)
+        return FusedBlock(block_qubits, matrix)
@@ -1,7 +1,9 @@
 import random
+from functools import lru_cache
 from inspect import Parameter, signature
 from typing import Type, List, Dict, Tuple, Optional
 
+import numpy as np
 from numpy import pi as PI
 from qiskit.circuit import Gate as QiskitGate
 from qiskit.circuit.library.standard_gates import (
@@ -17,6 +19,53 @@ from .gate import Gate
 from shared.value_objects import StepSize
 
 
+@lru_cache(maxsize=None)
+def _parameter_bounds(gate_class: Type[QiskitGate]) -> Tuple[float, ...]:
+    """
+    Usa introspecção (uma única vez por classe) para descobrir os ângulos do construtor
+    do gate e o limite superior do sorteio de cada um: pi para 'theta', 2*pi para os demais.
+    Nota: frágil a mudanças na API do Qiskit.
+    """
+    sig = signature(gate_class.__init__)
+    return tuple(
+        PI if "theta" in p.name else 2 * PI
+        for p in sig.parameters.values()
+        # Verifica se é um parâmetro de ângulo que precisa ser preenchido
+        if p.name not in ['self', 'label'] and p.default is Parameter.empty
+    )
+
+
+class GateCatalog:
+    """
+    ## Tabelas pré-computadas das classes de gate permitidas, em ordem crescente de aridade:
+    ## - aridade, número de parâmetros e limites dos ângulos de cada classe;
+    ## - 'pool_sizes[k]': quantas classes cabem em k qubits livres. Como as classes estão
+    ##   ordenadas por aridade, as candidatas são sempre um prefixo do catálogo, e o sorteio
+    ##   uniforme entre elas é um índice em [0, pool_sizes[k]).
+    """
+
+    def __init__(self, gate_class_map: Dict[int, List[Type[QiskitGate]]]):
+        entries = sorted(
+            ((num_qubits, gate_class) for num_qubits, gate_list in gate_class_map.items() for gate_class in gate_list),
+            key=lambda entry: entry[0]
+        )
+        self.gate_classes: List[Type[QiskitGate]] = [gate_class for _, gate_class in entries]
+        self.arities = np.array([num_qubits for num_qubits, _ in entries], dtype=np.int64)
+        self.max_arity = int(self.arities.max(initial=0))
+
+        bounds = [_parameter_bounds(gate_class) for gate_class in self.gate_classes]
+        self.num_parameters = np.array([len(b) for b in bounds], dtype=np.int64)
+        self.parameter_bounds = np.zeros((len(bounds), int(self.num_parameters.max(initial=0))))
+        for i, b in enumerate(bounds):
+            self.parameter_bounds[i, :len(b)] = b
+
+        self.pool_sizes = np.searchsorted(self.arities, np.arange(self.max_arity + 1), side="right")
+        self.candidate_pools: List[List[Tuple[Type[QiskitGate], int]]] = [
+            [(gate_class, int(arity)) for gate_class, arity in zip(self.gate_classes[:size], self.arities[:size])]
+            for size in self.pool_sizes.tolist()
+        ]
+
+
 class GateFactory:
     """
     Cria uma entidade 'Gate' de forma aleatória,
@@ -55,6 +104,8 @@ class GateFactory:
             if filtered:
                 self._gate_class_map[n] = filtered
 
+        self.catalog = GateCatalog(self._gate_class_map)
+
     def build_gate(self, available_qubits: List[int], use_evolutionary_strategy: bool) -> Gate:
         """
         Método principal para construir uma instância da nossa entidade Gate.
@@ -78,6 +129,77 @@ class GateFactory:
             is_inverse=False
         )
 
+    def build_random_columns(self, column_qubits: np.ndarray, use_evolutionary_strategy: bool) -> List[List[Gate]]:
+        """
+        Gera em lote os gates de colunas aleatórias, com as mesmas regras de 'build_gate'
+        aplicadas até não haver qubits livres. 'column_qubits[c]' é o número de qubits da
+        coluna c. Os sorteios são arrays NumPy: uma permutação dos qubits de cada coluna
+        (os gates ocupam trechos consecutivos dela, o que equivale a sortear sem reposição),
+        uma classe por coluna ativa a cada rodada e todos os ângulos de uma vez.
+        Retorna a lista de gates de cada coluna.
+        """
+        catalog = self.catalog
+        column_qubits = np.asarray(column_qubits, dtype=np.int64)
+        num_columns = len(column_qubits)
+        width = int(column_qubits.max(initial=0))
+        keys = np.random.random((num_columns, width))
+        keys[np.arange(width) >= column_qubits[:, None]] = np.inf  # Qubits inexistentes ficam no fim
+        permutations = np.argsort(keys, axis=1)
+
+        # Cada rodada acrescenta um gate a cada coluna que ainda tem qubits livres e alguma classe que caiba
+        used = np.zeros(num_columns, dtype=np.int64)
+        rounds_columns, rounds_classes, rounds_starts = [], [], []
+        active = np.flatnonzero(column_qubits > 0)
+        while active.size:
+            pool_sizes = catalog.pool_sizes[np.minimum(column_qubits[active] - used[active], catalog.max_arity)]
+            active, pool_sizes = active[pool_sizes > 0], pool_sizes[pool_sizes > 0]
+            if not active.size:
+                break
+            classes = (np.random.random(active.size) * pool_sizes).astype(np.int64)
+            rounds_columns.append(active)
+            rounds_classes.append(classes)
+            rounds_starts.append(used[active])
+            used[active] = used[active] + catalog.arities[classes]
+            active = active[used[active] < column_qubits[active]]
+
+        gates_per_column: List[List[Gate]] = [[] for _ in range(num_columns)]
+        if not rounds_columns:
+            return gates_per_column
+        columns = np.concatenate(rounds_columns)
+        classes = np.concatenate(rounds_classes)
+        starts = np.concatenate(rounds_starts)
+
+        # Qubits de cada gate: trecho [start, start + aridade) da permutação da coluna
+        arities = catalog.arities[classes]
+        qubit_offsets = np.concatenate([[0], np.cumsum(arities)])
+        gate_of_qubit = np.repeat(np.arange(len(classes)), arities)
+        positions = starts[gate_of_qubit] + np.arange(qubit_offsets[-1]) - qubit_offsets[gate_of_qubit]
+        qubits = permutations[columns[gate_of_qubit], positions]
+
+        # Ângulos uniformes em [0, limite) de cada parâmetro
+        num_parameters = catalog.num_parameters[classes]
+        parameter_offsets = np.concatenate([[0], np.cumsum(num_parameters)])
+        gate_of_parameter = np.repeat(np.arange(len(classes)), num_parameters)
+        parameter_positions = np.arange(parameter_offsets[-1]) - parameter_offsets[gate_of_parameter]
+        bounds = catalog.parameter_bounds[classes[gate_of_parameter], parameter_positions]
+        parameters = (np.random.random(bounds.size) * bounds).tolist()
+
+        qubits = qubits.tolist()
+        qubit_offsets = qubit_offsets.tolist()
+        parameter_offsets = parameter_offsets.tolist()
+        gate_classes = catalog.gate_classes
+        for i, (column, gate_class) in enumerate(zip(columns.tolist(), classes.tolist())):
+            gate_parameters = parameters[parameter_offsets[i]:parameter_offsets[i + 1]]
+            gates_per_column[column].append(Gate(
+                gate_class=gate_classes[gate_class],
+                qubits=qubits[qubit_offsets[i]:qubit_offsets[i + 1]],
+                parameters=gate_parameters,
+                steps_sizes=[StepSize() for _ in gate_parameters] if use_evolutionary_strategy else None,
+                extra_controls=0,
+                is_inverse=False
+            ))
+        return gates_per_column
+
     def build_identity_gate(self, qubit: int) -> Gate:
         """
         Cria uma IGate (porta identidade) fixa em um qubit específico.
@@ -117,12 +239,7 @@ class GateFactory:
         )
 
     def _choice_gate_class(self, lim_qubits: int) -> Tuple[Type[QiskitGate], int]:
-        candidate_pool = [
-            (gate_class, num_qubits)
-            for num_qubits, gate_list in self._gate_class_map.items()
-            if num_qubits <= lim_qubits
-            for gate_class in gate_list
-        ]
+        candidate_pool = self.catalog.candidate_pools[min(lim_qubits, self.catalog.max_arity)]
         if not candidate_pool:
             raise ValueError(
                 f"Não há gates disponíveis para {lim_qubits} qubits "
@@ -139,17 +256,5 @@ class GateFactory:
 
     @classmethod
     def _generate_random_params_for_gate(cls, gate_class: Type[QiskitGate]) -> List[float]:
-        """
-        Usa introspecção para gerar ângulos aleatórios.
-        Nota: Este método é poderoso, mas frágil. Mudanças na API do Qiskit
-        podem exigir sua atualização.
-        """
-        sig = signature(gate_class.__init__)
-
-        generated_angles = []
-        for p in sig.parameters.values():
-            # Verifica se é um parâmetro de ângulo que precisa ser preenchido
-            if p.name not in ['self', 'label'] and p.default is Parameter.empty:
-                angle = random.uniform(0, PI) if "theta" in p.name else random.uniform(0, 2 * PI)
-                generated_angles.append(angle)
-        return generated_angles
+        """Gera ângulos aleatórios a partir dos limites pré-computados da classe (ver '_parameter_bounds')."""
+        return [random.uniform(0, bound) for bound in _parameter_bounds(gate_class)]
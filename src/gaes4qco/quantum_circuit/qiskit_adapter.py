@@ -1,7 +1,10 @@
+from typing import Iterable
+
 from qiskit.circuit import QuantumCircuit as QiskitCircuit
 from .interfaces import IQuantumCircuitAdapter
 from .circuit import Circuit
 from .gate import Gate as DomainGate
+from .simplifier import CircuitSimplifier
 
 
 class QiskitAdapter(IQuantumCircuitAdapter):
@@ -13,14 +16,16 @@ class QiskitAdapter(IQuantumCircuitAdapter):
         """
         ## Lógica do antigo método 'build' foi movida para cá.
         """
-        qiskit_circuit = QiskitCircuit(circuit.count_qubits)
-
-        for column in circuit.columns:
-            for domain_gate in column.get_gates():
-                # Constrói o gate do Qiskit a partir da nossa entidade
-                gate_instance, qubits = self._build_gate_from_domain(domain_gate)
-                qiskit_circuit.append(gate_instance, qubits)
+        operations = (domain_gate for column in circuit.columns for domain_gate in column.get_gates())
+        return self.from_operations(circuit.count_qubits, operations)
 
+    def from_operations(self, count_qubits: int, operations: Iterable[DomainGate]) -> QiskitCircuit:
+        """Constrói um circuito do Qiskit a partir de uma sequência de gates de domínio."""
+        qiskit_circuit = QiskitCircuit(count_qubits)
+        for domain_gate in operations:
+            # Constrói o gate do Qiskit a partir da nossa entidade
+            gate_instance, qubits = self._build_gate_from_domain(domain_gate)
+            qiskit_circuit.append(gate_instance, qubits)
         return qiskit_circuit
 
     def _build_gate_from_domain(self, domain_gate: DomainGate):
@@ -31,3 +36,17 @@ class QiskitAdapter(IQuantumCircuitAdapter):
         if domain_gate.is_inverse:
             gate_instance = gate_instance.inverse()
         return gate_instance, domain_gate.qubits
+
+
+class SimplifyingQiskitAdapter(QiskitAdapter):
+    """
+    ## Adapter usado na avaliação: converte a lista reduzida de operações do
+    ## CircuitSimplifier, de modo que o custo da simulação acompanha o número
+    ## efetivo de gates. O estado gerado é o mesmo a menos de uma fase global.
+    ## Para desenhar/exportar o genoma como ele é, use o QiskitAdapter.
+    """
+    def __init__(self, simplifier: CircuitSimplifier):
+        self._simplifier = simplifier
+
+    def from_domain(self, circuit: Circuit) -> QiskitCircuit:
+        return self.from_operations(circuit.count_qubits, self._simplifier.simplify(circuit.columns))
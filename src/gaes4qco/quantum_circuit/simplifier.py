@@ -0,0 +1,149 @@
+import math
+from typing import Dict, List, Optional, Sequence
+
+from qiskit.circuit.library.standard_gates import (
+    XGate, YGate, ZGate, HGate, SGate, TGate, IGate, PhaseGate, SwapGate,
+    RXGate, RYGate, RZGate, RXXGate, RYYGate, RZZGate, RZXGate, ECRGate, CXGate
+)
+
+from .column import Column
+from .gate import Gate
+
+
+# Gates que são o próprio inverso (G·G = I), inclusive com controles extras
+SELF_INVERSE_GATES = {XGate, YGate, ZGate, HGate, SwapGate, ECRGate, CXGate}
+
+# Gates cuja ação não depende da ordem dos qubits
+SYMMETRIC_GATES = {SwapGate, RXXGate, RYYGate, RZZGate}
+
+# Rotações de um único ângulo que se compõem somando os ângulos
+ROTATION_GATES = {RXGate, RYGate, RZGate, RXXGate, RYYGate, RZZGate, RZXGate}
+
+# Gates diagonais de fase, equivalentes a PhaseGate(ângulo) de forma exata
+PHASE_ANGLES = {ZGate: math.pi, SGate: math.pi / 2, TGate: math.pi / 4}
+
+# Resultado de '_combine' quando as duas operações se anulam
+_CANCEL = object()
+
+
+def is_identity_gate(gate: Gate) -> bool:
+    """Indica se o gate é a identidade (IGate ou rotação/fase de ângulo nulo), a menos de fase global."""
+    if gate.gate_class is IGate:
+        return True
+    if gate.gate_class is PhaseGate:
+        period = 2 * math.pi
+    elif gate.gate_class in ROTATION_GATES:
+        # R(2π) = -I: fase global sem controles, fase relativa com controles
+        period = 2 * math.pi if gate.extra_controls == 0 else 4 * math.pi
+    else:
+        return False
+    remainder = math.fmod(abs(gate.parameters[0]), period)
+    return min(remainder, period - remainder) < 1e-12
+
+
+class CircuitSimplifier:
+    """
+    ## Gera uma lista reduzida de operações para a simulação, sem alterar o genoma.
+    ## - remove identidades (IGate e rotações de ângulo nulo);
+    ## - cancela pares adjacentes de inversos nos mesmos qubits (X·X, H·H, CX·CX, G·G†),
+    ##   mesmo que estejam em colunas diferentes;
+    ## - funde rotações consecutivas do mesmo eixo e fases diagonais (Z, S, T, P).
+    ## O estado resultante é idêntico a menos de uma fase global, o que não altera a
+    ## fidelidade. As operações não modificadas são os próprios objetos Gate do circuito.
+    """
+
+    def simplify(self, columns: Sequence[Column]) -> List[Gate]:
+        operations: List[Optional[Gate]] = []
+        # Pilha, por qubit, dos índices das operações ainda ativas que o tocam
+        qubit_stacks: Dict[int, List[int]] = {}
+
+        for column in columns:
+            for gate in column.get_gates():
+                if is_identity_gate(gate):
+                    continue
+
+                previous_idx = self._adjacent_operation(gate, operations, qubit_stacks)
+                if previous_idx is not None:
+                    merged = self._combine(operations[previous_idx], gate)
+                    if merged is not None:
+                        if merged is _CANCEL or is_identity_gate(merged):
+                            operations[previous_idx] = None
+                            for q in gate.qubits:
+                                qubit_stacks[q].pop()
+                        else:
+                            operations[previous_idx] = merged
+                        continue
+
+                operations.append(gate)
+                for q in gate.qubits:
+                    qubit_stacks.setdefault(q, []).append(len(operations) - 1)
+
+        return [op for op in operations if op is not None]
+
+    @staticmethod
+    def _adjacent_operation(gate: Gate, operations: List[Optional[Gate]], qubit_stacks: Dict[int, List[int]]) -> Optional[int]:
+        """Índice da última operação ativa, se ela for a mais recente em todos os qubits de 'gate' e agir exatamente neles."""
+        indices = set()
+        for q in gate.qubits:
+            stack = qubit_stacks.get(q)
+            if not stack:
+                return None
+            indices.add(stack[-1])
+        if len(indices) != 1:
+            return None
+        idx = indices.pop()
+        if len(operations[idx].qubits) != len(gate.qubits):
+            return None
+        return idx
+
+    @staticmethod
+    def _same_qubits(first: Gate, second: Gate) -> bool:
+        if first.gate_class in SYMMETRIC_GATES and first.extra_controls == 0:
+            return sorted(first.qubits) == sorted(second.qubits)
+        return list(first.qubits) == list(second.qubits)
+
+    def _combine(self, first: Gate, second: Gate):
+        """Retorna _CANCEL, um novo Gate fundido, ou None se as operações não se combinam."""
+        if first.extra_controls != second.extra_controls:
+            return None
+
+        if first.gate_class in PHASE_ANGLES or first.gate_class is PhaseGate:
+            if (second.gate_class in PHASE_ANGLES or second.gate_class is PhaseGate) \
+                    and list(first.qubits) == list(second.qubits):
+                angle = self._phase_angle(first) + self._phase_angle(second)
+                return self._rebuild(first, PhaseGate, [angle], is_inverse=False)
+            return None
+
+        if first.gate_class is not second.gate_class or not self._same_qubits(first, second):
+            return None
+
+        if first.gate_class in SELF_INVERSE_GATES:
+            return _CANCEL
+
+        if first.gate_class in ROTATION_GATES:
+            angle = self._signed_angle(first) + self._signed_angle(second)
+            return self._rebuild(first, first.gate_class, [angle], is_inverse=False)
+
+        if first.is_inverse != second.is_inverse and first.parameters == second.parameters:
+            return _CANCEL
+        return None
+
+    @staticmethod
+    def _signed_angle(gate: Gate) -> float:
+        return -gate.parameters[0] if gate.is_inverse else gate.parameters[0]
+
+    def _phase_angle(self, gate: Gate) -> float:
+        if gate.gate_class is PhaseGate:
+            return self._signed_angle(gate)
+        angle = PHASE_ANGLES[gate.gate_class]
+        return -angle if gate.is_inverse else angle
+
+    @staticmethod
+    def _rebuild(template: Gate, gate_class, parameters: List[float], is_inverse: bool) -> Gate:
+        return Gate(
+            gate_class=gate_class,
+            qubits=list(template.qubits),
+            parameters=parameters,
+            extra_controls=template.extra_controls,
+            is_inverse=is_inverse
+        )
@@ -0,0 +1,95 @@
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+import numpy as np
+
+from .circuit import Circuit
+from .gate import Gate as DomainGate
+from .simplifier import CircuitSimplifier
+
+
+class NativeStatevectorSimulator:
+    """
+    ## Simulador de vetor de estado em NumPy que opera diretamente sobre o circuito
+    ## de domínio, sem construir um QuantumCircuit do Qiskit a cada avaliação.
+    ## Segue a convenção little-endian do Qiskit (qubit 0 é o bit menos significativo).
+    ## As matrizes dos gates são obtidas do Qiskit e mantidas em um cache LRU.
+    ## Com um 'simplifier', simula a lista reduzida de operações (mesmo estado a
+    ## menos de uma fase global). Com um compilador de fusão ('fusion', um
+    ## GateFusionCompiler habilitado), aplica um unitário por bloco fundido.
+    """
+
+    def __init__(self, simplifier: Optional[CircuitSimplifier] = None, fusion=None, matrix_cache_size: int = 4096):
+        self._simplifier = simplifier
+        self._fusion = fusion if fusion is not None and fusion.enabled else None
+        self._matrix_cache: "OrderedDict[Tuple, np.ndarray]" = OrderedDict()
+        self._matrix_cache_size = matrix_cache_size
+
+    def gate_matrix(self, domain_gate: DomainGate) -> np.ndarray:
+        """Retorna a matriz unitária do gate (na ordem de qubits do próprio gate)."""
+        key = (
+            domain_gate.gate_class,
+            tuple(domain_gate.parameters),
+            domain_gate.extra_controls,
+            domain_gate.is_inverse
+        )
+        matrix = self._matrix_cache.get(key)
+        if matrix is not None:
+            self._matrix_cache.move_to_end(key)
+            return matrix
+
+        gate_instance = domain_gate.gate_class(*domain_gate.parameters)
+        if domain_gate.extra_controls > 0:
+            gate_instance = gate_instance.control(domain_gate.extra_controls)
+        if domain_gate.is_inverse:
+            gate_instance = gate_instance.inverse()
+        matrix = np.asarray(gate_instance.to_matrix(), dtype=np.complex128)
+
+        self._matrix_cache[key] = matrix
+        if len(self._matrix_cache) > self._matrix_cache_size:
+            self._matrix_cache.popitem(last=False)
+        return matrix
+
+    @staticmethod
+    def apply_matrix(state: np.ndarray, matrix: np.ndarray, qubits, num_qubits: int) -> np.ndarray:
+        """
+        Aplica 'matrix' aos 'qubits' de 'state', que tem formato (2,) * num_qubits
+        com o eixo 0 correspondendo ao qubit mais significativo. Eixos adicionais ao
+        final de 'state' são preservados (usado para compor unitários).
+        """
+        k = len(qubits)
+        tensor = matrix.reshape((2,) * (2 * k))
+        # Índices da matriz são little-endian: o último eixo de entrada é qubits[0]
+        state_axes = [num_qubits - 1 - q for q in reversed(qubits)]
+        result = np.tensordot(tensor, state, axes=(list(range(k, 2 * k)), state_axes))
+        return np.moveaxis(result, list(range(k)), state_axes)
+
+    def simulate(
+            self,
+            circuit: Circuit,
+            max_columns: Optional[int] = None,
+            dtype=np.complex128
+    ) -> np.ndarray:
+        """
+        Simula o circuito a partir de |0...0> e retorna o vetor de estado (2**n,).
+        'max_columns' limita a simulação às primeiras colunas do circuito.
+        """
+        num_qubits = circuit.count_qubits
+        state = np.zeros((2,) * num_qubits, dtype=dtype)
+        state[(0,) * num_qubits] = 1.0
+
+        columns = circuit.columns if max_columns is None else circuit.columns[:max_columns]
+        if self._simplifier is not None:
+            operations = self._simplifier.simplify(columns)
+        else:
+            operations = [domain_gate for column in columns for domain_gate in column.get_gates()]
+
+        if self._fusion is not None:
+            for block in self._fusion.compile(operations, self.gate_matrix):
+                state = self.apply_matrix(state, block.matrix.astype(dtype, copy=False), block.qubits, num_qubits)
+            return state.reshape(-1)
+
+        for domain_gate in operations:
+            matrix = self.gate_matrix(domain_gate).astype(dtype, copy=False)
+            state = self.apply_matrix(state, matrix, domain_gate.qubits, num_qubits)
+        return state.reshape(-1)
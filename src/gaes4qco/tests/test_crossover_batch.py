@@ -0,0 +1,161 @@
+import random
+from collections import Counter
+
+import numpy as np
+import pytest
+
+from evolutionary_algorithm.crossover import BlockwiseCrossover, MultiPointCrossover, SinglePointCrossover
+from quantum_circuit.circuit_factory import CircuitFactory
+from quantum_circuit.gate_factory import GateFactory
+
+# As versões em lote sorteiam com o NumPy e as escalares com o 'random': só as distribuições
+# podem ser comparadas, com uma tolerância folgada para 'NUM_TRIALS' amostras
+NUM_TRIALS = 4000
+TOLERANCE = 0.03
+
+
+@pytest.fixture(autouse=True)
+def seed():
+    random.seed(1234)
+    np.random.seed(1234)
+
+
+@pytest.fixture
+def gate_factory():
+    return GateFactory()
+
+
+def _random_circuit(gate_factory, num_qubits, depth):
+    return CircuitFactory(gate_factory).create_random_circuit(num_qubits, depth, depth, False)
+
+
+def _random_pairs(gate_factory, count):
+    """Pares de pais com profundidades e números de qubits variados."""
+    return [
+        (_random_circuit(gate_factory, random.randint(2, 4), random.randint(1, 6)),
+         _random_circuit(gate_factory, random.randint(2, 4), random.randint(1, 6)))
+        for _ in range(count)
+    ]
+
+
+def _gates(circuit):
+    return [list(column.get_gates()) for column in circuit.columns]
+
+
+def _frequencies(samples, support):
+    counts = Counter(samples)
+    return np.array([counts[value] for value in support]) / len(samples)
+
+
+def _assert_same_distribution(batch_samples, scalar_samples, support):
+    batch = _frequencies(batch_samples, support)
+    scalar = _frequencies(scalar_samples, support)
+    assert batch.sum() == pytest.approx(1.0)
+    assert np.abs(batch - scalar).max() < TOLERANCE
+
+
+def test_blockwise_build_children_matches_build_child(gate_factory):
+    crossover = BlockwiseCrossover(gate_factory)
+    pairs = _random_pairs(gate_factory, 200)
+    parents_1, parents_2 = [p1 for p1, _ in pairs], [p2 for _, p2 in pairs]
+    num_qubits = np.array([max(p1.count_qubits, p2.count_qubits) for p1, p2 in pairs])
+    depths = np.array([min(p1.depth, p2.depth) for p1, p2 in pairs], dtype=np.int64)
+    split_cols = np.random.randint(0, depths)
+    split_qubits = np.random.randint(0, num_qubits)
+
+    for own, other in ((parents_1, parents_2), (parents_2, parents_1)):
+        children = crossover._build_children(own, other, split_cols, split_qubits, num_qubits, depths)
+        assert len(children) == len(pairs)
+        for k, child in enumerate(children):
+            expected = crossover._build_child(
+                own[k], other[k], int(split_cols[k]), int(split_qubits[k]), int(num_qubits[k]), int(depths[k])
+            )
+            assert child.count_qubits == expected.count_qubits
+            assert _gates(child) == _gates(expected)
+
+
+def test_blockwise_crossover_batch_keeps_excess_columns(gate_factory):
+    pairs = _random_pairs(gate_factory, 100)
+    children_1, children_2 = BlockwiseCrossover(gate_factory).crossover_batch(
+        [p1 for p1, _ in pairs], [p2 for _, p2 in pairs]
+    )
+    for (p1, p2), child_1, child_2 in zip(pairs, children_1, children_2):
+        assert child_1.depth == p1.depth and child_2.depth == p2.depth
+        min_depth = min(p1.depth, p2.depth)
+        assert all(a is b for a, b in zip(child_1.columns[min_depth:], p1.columns[min_depth:]))
+        assert all(a is b for a, b in zip(child_2.columns[min_depth:], p2.columns[min_depth:]))
+
+
+def _single_point(parent, child):
+    """Primeira coluna do filho que não vem do próprio pai (a profundidade comum, se nenhuma)."""
+    return next((i for i, (a, b) in enumerate(zip(child.columns, parent.columns)) if a is not b), child.depth)
+
+
+def test_single_point_cut_histogram(gate_factory):
+    p1, p2 = _random_circuit(gate_factory, 3, 6), _random_circuit(gate_factory, 3, 9)
+    crossover = SinglePointCrossover()
+
+    children_1, _ = crossover.crossover_batch([p1] * NUM_TRIALS, [p2] * NUM_TRIALS)
+    batch_points = [_single_point(p1, child) for child in children_1]
+    scalar_points = [_single_point(p1, crossover.crossover(p1, p2)[0]) for _ in range(NUM_TRIALS)]
+
+    support = range(1, 6)
+    assert set(batch_points) == set(support)
+    _assert_same_distribution(batch_points, scalar_points, support)
+    assert np.abs(_frequencies(batch_points, support) - 1 / 5).max() < TOLERANCE
+
+
+def test_single_point_batch_copies_parents_without_cut_point(gate_factory):
+    p1, p2 = _random_circuit(gate_factory, 3, 1), _random_circuit(gate_factory, 3, 4)
+    children_1, children_2 = SinglePointCrossover().crossover_batch([p1], [p2])
+    assert children_1[0] is not p1 and _gates(children_1[0]) == _gates(p1)
+    assert children_2[0] is not p2 and _gates(children_2[0]) == _gates(p2)
+
+
+def test_multi_point_swap_histogram(gate_factory):
+    p1, p2 = _random_circuit(gate_factory, 3, 7), _random_circuit(gate_factory, 3, 5)
+    crossover = MultiPointCrossover()
+
+    def swaps(child):
+        return tuple(a is b for a, b in zip(child.columns, p2.columns))
+
+    children_1, _ = crossover.crossover_batch([p1] * NUM_TRIALS, [p2] * NUM_TRIALS)
+    batch_swaps = np.array([swaps(child) for child in children_1])
+    scalar_swaps = np.array([swaps(crossover.crossover(p1, p2)[0]) for _ in range(NUM_TRIALS)])
+
+    # Cada coluna comum é trocada com probabilidade 1/2, independentemente das demais
+    assert np.abs(batch_swaps.mean(axis=0) - 0.5).max() < TOLERANCE
+    _assert_same_distribution(batch_swaps.sum(axis=1).tolist(), scalar_swaps.sum(axis=1).tolist(), range(6))
+    # As colunas excedentes do pai mais profundo seguem no seu filho
+    assert all(child.columns[5:] == p1.columns[5:] for child in children_1)
+
+
+def test_blockwise_split_histogram(gate_factory, monkeypatch):
+    p1, p2 = _random_circuit(gate_factory, 4, 5), _random_circuit(gate_factory, 3, 6)
+    crossover = BlockwiseCrossover(gate_factory)
+    batch_splits, scalar_splits = [], []
+
+    build_children, build_child = crossover._build_children, crossover._build_child
+
+    def record_children(own, other, split_c, split_q, num_qubits, depths):
+        if own is parents_1:
+            batch_splits.extend(zip(split_c.tolist(), split_q.tolist()))
+        return build_children(own, other, split_c, split_q, num_qubits, depths)
+
+    def record_child(own, other, split_c, split_q, num_qubits, depth):
+        if own is p1:
+            scalar_splits.append((split_c, split_q))
+        return build_child(own, other, split_c, split_q, num_qubits, depth)
+
+    monkeypatch.setattr(crossover, "_build_children", record_children)
+    monkeypatch.setattr(crossover, "_build_child", record_child)
+
+    parents_1 = [p1] * NUM_TRIALS
+    crossover.crossover_batch(parents_1, [p2] * NUM_TRIALS)
+    for _ in range(NUM_TRIALS):
+        crossover.crossover(p1, p2)
+
+    # Coluna de corte em [0, profundidade comum) e qubit de corte em [0, maior número de qubits)
+    support = [(col, qubit) for col in range(5) for qubit in range(4)]
+    assert set(batch_splits) == set(support)
+    _assert_same_distribution(batch_splits, scalar_splits, support)
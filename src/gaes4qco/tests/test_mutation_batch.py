@@ -0,0 +1,187 @@
+import random
+from collections import Counter
+
+import numpy as np
+import pytest
+from qiskit.circuit.library.standard_gates import HGate, RZGate, XGate
+
+from evolutionary_algorithm.mutation import (
+    ChangeDepthMutation, GateParameterMutation, SingleGateFlipMutation, SwapColumnsMutation, SwapControlTargetMutation
+)
+from quantum_circuit.circuit import Circuit, Column
+from quantum_circuit.circuit_factory import CircuitFactory
+from quantum_circuit.gate import Gate
+from quantum_circuit.gate_factory import GateFactory
+
+# As versões em lote sorteiam com o NumPy e as escalares com o 'random': só as distribuições
+# podem ser comparadas, com uma tolerância folgada para 'NUM_TRIALS' amostras
+NUM_TRIALS = 4000
+TOLERANCE = 0.03
+
+
+@pytest.fixture(autouse=True)
+def seed():
+    random.seed(1234)
+    np.random.seed(1234)
+
+
+@pytest.fixture
+def gate_factory():
+    return GateFactory()
+
+
+def _random_circuit(gate_factory, num_qubits, depth):
+    return CircuitFactory(gate_factory).create_random_circuit(num_qubits, depth, depth, False)
+
+
+def _controlled_gate(qubits, extra_controls):
+    return Gate(XGate, qubits=list(qubits), extra_controls=extra_controls)
+
+
+def _frequencies(samples, support):
+    counts = Counter(samples)
+    return np.array([counts[value] for value in support]) / len(samples)
+
+
+def _assert_same_distribution(batch_samples, scalar_samples, support):
+    batch = _frequencies(batch_samples, support)
+    scalar = _frequencies(scalar_samples, support)
+    assert batch.sum() == pytest.approx(1.0)
+    assert np.abs(batch - scalar).max() < TOLERANCE
+
+
+def _varied_circuits(gate_factory):
+    """Circuitos com e sem gates, parâmetros e controles extras, de profundidades variadas."""
+    no_parameters = GateFactory(["HGate", "CXGate"])
+    circuits = [_random_circuit(gate_factory, random.randint(1, 4), random.randint(1, 5)) for _ in range(30)]
+    circuits += [_random_circuit(no_parameters, random.randint(1, 4), random.randint(1, 5)) for _ in range(10)]
+    circuits += [
+        Circuit(3, [Column()]),
+        Circuit(3, [Column(), Column()]),
+        Circuit(3, [Column([Gate(HGate, qubits=[0])]), Column()]),
+        Circuit(3, [Column([_controlled_gate([0, 1], 1)])]),
+        Circuit(3, [Column([Gate(RZGate, qubits=[2], parameters=[0.5])]), Column([_controlled_gate([2, 0, 1], 2)])]),
+    ]
+    return circuits
+
+
+def test_applicable_mask_matches_can_apply(gate_factory):
+    circuits = _varied_circuits(gate_factory)
+    strategies = [
+        SwapColumnsMutation(),
+        SingleGateFlipMutation(gate_factory, False),
+        ChangeDepthMutation(8, gate_factory, False),
+        GateParameterMutation(fitness_evaluator=None),
+        SwapControlTargetMutation(),
+    ]
+    for strategy in strategies:
+        mask = strategy.applicable_mask(circuits)
+        assert mask.dtype == bool
+        assert mask.tolist() == [strategy.can_apply(circuit) for circuit in circuits], type(strategy).__name__
+
+
+def test_mutate_batch_matches_mutate_individual_when_deterministic(gate_factory):
+    # Duas colunas e um único par controle/alvo: a única mutação possível é a mesma nas duas versões
+    swap_columns = SwapColumnsMutation()
+    originals = [_random_circuit(gate_factory, 3, 2) for _ in range(20)]
+    batch = swap_columns.mutate_batch([circuit.copy() for circuit in originals])
+    scalar = [swap_columns.mutate_individual(circuit.copy()) for circuit in originals]
+    for b, s in zip(batch, scalar):
+        assert b.columns == s.columns and b.needs_evaluation and s.needs_evaluation
+
+    swap_control = SwapControlTargetMutation()
+    originals = [Circuit(3, [Column([_controlled_gate([q, (q + 1) % 3], 1)])]) for q in range(3)]
+    batch = swap_control.mutate_batch([circuit.copy() for circuit in originals])
+    scalar = [swap_control.mutate_individual(circuit.copy()) for circuit in originals]
+    for original, b, s in zip(originals, batch, scalar):
+        assert b.columns[0].gates[0].qubits == s.columns[0].gates[0].qubits == original.columns[0].gates[0].qubits[::-1]
+        # Copy-on-write: o original não é alterado
+        assert b.columns[0] is not original.columns[0]
+
+
+def _swapped_pair(original, mutated):
+    changed = [i for i, (a, b) in enumerate(zip(original.columns, mutated.columns)) if a is not b]
+    assert len(changed) == 2, "a troca deve envolver duas colunas distintas"
+    i, j = changed
+    assert mutated.columns[i] is original.columns[j] and mutated.columns[j] is original.columns[i]
+    return i, j
+
+
+def test_swap_columns_draws_distinct_pairs(gate_factory):
+    strategy = SwapColumnsMutation()
+    circuits = [_random_circuit(gate_factory, 2, depth) for depth in (2, 3, 4, 5) for _ in range(50)]
+    for original, mutated in zip(circuits, strategy.mutate_batch([circuit.copy() for circuit in circuits])):
+        _swapped_pair(original, mutated)
+
+
+def test_swap_columns_pair_histogram(gate_factory):
+    strategy = SwapColumnsMutation()
+    original = _random_circuit(gate_factory, 2, 4)
+    batch_pairs = [_swapped_pair(original, m) for m in strategy.mutate_batch([original.copy() for _ in range(NUM_TRIALS)])]
+    scalar_pairs = [_swapped_pair(original, strategy.mutate_individual(original.copy())) for _ in range(NUM_TRIALS)]
+
+    support = [(i, j) for i in range(4) for j in range(i + 1, 4)]
+    assert set(batch_pairs) == set(support)
+    _assert_same_distribution(batch_pairs, scalar_pairs, support)
+    assert np.abs(_frequencies(batch_pairs, support) - 1 / 6).max() < TOLERANCE
+
+
+def _kept_positions(original, mutated):
+    """Posições originais das colunas mantidas, verificando que a ordem é preservada."""
+    positions = [next(i for i, col in enumerate(original.columns) if col is kept) for kept in mutated.columns]
+    assert positions == sorted(positions) and len(set(positions)) == len(positions)
+    return positions
+
+
+def test_change_depth_removal_keeps_order(gate_factory):
+    # 'max_depth' abaixo da profundidade atual: todo circuito perde colunas
+    strategy = ChangeDepthMutation(2, gate_factory, False)
+    circuits = [_random_circuit(gate_factory, 2, depth) for depth in (3, 4, 5, 6, 7) for _ in range(40)]
+    random.shuffle(circuits)
+    for original, mutated in zip(circuits, strategy.mutate_batch([circuit.copy() for circuit in circuits])):
+        assert 1 <= mutated.depth <= 2
+        _kept_positions(original, mutated)
+        assert mutated.needs_evaluation
+
+
+def test_change_depth_removal_histogram(gate_factory):
+    strategy = ChangeDepthMutation(3, gate_factory, False)
+    original = _random_circuit(gate_factory, 2, 5)
+    batch = strategy.mutate_batch([original.copy() for _ in range(NUM_TRIALS)])
+    scalar = [strategy.mutate_individual(original.copy()) for _ in range(NUM_TRIALS)]
+
+    # Cada coluna tem a mesma chance de ser removida; a profundidade final segue a mesma distribuição
+    batch_kept = [p for m in batch for p in _kept_positions(original, m)]
+    scalar_kept = [p for m in scalar for p in _kept_positions(original, m)]
+    _assert_same_distribution(batch_kept, scalar_kept, range(5))
+    frequencies = _frequencies(batch_kept, range(5))
+    assert np.abs(frequencies - frequencies.mean()).max() < TOLERANCE
+    _assert_same_distribution([m.depth for m in batch], [m.depth for m in scalar], range(1, 4))
+
+
+def test_change_depth_histogram(gate_factory):
+    strategy = ChangeDepthMutation(8, gate_factory, False)
+    original = _random_circuit(gate_factory, 2, 4)
+    batch_depths = [m.depth for m in strategy.mutate_batch([original.copy() for _ in range(NUM_TRIALS)])]
+    scalar_depths = [strategy.mutate_individual(original.copy()).depth for _ in range(NUM_TRIALS)]
+
+    assert 4 not in batch_depths
+    _assert_same_distribution(batch_depths, scalar_depths, range(1, 9))
+
+
+def test_swap_control_target_histogram():
+    strategy = SwapControlTargetMutation()
+    original = Circuit(4, [Column([_controlled_gate([0, 1, 2, 3], 2)])])
+
+    def swapped(mutated):
+        qubits = mutated.columns[0].gates[0].qubits
+        return tuple(q for q, p in zip(qubits, original.columns[0].gates[0].qubits) if q != p)
+
+    batch = [swapped(m) for m in strategy.mutate_batch([original.copy() for _ in range(NUM_TRIALS)])]
+    scalar = [swapped(strategy.mutate_individual(original.copy())) for _ in range(NUM_TRIALS)]
+
+    # Um dos dois controles troca de lugar com um dos dois alvos
+    support = [(target, control) for control in (0, 1) for target in (2, 3)]
+    assert set(batch) == set(support)
+    _assert_same_distribution(batch, scalar, support)
+    assert original.columns[0].gates[0].qubits == [0, 1, 2, 3]